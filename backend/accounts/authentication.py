@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from common.cache import get_cache
+
+# Everything the views and permission classes read off `request.user`.
+# Other fields are deferred and load on first access.
+CACHED_USER_FIELDS = ("username", "first_name", "last_name", "email", "is_active", "is_staff", "is_superuser")
+
+
+def user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def forget_user(user_id):
+    """Drop the cached copy of a user; call it after writes that bypass signals (`.update()`)."""
+    get_cache().delete(user_cache_key(user_id))
+
+
+def forget_user_on_change(sender, instance, **kwargs):
+    """post_save / post_delete receiver: deactivation or a role change applies on the next request."""
+    transaction.on_commit(lambda: forget_user(instance.pk))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that reads the user from the cache instead of `auth_user`.
+
+    The token is verified as usual; the user it names is then rebuilt from a
+    cached copy of `CACHED_USER_FIELDS` (kept for `AUTH_USER_CACHE_TIMEOUT`
+    seconds), so an authenticated request no longer costs a query. Saving or
+    deleting a user drops its entry (see `forget_user_on_change`); the TTL
+    bounds staleness for writes that skip signals. Only active users are
+    cached, and with `CHECK_REVOKE_TOKEN` every request goes to the database,
+    since that check needs the password hash.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != get_user_model()._meta.pk.name:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return self.user_from_cache(cached)
+
+        user = super().get_user(validated_token)
+        timeout = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60)
+        if timeout and user.is_active:
+            opts = user._meta
+            cache.set(key, {
+                field.attname: field.value_from_object(user)
+                for field in opts.concrete_fields
+                if field.primary_key or field.name in CACHED_USER_FIELDS
+            }, timeout)
+        return user
+
+    def user_from_cache(self, values):
+        model = self.user_model
+        names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+        return model.from_db("default", names, [values[name] for name in names])
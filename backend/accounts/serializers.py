@@ -0,0 +1,11 @@
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Public face of a user when embedded through `?expand=`."""
+
+    class Meta:
+        model = get_user_model()
+        fields = ["id", "username", "first_name", "last_name"]
+        read_only_fields = fields
@@ -0,0 +1,9 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+
+from .authentication import forget_user_on_change
+
+User = get_user_model()
+
+post_save.connect(forget_user_on_change, sender=User, dispatch_uid="auth-user-cache-save")
+post_delete.connect(forget_user_on_change, sender=User, dispatch_uid="auth-user-cache-delete")
@@ -1,3 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+
+class CachedJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("client", password="x")
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def user_queries(self, path="/api/bookings/"):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(path)
+        return response, [q["sql"] for q in queries if 'FROM "auth_user" WHERE' in q["sql"]]
+
+    def test_second_request_skips_user_lookup(self):
+        response, lookups = self.user_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(lookups), 1)
+
+        response, lookups = self.user_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookups, [])
+
+    def test_deactivation_and_role_change_apply_immediately(self):
+        self.user_queries()
+
+        self.user.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.api.post("/api/categories/", {"name": "Spa", "slug": "spa"})
+        self.assertEqual(response.status_code, 201)
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.api.get("/api/bookings/").status_code, 401)
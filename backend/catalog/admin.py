@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Business, Category, Service
+from .models import Business, BusinessHours, Category, Service
 
 admin.site.register(Business)
+admin.site.register(BusinessHours)
 admin.site.register(Category)
 admin.site.register(Service)
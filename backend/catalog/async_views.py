@@ -0,0 +1,232 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from common.cache import aget_cache_versions, get_cache, response_cache_key
+from common.fast import compile_row_plan
+from common.instrumentation import measure
+from common.pagination import FALSE_VALUES
+from .models import Business, Category, Service
+from .serializers import BusinessSerializer, CategorySerializer, ServiceSerializer
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def json_response(data, status=200):
+    with measure("serialize"):
+        return JsonResponse(
+            data,
+            status=status,
+            safe=False,
+            encoder=JSONEncoder,
+            json_dumps_params={"separators": (",", ":"), "ensure_ascii": False},
+        )
+
+
+class AsyncReadView(View):
+    """
+    Native async list/retrieve for read-heavy, anonymous-readable endpoints.
+
+    Rows come from the async ORM (`acount`, `aiterator`, `aget`) as
+    `.values()` and are rendered by the same row plan as FastListMixin, so the
+    JSON matches the DRF viewset for the same query. Responses are cached
+    under the same model version counters as CachedResponseMixin, so writes
+    through the viewsets invalidate them too. There is no authentication:
+    every request is served as an anonymous read, and throttled as one by
+    the same `DEFAULT_THROTTLE_CLASSES` (and counters) as the viewsets,
+    before the cache is consulted. Supported query params are
+    the page-number pagination ones (`?page=`, `?count=false`), exact
+    `filter_fields` and `ordering_fields`; anything else (search, expand,
+    sparse fields, cursors) is ignored, as DRF ignores unknown params.
+
+    Everything here awaits, so one uvicorn worker keeps serving other
+    requests while a query is in flight.
+    """
+
+    model = None
+    serializer_class = None
+    filter_fields = ()
+    ordering_fields = ()
+    ordering = None
+    cache_timeout = 300
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    http_method_names = ["get", "head", "options"]
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def get_plan(self, queryset):
+        plan = compile_row_plan(self.serializer_class(context={}), queryset)
+        if plan is None:
+            raise TypeError(f"{self.serializer_class.__name__} can't be rendered from .values() rows.")
+        return plan
+
+    async def get(self, request, pk=None):
+        self.action = "list" if pk is None else "retrieve"
+        throttled = await self.check_throttles(request)
+        if throttled is not None:
+            return throttled
+
+        cache = get_cache()
+        key = response_cache_key(request.path, request.GET, await aget_cache_versions([self.model]))
+        cached = await cache.aget(key)
+        if cached is not None:
+            response = json_response(cached)
+            response["X-Cache"] = "HIT"
+            return response
+
+        if pk is not None:
+            status, data = await self.retrieve(request, pk)
+        else:
+            status, data = await self.list(request)
+        if status == 200:
+            await cache.aset(key, data, self.cache_timeout)
+        response = json_response(data, status=status)
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def check_throttles(self, request):
+        """A 429 response if any throttle refuses the request, else None."""
+        # Throttles read DRF's request API; with no authenticators the user is anonymous.
+        drf_request = Request(request, authenticators=())
+        refused, waits = False, []
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not await sync_to_async(throttle.allow_request)(drf_request, self):
+                refused = True
+                if throttle.wait() is not None:
+                    waits.append(throttle.wait())
+        if not refused:
+            return None
+        exc = Throttled(max(waits, default=None))
+        response = json_response({"detail": exc.detail}, status=exc.status_code)
+        if exc.wait is not None:
+            response["Retry-After"] = str(exc.wait)
+        return response
+
+    async def retrieve(self, request, pk):
+        queryset = self.get_queryset()
+        plan = self.get_plan(queryset)
+        try:
+            row = await queryset.values(*plan.sources).aget(pk=pk)
+        except (self.model.DoesNotExist, ValueError, DjangoValidationError):
+            return 404, {"detail": f"No {self.model._meta.object_name} matches the given query."}
+        with measure("serialize"):
+            return 200, plan.render([row])[0]
+
+    async def list(self, request):
+        try:
+            queryset = self.filter_queryset(request, self.get_queryset())
+        except DjangoValidationError as exc:
+            return 400, exc.message_dict
+
+        page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        try:
+            number = int(request.GET.get("page") or 1)
+            if number < 1:
+                raise ValueError
+        except ValueError:
+            return 404, {"detail": "Invalid page."}
+
+        plan = self.get_plan(queryset)
+        rows = queryset.values(*plan.sources)
+        offset = (number - 1) * page_size
+        url = request.build_absolute_uri()
+
+        if request.GET.get("count", "").lower() in FALSE_VALUES:
+            page = [row async for row in rows[offset: offset + page_size + 1].aiterator()]
+            has_next = len(page) > page_size
+            page = page[:page_size]
+            with measure("serialize"):
+                results = plan.render(page)
+            return 200, {
+                "next": replace_query_param(url, "page", number + 1) if has_next else None,
+                "previous": self.previous_link(url, number),
+                "results": results,
+            }
+
+        count = await rows.acount()
+        if number > 1 and offset >= count:
+            return 404, {"detail": "Invalid page."}
+        page = [row async for row in rows[offset: offset + page_size].aiterator()]
+        with measure("serialize"):
+            results = plan.render(page)
+        return 200, {
+            "count": count,
+            "next": replace_query_param(url, "page", number + 1) if offset + page_size < count else None,
+            "previous": self.previous_link(url, number),
+            "results": results,
+        }
+
+    def previous_link(self, url, number):
+        if number <= 1:
+            return None
+        if number == 2:
+            return remove_query_param(url, "page")
+        return replace_query_param(url, "page", number - 1)
+
+    def filter_queryset(self, request, queryset):
+        opts = self.model._meta
+        lookups = {}
+        errors = {}
+        for name in self.filter_fields:
+            value = request.GET.get(name)
+            if value in (None, ""):
+                continue
+            field = opts.get_field(name)
+            if field.get_internal_type() == "BooleanField":
+                # Like django-filter's BooleanFilter, unrecognised values don't filter.
+                lowered = value.lower()
+                if lowered in TRUE_VALUES | FALSE_VALUES:
+                    lookups[name] = lowered in TRUE_VALUES
+                continue
+            try:
+                lookups[field.attname] = (field.target_field if field.is_relation else field).to_python(value)
+            except DjangoValidationError:
+                errors[name] = ["Enter a valid value."]
+        if errors:
+            raise DjangoValidationError(errors)
+        queryset = queryset.filter(**lookups)
+
+        ordering = [
+            term.strip()
+            for term in request.GET.get("ordering", "").split(",")
+            if term.strip().lstrip("-") in self.ordering_fields
+        ] or self.ordering
+        if ordering:
+            queryset = queryset.order_by(*[
+                F(term[1:]).desc(nulls_last=True) if term.startswith("-") else F(term).asc(nulls_last=True)
+                for term in ordering
+            ])
+        return queryset
+
+
+class AsyncCategoryView(AsyncReadView):
+    model = Category
+    serializer_class = CategorySerializer
+
+
+class AsyncBusinessView(AsyncReadView):
+    model = Business
+    serializer_class = BusinessSerializer
+    ordering_fields = ["rating_avg", "rating_count", "created_at"]
+
+
+class AsyncServiceView(AsyncReadView):
+    model = Service
+    serializer_class = ServiceSerializer
+    filter_fields = ["category", "business", "is_available"]
+    ordering_fields = ["price", "created_at"]
+    ordering = ["-created_at"]
+
+    def get_queryset(self):
+        return Service.objects.defer("search_vector")
@@ -0,0 +1,127 @@
+import math
+
+from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~5m cells, more than enough for a storefront
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = bit_count = 0
+    return "".join(chars)
+
+
+def geohash_for(latitude, longitude):
+    """The stored geohash of a point; blank when either coordinate is missing."""
+    if latitude is None or longitude is None:
+        return ""
+    return encode_geohash(latitude, longitude)
+
+
+class GeohashField(models.CharField):
+    """
+    Geohash of the row's `latitude`/`longitude`, recomputed whenever the row is
+    written through `save()` or `bulk_create()` (both call `pre_save()`).
+    `.update()` and `bulk_update()` skip it; models using this field route
+    those through a queryset that calls `geohash_for()` too.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = geohash_for(model_instance.latitude, model_instance.longitude)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def cell_size_degrees(precision):
+    """(lat_degrees, lng_degrees) spanned by one geohash cell of `precision`."""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def search_precision(latitude, radius_km):
+    """
+    Longest geohash prefix whose cells are at least `radius_km` across, so the
+    3x3 block of cells around the centre covers the whole search circle.
+    """
+    lng_scale = max(math.cos(math.radians(float(latitude))), 0.01)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lng_deg = cell_size_degrees(precision)
+        if lat_deg * KM_PER_DEGREE >= radius_km and lng_deg * KM_PER_DEGREE * lng_scale >= radius_km:
+            return precision
+    return 1
+
+
+def covering_prefixes(latitude, longitude, radius_km):
+    """Geohash prefixes of the centre cell and its 8 neighbours."""
+    precision = search_precision(latitude, radius_km)
+    lat_deg, lng_deg = cell_size_degrees(precision)
+    latitude, longitude = float(latitude), float(longitude)
+
+    prefixes = set()
+    for dlat in (-lat_deg, 0, lat_deg):
+        for dlng in (-lng_deg, 0, lng_deg):
+            lat = min(max(latitude + dlat, -90.0), 90.0)
+            lng = (longitude + dlng + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(lat, lng, precision))
+    return sorted(prefixes)
+
+
+def distance_km_expression(latitude, longitude, prefix=""):
+    """Haversine distance in km from a fixed point to `<prefix>latitude/longitude`."""
+    lat1 = math.radians(float(latitude))
+    lng1 = math.radians(float(longitude))
+    lat2 = Radians(F(f"{prefix}latitude"))
+    lng2 = Radians(F(f"{prefix}longitude"))
+
+    a = (
+        Power(Sin((lat2 - lat1) / 2), 2)
+        + math.cos(lat1) * Cos(lat2) * Power(Sin((lng2 - lng1) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def within_radius(queryset, latitude, longitude, radius_km, prefix=""):
+    """
+    Restrict `queryset` to rows within `radius_km`, closest first.
+
+    The geohash prefix match is the indexed pre-filter; the exact haversine
+    distance is computed only for rows in the covering cells.
+    """
+    cells = Q()
+    for geohash_prefix in covering_prefixes(latitude, longitude, radius_km):
+        cells |= Q(**{f"{prefix}geohash__startswith": geohash_prefix})
+
+    return (
+        queryset.filter(cells)
+        .annotate(distance_km=distance_km_expression(latitude, longitude, prefix))
+        .filter(distance_km__lte=radius_km)
+        .order_by("distance_km", "pk")
+    )
@@ -0,0 +1,327 @@
+import gc
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog.models import Business, Category, Service
+from catalog.search import refresh_search_vectors
+from catalog.seeding import LOAD_PASSWORD, LOAD_USER_PREFIX, LoadTestSeeder
+from engagement.models import Message, Review
+from engagement.conversations import conversation_for, rebuild_conversations
+from engagement.ratings import rebuild_rating_aggregates
+from transactions.models import Booking, Payment
+from transactions.stats import rebuild_business_stats
+
+DEFAULT_BUDGET_FILE = settings.BASE_DIR / "perf_budgets.json"
+
+# --write-budget headroom: latency budgets absorb machine noise, query budgets don't.
+LATENCY_HEADROOM = 3.0
+LATENCY_FLOOR_MS = 50.0
+
+# Throttling stays on so its overhead is measured, but no scenario may run out of tokens.
+UNTHROTTLED_RATES = {"user": "1000000/s", "anon": "1000000/s"}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Scenario:
+    """One endpoint call. `path` and `data` may be callables of the iteration number (for writes)."""
+
+    def __init__(self, name, method, path, data=None, token=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.token = token
+
+    def request(self, client, i):
+        path = self.path(i) if callable(self.path) else self.path
+        data = self.data(i) if callable(self.data) else self.data
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.token}"} if self.token else {}
+        return getattr(client, self.method)(path, data, format="json", **headers)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and drive every API endpoint through the test client, "
+        "recording p50/p95 latency and SQL query counts against a committed budget file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200, help="Client users to seed (default: 200).")
+        parser.add_argument("--businesses", type=int, default=20, help="Businesses to seed (default: 20).")
+        parser.add_argument("--bookings", type=int, default=5000, help="Bookings to seed (default: 5000).")
+        parser.add_argument("--reviews", type=int, default=500, help="Reviews to seed (default: 500).")
+        parser.add_argument("--seed", type=int, default=42, help="Dataset random seed (default: 42).")
+        parser.add_argument("--repeat", type=int, default=30, help="Timed requests per endpoint (default: 30).")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per endpoint (default: 3).")
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            help="Only run scenarios whose name starts with one of these prefixes.",
+        )
+        parser.add_argument(
+            "--budget",
+            default=str(DEFAULT_BUDGET_FILE),
+            help="Budget file (default: perf_budgets.json next to manage.py).",
+        )
+        parser.add_argument(
+            "--write-budget",
+            action="store_true",
+            help="Record this run as the budget for the current database vendor instead of checking it.",
+        )
+        parser.add_argument("--keepdb", action="store_true", help="Keep and reuse the test database.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options["keepdb"])
+        try:
+            self.seed(options)
+            cache.clear()
+            rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": UNTHROTTLED_RATES}
+            with override_settings(REST_FRAMEWORK=rest_framework):
+                results = self.run(self.scenarios(), options)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        if options["write_budget"]:
+            self.write_budget(options["budget"], results, options)
+            return
+        self.check_budget(options["budget"], results, options)
+
+    # ---- Dataset ----
+
+    def dataset(self, options):
+        return {key: options[key] for key in ("users", "businesses", "bookings", "reviews", "seed")}
+
+    def seed(self, options):
+        if get_user_model().objects.filter(username__startswith=LOAD_USER_PREFIX).exists():
+            return  # --keepdb with an already seeded database
+        for name, slug in [("Barbershop", "barbershop"), ("Hair Salon", "hair-salon"), ("Nail Salon", "nail-salon")]:
+            Category.objects.get_or_create(slug=slug, defaults={"name": name})
+
+        self.stdout.write("Seeding {users} users, {businesses} businesses, {bookings} bookings...".format(**options))
+        LoadTestSeeder(seed=options["seed"]).run(
+            users=options["users"],
+            businesses=options["businesses"],
+            services=options["businesses"] * 5,
+            bookings=options["bookings"],
+            reviews=options["reviews"],
+            messages=options["users"],
+        )
+        refresh_search_vectors(Service.objects.all())
+        rebuild_rating_aggregates()
+        rebuild_business_stats()
+        rebuild_conversations()
+
+    # ---- Scenarios ----
+
+    def scenarios(self):
+        User = get_user_model()
+        owner = User.objects.get(username=f"{LOAD_USER_PREFIX}owner1")
+        busiest = Booking.objects.values("client").annotate(n=Count("id")).order_by("-n", "client")[0]
+        client = User.objects.get(pk=busiest["client"])
+
+        owner_token = str(RefreshToken.for_user(owner).access_token)
+        client_token = str(RefreshToken.for_user(client).access_token)
+        refresh = str(RefreshToken.for_user(client))
+
+        category = Category.objects.order_by("pk").first()
+        business = Business.objects.filter(owner=owner).order_by("pk").first()
+        service = Service.objects.filter(business=business).order_by("pk").first()
+        booking = Booking.objects.filter(client=client).order_by("pk").first()
+        payment = Payment.objects.filter(booking__client=client).order_by("pk").first()
+        review = Review.objects.filter(business__owner=owner).order_by("pk").first()
+        message = Message.objects.filter(sender=client).order_by("pk").first() or Message.objects.create(
+            sender=client, recipient=owner, business=business, message_body="Hello!",
+            conversation=conversation_for(client.pk, business.pk),
+        )
+
+        # Writes land on their own far-future slots so repeated runs never collide.
+        start = timezone.now().replace(microsecond=0) + timedelta(days=800)
+
+        def new_booking(i):
+            return {"service": service.pk, "scheduled_at": (start + timedelta(hours=4 * i)).isoformat()}
+
+        lat, lng = business.latitude, business.longitude
+        return [
+            Scenario("auth-token", "post", "/api/auth/token/", {"username": owner.username, "password": LOAD_PASSWORD}),
+            Scenario("auth-refresh", "post", "/api/auth/token/refresh/", {"refresh": refresh}),
+
+            Scenario("categories-list", "get", "/api/categories/", token=client_token),
+            Scenario("categories-detail", "get", f"/api/categories/{category.pk}/", token=client_token),
+            Scenario("categories-list-anon-cached", "get", "/api/categories/"),
+
+            Scenario("businesses-list", "get", "/api/businesses/", token=client_token),
+            Scenario("businesses-list-top-rated", "get", "/api/businesses/?ordering=-rating_avg", token=client_token),
+            Scenario("businesses-detail", "get", f"/api/businesses/{business.pk}/", token=client_token),
+            Scenario("businesses-nearby", "get", f"/api/businesses/nearby/?lat={lat}&lng={lng}&radius_km=10", token=client_token),
+            Scenario("businesses-stats", "get", f"/api/businesses/{business.pk}/stats/", token=owner_token),
+
+            Scenario("services-list", "get", "/api/services/", token=client_token),
+            Scenario("services-list-keyset", "get", "/api/services/?pagination=cursor", token=client_token),
+            Scenario("services-list-expand", "get", "/api/services/?expand=business,category", token=client_token),
+            Scenario("services-list-fields", "get", "/api/services/?fields=id,name,price", token=client_token),
+            Scenario("services-search", "get", "/api/services/?search=fade", token=client_token),
+            Scenario("services-list-anon-cached", "get", "/api/services/"),
+            Scenario("services-detail", "get", f"/api/services/{service.pk}/", token=client_token),
+            Scenario("services-availability", "get", f"/api/services/{service.pk}/availability/", token=client_token),
+            Scenario("services-nearby", "get", f"/api/services/nearby/?lat={lat}&lng={lng}&radius_km=10", token=client_token),
+
+            Scenario("bookings-list", "get", "/api/bookings/", token=client_token),
+            Scenario("bookings-list-owner", "get", "/api/bookings/", token=owner_token),
+            Scenario("bookings-list-expand", "get", "/api/bookings/?expand=service.business", token=client_token),
+            Scenario("bookings-detail", "get", f"/api/bookings/{booking.pk}/", token=client_token),
+            Scenario("bookings-create", "post", "/api/bookings/", new_booking, token=client_token),
+
+            Scenario("payments-list", "get", "/api/payments/", token=client_token),
+            Scenario("payments-detail", "get", f"/api/payments/{payment.pk}/", token=client_token),
+            Scenario(
+                "payments-create", "post", "/api/payments/",
+                {"booking": booking.pk, "amount": "100.00", "payment_status": "completed"},
+                token=client_token,
+            ),
+
+            Scenario("reviews-list", "get", "/api/reviews/", token=owner_token),
+            *([Scenario("reviews-detail", "get", f"/api/reviews/{review.pk}/", token=owner_token)] if review else []),
+
+            Scenario("messages-list", "get", "/api/messages/", token=client_token),
+            Scenario("messages-detail", "get", f"/api/messages/{message.pk}/", token=client_token),
+            Scenario(
+                "messages-create", "post", "/api/messages/",
+                {"recipient": owner.pk, "business": business.pk, "message_body": "Is Friday open?"},
+                token=client_token,
+            ),
+            Scenario("conversations-list", "get", "/api/conversations/", token=client_token),
+            Scenario(
+                "conversations-messages", "get",
+                f"/api/conversations/{message.conversation_id}/messages/",
+                token=client_token,
+            ),
+        ]
+
+    # ---- Running ----
+
+    def run(self, scenarios, options):
+        if options["only"]:
+            scenarios = [s for s in scenarios if s.name.startswith(tuple(options["only"]))]
+
+        client = APIClient()
+        results = {}
+        iteration = 0
+        for scenario in scenarios:
+            timings, queries = [], []
+            gc.collect()
+            for run in range(options["warmup"] + options["repeat"]):
+                iteration += 1
+                # A collection landing inside one request is noise, not a regression.
+                gc.disable()
+                try:
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = scenario.request(client, iteration)
+                        elapsed = (time.perf_counter() - started) * 1000
+                finally:
+                    gc.enable()
+                if response.status_code >= 400:
+                    raise CommandError(
+                        f"{scenario.name}: {scenario.method.upper()} returned {response.status_code}: "
+                        f"{getattr(response, 'data', response.content)!r}"
+                    )
+                if run >= options["warmup"]:
+                    timings.append(elapsed)
+                    queries.append(len(captured))
+
+            results[scenario.name] = {
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(percentile(timings, 95), 2),
+                "queries": max(queries),
+            }
+        return results
+
+    # ---- Budgets ----
+
+    def load_budget(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"endpoints": {}}
+
+    def write_budget(self, path, results, options):
+        budget = self.load_budget(path)
+        budget["dataset"] = self.dataset(options)
+        endpoints = budget.setdefault("endpoints", {})
+        for name, result in results.items():
+            entry = endpoints.setdefault(name, {})
+            entry["queries"] = result["queries"]
+            entry.setdefault("p95_ms", {})[connection.vendor] = round(
+                max(result["p95_ms"] * LATENCY_HEADROOM, LATENCY_FLOOR_MS)
+            )
+        with open(path, "w") as f:
+            json.dump(budget, f, indent=2, sort_keys=True)
+            f.write("\n")
+        self.report(results, budget)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {connection.vendor} budgets for {len(results)} endpoints to {path}"))
+
+    def check_budget(self, path, results, options):
+        budget = self.load_budget(path)
+        if budget.get("dataset") and budget["dataset"] != self.dataset(options):
+            self.stdout.write(self.style.WARNING(
+                f"Dataset differs from the one the budgets were recorded on: {budget['dataset']}"
+            ))
+
+        failures = self.report(results, budget)
+        if failures:
+            raise CommandError(f"{len(failures)} budget(s) exceeded: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("All endpoints within budget."))
+
+    def report(self, results, budget):
+        endpoints = budget.get("endpoints", {})
+        failures = []
+        self.stdout.write(f"{'endpoint':<30} {'p50 ms':>8} {'p95 ms':>8} {'budget':>8} {'queries':>8} {'budget':>7}")
+        for name, result in results.items():
+            entry = endpoints.get(name)
+            if entry is None:
+                self.stdout.write(self.style.WARNING(f"{name:<30} no budget recorded"))
+                continue
+
+            latency_budget = entry.get("p95_ms", {}).get(connection.vendor)
+            problems = []
+            if result["queries"] > entry["queries"]:
+                problems.append(f"{name} ran {result['queries']} queries (budget {entry['queries']})")
+            if latency_budget is not None and result["p95_ms"] > latency_budget:
+                problems.append(f"{name} p95 {result['p95_ms']}ms (budget {latency_budget}ms)")
+            failures.extend(problems)
+
+            line = (
+                f"{name:<30} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                f"{latency_budget if latency_budget is not None else '-':>8} "
+                f"{result['queries']:>8} {entry['queries']:>7}"
+            )
+            self.stdout.write(self.style.ERROR(line) if problems else line)
+        return failures
@@ -0,0 +1,201 @@
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.models import Business, Service
+from .bench_api import percentile
+
+HOST = "127.0.0.1"
+
+
+def tree_rss_mb(pid):
+    """Resident memory of `pid` and all its descendants, in MB (Linux /proc)."""
+    children = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry.name))
+
+    total_kb, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            for line in Path(f"/proc/{current}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class Server:
+    """A gunicorn (sync WSGI) or uvicorn (ASGI) server running this project in a subprocess."""
+
+    def __init__(self, kind, workers, port):
+        self.kind = kind
+        self.workers = workers
+        self.port = port
+        self.process = None
+
+    def command(self):
+        if self.kind == "wsgi":
+            return [
+                sys.executable, "-m", "gunicorn", "config.wsgi:application",
+                "--workers", str(self.workers), "--bind", f"{HOST}:{self.port}", "--log-level", "warning",
+            ]
+        return [
+            sys.executable, "-m", "uvicorn", "config.asgi:application",
+            "--workers", str(self.workers), "--host", HOST, "--port", str(self.port), "--log-level", "warning",
+        ]
+
+    def __enter__(self):
+        env = {**os.environ, "ALLOWED_HOSTS": os.environ.get("ALLOWED_HOSTS") or f"{HOST},localhost"}
+        self.process = subprocess.Popen(self.command(), cwd=settings.BASE_DIR, env=env)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"{self.kind} server exited with code {self.process.returncode}.")
+            try:
+                connection = http.client.HTTPConnection(HOST, self.port, timeout=2)
+                connection.request("GET", "/")
+                connection.getresponse().read()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError(f"{self.kind} server did not start on port {self.port}.")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def rss_mb(self):
+        return tree_rss_mb(self.process.pid)
+
+
+def load(port, paths, concurrency, duration, bust_cache):
+    """
+    Hit `paths` round-robin from `concurrency` threads for `duration` seconds.
+
+    Each thread keeps its own connection (reopened whenever the server closes
+    it). Returns `(latencies_ms, errors)`.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(n):
+        connection = http.client.HTTPConnection(HOST, port, timeout=30)
+        mine, failed, i = [], 0, n
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            if bust_cache:
+                path += ("&" if "?" in path else "?") + f"_={n}-{i}"
+            i += 1
+            started = time.perf_counter()
+            try:
+                connection.request("GET", path)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                continue
+            mine.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec of the sync WSGI catalog viewsets (gunicorn sync workers) with the "
+        "native async views (/api/async/..., uvicorn), reporting the servers' resident memory "
+        "so runs can be compared at equal memory. Uses the configured database; seed it first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Workers for both servers (default: 1).")
+        parser.add_argument("--wsgi-workers", type=int, help="Override --workers for gunicorn.")
+        parser.add_argument("--asgi-workers", type=int, help="Override --workers for uvicorn.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client connections (default: 32).")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds of load per server (default: 10).")
+        parser.add_argument("--warmup", type=float, default=2, help="Untimed seconds of load first (default: 2).")
+        parser.add_argument("--port", type=int, default=8731, help="Port for the server under test (default: 8731).")
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Let repeated URLs hit the response cache (by default every request is a cache miss).",
+        )
+        parser.add_argument("--only", choices=["wsgi", "asgi"], help="Benchmark one server only.")
+
+    def handle(self, *args, **options):
+        service = Service.objects.order_by("pk").values_list("pk", flat=True).first()
+        business = Business.objects.order_by("pk").values_list("pk", flat=True).first()
+        if service is None or business is None:
+            raise CommandError("No services to read; run `manage.py seed --load-test` first.")
+
+        endpoints = [
+            "categories/",
+            "businesses/",
+            f"businesses/{business}/",
+            "services/?ordering=price",
+            f"services/?business={business}",
+            f"services/{service}/",
+        ]
+        runs = [
+            ("wsgi", options["wsgi_workers"] or options["workers"], [f"/api/{path}" for path in endpoints]),
+            ("asgi", options["asgi_workers"] or options["workers"], [f"/api/async/{path}" for path in endpoints]),
+        ]
+
+        results = []
+        for kind, workers, paths in runs:
+            if options["only"] and kind != options["only"]:
+                continue
+            self.stdout.write(f"{kind}: {workers} worker(s), {options['concurrency']} connections...")
+            with Server(kind, workers, options["port"]) as server:
+                load(server.port, paths, options["concurrency"], options["warmup"], not options["cache"])
+                latencies, errors = load(
+                    server.port, paths, options["concurrency"], options["duration"], not options["cache"],
+                )
+                rss = server.rss_mb()
+            if not latencies:
+                raise CommandError(f"{kind}: no successful requests ({errors} errors).")
+            rps = len(latencies) / options["duration"]
+            results.append((kind, workers, rps, percentile(latencies, 50), percentile(latencies, 95), errors, rss))
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'server':<8}{'workers':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'errors':>8}{'RSS MB':>10}{'req/s per 100MB':>18}"
+        )
+        for kind, workers, rps, p50, p95, errors, rss in results:
+            self.stdout.write(
+                f"{kind:<8}{workers:>8}{rps:>10.1f}{p50:>10.1f}{p95:>10.1f}{errors:>8}{rss:>10.1f}{rps / rss * 100:>18.1f}"
+            )
@@ -0,0 +1,146 @@
+import gc
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework.test import APIClient
+
+from catalog.models import Category
+from catalog.seeding import LOAD_USER_PREFIX, LoadTestSeeder
+from common.instrumentation import InstrumentationMiddleware, install_profilers, profile_queries, setting
+from .bench_api import UNTHROTTLED_RATES
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what request instrumentation adds to an API request at the configured SAMPLE_RATE: "
+        "the unsampled path (per request and per query) plus the sampled fraction's extra cost. "
+        "Runs on a small throwaway test database and fails above --max-overhead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/services/", help="Endpoint to time (default: /api/services/).")
+        parser.add_argument("--repeat", type=int, default=100, help="Requests per round and mode (default: 100).")
+        parser.add_argument("--rounds", type=int, default=10, help="Alternating rounds (default: 10).")
+        parser.add_argument("--sample-rate", type=float, help="Rate to evaluate (default: INSTRUMENTATION's).")
+        parser.add_argument(
+            "--max-overhead",
+            type=float,
+            default=1.0,
+            help="Fail when the overhead exceeds this percentage of the request (default: 1.0).",
+        )
+
+    def handle(self, *args, **options):
+        rate = options["sample_rate"] if options["sample_rate"] is not None else setting("SAMPLE_RATE", 0.1)
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            Category.objects.create(name="Barbershop", slug="barbershop")
+            LoadTestSeeder(seed=42).run(users=50, businesses=10, services=50, bookings=500, reviews=50, messages=50)
+            rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": UNTHROTTLED_RATES}
+            with override_settings(REST_FRAMEWORK=rest_framework):
+                off_ms, sampled_ms, queries = self.time_requests(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        request_us = self.unsampled_request_cost()
+        query_us = self.unsampled_query_cost()
+        sampled_extra_ms = max(sampled_ms - off_ms, 0.0)
+        overhead_ms = (request_us + queries * query_us) / 1000 + rate * sampled_extra_ms
+        share = overhead_ms / off_ms * 100
+
+        self.stdout.write(f"{options['path']}: {off_ms:.3f} ms unsampled, {sampled_ms:.3f} ms sampled, {queries} queries")
+        self.stdout.write(f"unsampled path: {request_us:.2f} us per request + {query_us:.3f} us per query")
+        self.stdout.write(f"overhead at SAMPLE_RATE={rate}: {overhead_ms * 1000:.1f} us per request ({share:.2f}%)")
+        if share > options["max_overhead"]:
+            raise CommandError(f"Instrumentation overhead {share:.2f}% exceeds {options['max_overhead']}%.")
+        self.stdout.write(self.style.SUCCESS(f"Within the {options['max_overhead']}% overhead budget."))
+
+    def client(self, sample_rate, path, user):
+        """A client whose middleware chain is built (and so reads INSTRUMENTATION) under `sample_rate`."""
+        instrumentation = {**settings.INSTRUMENTATION, "SAMPLE_RATE": sample_rate, "PUBLIC_SERVER_TIMING": True}
+        client = APIClient()
+        # Authenticated, so the anonymous response cache doesn't answer without touching the database.
+        client.force_authenticate(user)
+        with override_settings(INSTRUMENTATION=instrumentation):
+            client.get(path)
+        return client
+
+    def time_requests(self, options):
+        """Median latency with every request unsampled and with every request sampled, interleaved to cancel drift."""
+        path = options["path"]
+        cache.clear()
+        user = get_user_model().objects.get(username=f"{LOAD_USER_PREFIX}client1")
+        clients = {"off": self.client(0, path, user), "sampled": self.client(1.0, path, user)}
+        timings = {"off": [], "sampled": []}
+        with CaptureQueriesContext(connection) as captured:
+            clients["off"].get(path)
+        # Read it now: every request_started resets the connection's query log.
+        queries = len(captured)
+        gc.collect()
+        gc.disable()
+        try:
+            for _round in range(options["rounds"]):
+                for mode, client in clients.items():
+                    for _ in range(options["repeat"]):
+                        started = time.perf_counter()
+                        response = client.get(path)
+                        timings[mode].append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        raise CommandError(f"GET {path} returned {response.status_code}.")
+        finally:
+            gc.enable()
+        return statistics.median(timings["off"]), statistics.median(timings["sampled"]), queries
+
+    def unsampled_request_cost(self, calls=200000):
+        """Microseconds the middleware and its `request_started` receiver add to a request it doesn't sample."""
+        response = HttpResponse()
+        request = RequestFactory().get("/")
+
+        def get_response(request):
+            return response
+
+        with override_settings(INSTRUMENTATION={**settings.INSTRUMENTATION, "SAMPLE_RATE": 1e-12}):
+            middleware = InstrumentationMiddleware(get_response)
+
+        def instrumented(request):
+            install_profilers()
+            return middleware(request)
+
+        return self.per_call_us(lambda: instrumented(request), lambda: get_response(request), calls)
+
+    def unsampled_query_cost(self, calls=200000):
+        """Microseconds `profile_queries` adds to a query outside a sampled request."""
+
+        def execute(sql, params, many, context):
+            return None
+
+        return self.per_call_us(
+            lambda: profile_queries(execute, "SELECT 1", None, False, None),
+            lambda: execute("SELECT 1", None, False, None),
+            calls,
+        )
+
+    def per_call_us(self, measured, baseline, calls):
+        def run(fn):
+            started = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            return time.perf_counter() - started
+
+        return max(min(run(measured) for _ in range(3)) - min(run(baseline) for _ in range(3)), 0.0) / calls * 1e6
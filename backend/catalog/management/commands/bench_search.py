@@ -0,0 +1,118 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from catalog.models import Business, Category, Service
+from catalog.search import ServiceSearchFilter, refresh_search_vectors, search_enabled
+from catalog.views import ServiceViewSet
+
+WORDS = [
+    "fade", "beard", "shave", "braids", "gel", "manicure", "pedicure", "facial",
+    "massage", "lash", "brow", "makeup", "deluxe", "express", "classic", "premium",
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark ?search= on services: icontains SearchFilter vs full-text ServiceSearchFilter."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--services",
+            type=int,
+            default=100_000,
+            help="Minimum number of services; the shortfall is bulk-created (default: 100000).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Timed runs per search term (default: 20).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="bulk_create batch size when topping up services (default: 5000).",
+        )
+        parser.add_argument(
+            "--terms",
+            nargs="+",
+            default=["fade", "deep massage", "nails", "glow"],
+            help="Search terms to benchmark.",
+        )
+
+    def handle(self, *args, **options):
+        self.ensure_services(options["services"], options["batch_size"])
+
+        backends = [("icontains SearchFilter", SearchFilter())]
+        if search_enabled():
+            backends.append(("full-text ServiceSearchFilter", ServiceSearchFilter()))
+        else:
+            self.stdout.write(self.style.WARNING("Not on Postgres: only the icontains baseline is measured."))
+
+        self.stdout.write(f"Services: {Service.objects.count()}  page size: {api_settings.PAGE_SIZE}")
+        for term in options["terms"]:
+            for label, backend in backends:
+                timings = self.time_search(backend, term, options["repeat"])
+                self.stdout.write(
+                    f"{term!r:<16} {label:<32} "
+                    f"p50={statistics.median(timings):8.2f}ms  "
+                    f"p95={self.percentile(timings, 95):8.2f}ms"
+                )
+
+    def ensure_services(self, target, batch_size):
+        missing = target - Service.objects.count()
+        if missing <= 0:
+            return
+
+        businesses = list(Business.objects.all())
+        categories = list(Category.objects.all())
+        if not businesses or not categories:
+            raise CommandError("No businesses/categories found. Run `manage.py seed` first.")
+
+        rng = random.Random(42)
+        self.stdout.write(f"Creating {missing} services...")
+        while missing > 0:
+            size = min(batch_size, missing)
+            Service.objects.bulk_create([
+                Service(
+                    business=rng.choice(businesses),
+                    category=rng.choice(categories),
+                    name=" ".join(rng.sample(WORDS, 2)).title(),
+                    description=" ".join(rng.choices(WORDS, k=12)),
+                    price=rng.choice([80, 120, 150, 200, 250, 300, 450, 600]),
+                    duration_minutes=rng.choice([30, 45, 60, 90]),
+                )
+                for _ in range(size)
+            ], batch_size=batch_size)
+            missing -= size
+
+        # bulk_create skips post_save, so fill the vectors in one pass.
+        refresh_search_vectors(Service.objects.filter(search_vector__isnull=True))
+
+    def time_search(self, backend, term, repeat):
+        view = ServiceViewSet()
+        request = Request(APIRequestFactory().get("/api/services/", {"search": term}))
+        view.request = request
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset = backend.filter_queryset(request, ServiceViewSet.queryset.all(), view)
+            # What a paginated list response executes: COUNT(*) + first page.
+            queryset.count()
+            list(queryset[: api_settings.PAGE_SIZE])
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    @staticmethod
+    def percentile(values, pct):
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+        return ordered[index]
@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from catalog.models import Business, Category, Service
+from catalog.serializers import BusinessSerializer, CategorySerializer, ServiceSerializer
+from common.fast import compile_row_plan
+from engagement.models import Message, Review
+from engagement.serializers import MessageSerializer, ReviewSerializer
+from transactions.models import Booking, Payment
+from transactions.serializers import BookingSerializer, PaymentSerializer
+
+TARGETS = [
+    ("categories", Category.objects.all(), CategorySerializer),
+    ("businesses", Business.objects.all(), BusinessSerializer),
+    ("services", Service.objects.select_related("business", "category").defer("search_vector"), ServiceSerializer),
+    ("bookings", Booking.objects.select_related("service", "client", "service__business"), BookingSerializer),
+    ("payments", Payment.objects.select_related("booking"), PaymentSerializer),
+    ("reviews", Review.objects.select_related("booking", "business", "client"), ReviewSerializer),
+    ("messages", Message.objects.select_related("sender", "recipient", "business"), MessageSerializer),
+]
+
+
+class Command(BaseCommand):
+    help = "Measure per-page list serialization: ModelSerializer vs the FastListMixin values() path."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=100,
+            help="Rows per page (default: 100).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=30,
+            help="Timed runs per endpoint and path (default: 30).",
+        )
+
+    def handle(self, *args, **options):
+        page_size, repeat = options["page_size"], options["repeat"]
+        renderer = JSONRenderer()
+
+        for name, queryset, serializer_class in TARGETS:
+            queryset = queryset.order_by("-created_at", "-id")
+            plan = compile_row_plan(serializer_class(), queryset)
+            if plan is None:
+                self.stdout.write(f"{name:<11} not eligible for the fast path")
+                continue
+
+            def model_path():
+                return serializer_class(list(queryset[:page_size]), many=True).data
+
+            def fast_path():
+                return plan.render(queryset.values(*plan.sources)[:page_size])
+
+            if renderer.render(model_path()) != renderer.render(fast_path()):
+                raise CommandError(f"{name}: fast path output differs from {serializer_class.__name__}")
+
+            rows = queryset[:page_size].count()
+            slow, fast = self.time(model_path, repeat), self.time(fast_path, repeat)
+            self.stdout.write(
+                f"{name:<11} rows={rows:<4} ModelSerializer p50={slow:7.2f}ms  "
+                f"values() p50={fast:7.2f}ms  ({slow / fast if fast else 0:.1f}x)"
+            )
+
+    @staticmethod
+    def time(fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
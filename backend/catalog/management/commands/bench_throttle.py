@@ -0,0 +1,83 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import AnonRateThrottle
+
+from common.throttling import SlidingWindowThrottle
+from .bench_api import percentile
+
+
+class View:
+    """The bits of a viewset a throttle looks at."""
+
+    action = "list"
+    throttle_scope = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the throttle's own overhead: allow_request() checks per second against the "
+        "configured cache, for SlidingWindowThrottle and, for reference, DRF's AnonRateThrottle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checks", type=int, default=20000, help="Checks per thread (default: 20000).")
+        parser.add_argument("--clients", type=int, default=1000, help="Distinct client IPs (default: 1000).")
+        parser.add_argument("--threads", type=int, default=1, help="Concurrent threads (default: 1).")
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        requests = []
+        for i in range(options["clients"]):
+            request = Request(factory.get("/api/services/", REMOTE_ADDR=f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"))
+            request.user = AnonymousUser()
+            requests.append(request)
+
+        # Rates high enough that every check goes all the way through and is allowed.
+        rates = {"anon": "1000000/s", "user": "1000000/s"}
+        rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+        # SimpleRateThrottle reads its rates once, at import.
+        original_rates, AnonRateThrottle.THROTTLE_RATES = AnonRateThrottle.THROTTLE_RATES, rates
+        try:
+            with override_settings(REST_FRAMEWORK=rest_framework):
+                self.stdout.write(f"{'throttle':<22}{'checks/s':>12}{'p50 us':>10}{'p99 us':>10}")
+                for throttle_class in (SlidingWindowThrottle, AnonRateThrottle):
+                    cache.clear()
+                    self.run(throttle_class, requests, options)
+        finally:
+            AnonRateThrottle.THROTTLE_RATES = original_rates
+
+    def run(self, throttle_class, requests, options):
+        view = View()
+        latencies, lock = [], threading.Lock()
+
+        def worker(offset):
+            throttle = throttle_class()
+            mine = []
+            for i in range(options["checks"]):
+                request = requests[(offset + i) % len(requests)]
+                started = time.perf_counter()
+                throttle.allow_request(request, view)
+                mine.append(time.perf_counter() - started)
+            with lock:
+                latencies.extend(mine)
+
+        threads = [threading.Thread(target=worker, args=(n * 7919,)) for n in range(options["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{throttle_class.__name__:<22}{len(latencies) / elapsed:>12.0f}"
+            f"{percentile(latencies, 50) * 1e6:>10.1f}{percentile(latencies, 99) * 1e6:>10.1f}"
+        )
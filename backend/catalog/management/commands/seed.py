@@ -1,14 +1,19 @@
 from datetime import timedelta
 import random
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils import timezone
 
 from catalog.models import Category, Business, Service
+from catalog.search import refresh_search_vectors
+from catalog.seeding import LOAD_USER_PREFIX, LoadTestSeeder
 from transactions.models import Booking, Payment
 from engagement.models import Review, Message
+from engagement.conversations import rebuild_conversations
+from engagement.ratings import rebuild_rating_aggregates
+from transactions.stats import rebuild_business_stats
 
 
 class Command(BaseCommand):
@@ -23,35 +28,133 @@ class Command(BaseCommand):
         parser.add_argument(
             "--services",
             type=int,
-            default=20,
-            help="Number of services to create (default: 20).",
+            help="Number of services to create (default: 20, or 5 per business with --load-test).",
         )
         parser.add_argument(
             "--bookings",
             type=int,
-            default=10,
-            help="Number of bookings to create (default: 10).",
+            help="Number of bookings to create (default: 10, or 5 per user with --load-test).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Random seed; the same seed and options produce the same dataset (default: 42).",
+        )
+
+        load = parser.add_argument_group("load-test mode")
+        load.add_argument(
+            "--load-test",
+            action="store_true",
+            help="Generate a scaled dataset with chunked bulk inserts instead of the demo data.",
+        )
+        load.add_argument("--users", type=int, default=1000, help="Client users (default: 1000).")
+        load.add_argument("--businesses", type=int, default=100, help="Businesses (default: 100).")
+        load.add_argument(
+            "--reviews",
+            type=int,
+            default=1000,
+            help="Reviews, written for completed bookings up to this number (default: 1000).",
+        )
+        load.add_argument("--messages", type=int, default=1000, help="Messages (default: 1000).")
+        load.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per insert and per transaction (default: 5000).",
         )
 
-    @transaction.atomic
     def handle(self, *args, **options):
+        random.seed(options["seed"])
+        if options["load_test"]:
+            self.seed_load_test(options)
+        else:
+            self.seed_demo(options)
+
+    def reset(self):
+        self.stdout.write(self.style.WARNING("Resetting data..."))
+        Review.objects.all().delete()
+        Message.objects.all().delete()
+        Payment.objects.all().delete()
+        Booking.objects.all().delete()
+        Service.objects.all().delete()
+        Business.objects.all().delete()
+        Category.objects.all().delete()
+        # Note: We do NOT delete users by default (safer), only generated load-test ones.
+        get_user_model().objects.filter(username__startswith=LOAD_USER_PREFIX).delete()
+        self.stdout.write(self.style.SUCCESS("Data reset complete."))
+
+    def seed_categories(self):
+        categories_data = [
+            ("Barbershop", "barbershop"),
+            ("Hair Salon", "hair-salon"),
+            ("Nail Salon", "nail-salon"),
+            ("Skincare", "skincare"),
+            ("Massage", "massage"),
+            ("Makeup", "makeup"),
+        ]
+
+        categories = []
+        for name, slug in categories_data:
+            cat, _ = Category.objects.get_or_create(
+                slug=slug,
+                defaults={"name": name, "description": f"{name} services"},
+            )
+            categories.append(cat)
+        return categories
+
+    def seed_load_test(self, options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        if options["reset"]:
+            with transaction.atomic():
+                self.reset()
+        if get_user_model().objects.filter(username__startswith=LOAD_USER_PREFIX).exists():
+            raise CommandError("Load-test users already exist; rerun with --reset.")
+
+        users = options["users"]
+        businesses = options["businesses"]
+        services = options["services"] if options["services"] is not None else businesses * 5
+        bookings = options["bookings"] if options["bookings"] is not None else users * 5
+
+        self.seed_categories()
+        seeder = LoadTestSeeder(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            log=lambda message: self.stdout.write(message, ending="\r"),
+        )
+        result = seeder.run(
+            users=users,
+            businesses=businesses,
+            services=services,
+            bookings=bookings,
+            reviews=options["reviews"],
+            messages=options["messages"],
+        )
+        self.stdout.write("")
+
+        # Bulk inserts skip signals: fill search vectors, rating columns, the stats rollup and message threads.
+        self.stdout.write("Rebuilding search vectors, rating aggregates, daily stats and conversations...")
+        refresh_search_vectors(Service.objects.filter(search_vector__isnull=True))
+        rebuild_rating_aggregates()
+        rebuild_business_stats()
+        rebuild_conversations()
+
+        self.stdout.write(self.style.SUCCESS("✅ GroomBuzz load-test seed completed!"))
+        self.stdout.write(f"Users: {users} clients + owners ({LOAD_USER_PREFIX}client1.., {LOAD_USER_PREFIX}owner1..) [Pass1234!]")
+        self.stdout.write(f"Businesses: {businesses}  Services: {services}  Bookings/Payments: {bookings}")
+        self.stdout.write(f"Reviews: {result['reviews']}  Messages: {options['messages']}")
+
+    @transaction.atomic
+    def seed_demo(self, options):
         reset = options["reset"]
-        num_services = options["services"]
-        num_bookings = options["bookings"]
+        num_services = options["services"] if options["services"] is not None else 20
+        num_bookings = options["bookings"] if options["bookings"] is not None else 10
 
         User = get_user_model()
 
         if reset:
-            self.stdout.write(self.style.WARNING("Resetting data..."))
-            Review.objects.all().delete()
-            Message.objects.all().delete()
-            Payment.objects.all().delete()
-            Booking.objects.all().delete()
-            Service.objects.all().delete()
-            Business.objects.all().delete()
-            Category.objects.all().delete()
-            # Note: We do NOT delete users by default (safer).
-            self.stdout.write(self.style.SUCCESS("Data reset complete."))
+            self.reset()
 
         # ---- Users ----
         # Owners
@@ -88,33 +191,18 @@ class Command(BaseCommand):
         clients = [client1, client2]
 
         # ---- Categories ----
-        categories_data = [
-            ("Barbershop", "barbershop"),
-            ("Hair Salon", "hair-salon"),
-            ("Nail Salon", "nail-salon"),
-            ("Skincare", "skincare"),
-            ("Massage", "massage"),
-            ("Makeup", "makeup"),
-        ]
-
-        categories = []
-        for name, slug in categories_data:
-            cat, _ = Category.objects.get_or_create(
-                slug=slug,
-                defaults={"name": name, "description": f"{name} services"},
-            )
-            categories.append(cat)
+        categories = self.seed_categories()
 
         # ---- Businesses ----
         businesses_data = [
-            ("Kings Barber Lounge", "Top-tier fades and grooming", "Pretoria", "Hatfield"),
-            ("GlowUp Nails Studio", "Nails, lashes & brows", "Pretoria", "Brooklyn"),
-            ("Smooth Skin Clinic", "Facials and skincare treatments", "Johannesburg", "Sandton"),
-            ("Relax & Restore Spa", "Massage therapy and recovery", "Johannesburg", "Rosebank"),
+            ("Kings Barber Lounge", "Top-tier fades and grooming", "Pretoria", "Hatfield", -25.7487, 28.2380),
+            ("GlowUp Nails Studio", "Nails, lashes & brows", "Pretoria", "Brooklyn", -25.7690, 28.2370),
+            ("Smooth Skin Clinic", "Facials and skincare treatments", "Johannesburg", "Sandton", -26.1076, 28.0567),
+            ("Relax & Restore Spa", "Massage therapy and recovery", "Johannesburg", "Rosebank", -26.1467, 28.0436),
         ]
 
         businesses = []
-        for i, (name, desc, city, area) in enumerate(businesses_data):
+        for i, (name, desc, city, area, latitude, longitude) in enumerate(businesses_data):
             owner = owners[i % len(owners)]
             biz, _ = Business.objects.get_or_create(
                 name=name,
@@ -123,6 +211,8 @@ class Command(BaseCommand):
                     "description": desc,
                     "city": city,
                     "area": area,
+                    "latitude": latitude,
+                    "longitude": longitude,
                     "address": f"{random.randint(1, 99)} Main Road",
                     "phone_number": f"+27 6{random.randint(10000000, 99999999)}",
                     "is_active": True,
@@ -247,6 +337,11 @@ class Command(BaseCommand):
                 ),
             )
 
+        # Rows above bypass the API, so refresh the rating columns, the daily stats rollup and message threads.
+        rebuild_rating_aggregates(business_ids=[biz.pk for biz in businesses])
+        rebuild_business_stats(business_ids=[biz.pk for biz in businesses])
+        rebuild_conversations()
+
         # ---- Output summary ----
         self.stdout.write(self.style.SUCCESS("✅ GroomBuzz seed completed!"))
         self.stdout.write(f"Users: owners (owner1/owner2), clients (client1/client2) [Pass1234!]")
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:17
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+BACKFILL_SQL = """
+UPDATE catalog_service AS s
+SET search_vector =
+    setweight(to_tsvector('english', coalesce(s.name, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(b.name, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(c.name, '')), 'B')
+    || setweight(to_tsvector('english', coalesce(s.description, '')), 'C')
+FROM catalog_business AS b, catalog_category AS c
+WHERE b.id = s.business_id AND c.id = s.category_id
+"""
+
+
+def backfill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(BACKFILL_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_business_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='catalog_ser_search__9cb334_gin'),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_business_geolocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('opens_at', models.TimeField()),
+                ('closes_at', models.TimeField()),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_hours', to='catalog.business')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business', 'weekday'), name='unique_business_weekday_hours'), models.CheckConstraint(condition=models.Q(('closes_at__gt', models.F('opens_at'))), name='business_hours_closes_after_opens')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:20
+
+import catalog.geo
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_business_hours'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='business',
+            name='geohash',
+            field=catalog.geo.GeohashField(blank=True, editable=False, max_length=12),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.conf import settings
-from django.db import models
-from django.core.validators import MinValueValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.core.validators import MaxValueValidator, MinValueValidator
+
+from .geo import GeohashField, geohash_for
 
 
 class TimeStampedModel(models.Model):
@@ -11,6 +15,33 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+class BusinessQuerySet(models.QuerySet):
+    """Keeps `geohash` in step with the coordinates on the write paths that skip `save()`."""
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs, fields = list(objs), list(fields)
+        if {"latitude", "longitude"} & set(fields):
+            for obj in objs:
+                obj.geohash = geohash_for(obj.latitude, obj.longitude)
+            if "geohash" not in fields:
+                fields.append("geohash")
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if "geohash" in kwargs or not {"latitude", "longitude"} & kwargs.keys():
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list("pk", flat=True))
+            updated = super().update(**kwargs)
+            # The new coordinates may be expressions, so re-read them rather than guess.
+            moved = list(type(self)(self.model, using=self.db).filter(pk__in=pks).only("latitude", "longitude"))
+            for business in moved:
+                business.geohash = geohash_for(business.latitude, business.longitude)
+            type(self)(self.model, using=self.db).bulk_update(moved, ["geohash"])
+        return updated
+
+
 class Business(TimeStampedModel):
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -25,19 +56,68 @@ class Business(TimeStampedModel):
     city = models.CharField(max_length=100, blank=True)
     area = models.CharField(max_length=100, blank=True)
 
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    # Derived from latitude/longitude on every write; prefix-searched by catalog.geo
+    geohash = GeohashField(max_length=12, blank=True, editable=False)
+
+    # Denormalized from engagement.Review, maintained by engagement.ratings
     rating_avg = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_histogram = models.JSONField(default=dict, blank=True)
     is_active = models.BooleanField(default=True)
 
+    objects = BusinessQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=["name"]),
             models.Index(fields=["city", "area"]),
+            models.Index(fields=["rating_avg"]),
+            models.Index(fields=["geohash"], name="catalog_bus_geohash_idx", opclasses=["varchar_pattern_ops"]),
         ]
 
     def __str__(self):
         return self.name
 
 
+class BusinessHours(TimeStampedModel):
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, "Monday"
+        TUESDAY = 1, "Tuesday"
+        WEDNESDAY = 2, "Wednesday"
+        THURSDAY = 3, "Thursday"
+        FRIDAY = 4, "Friday"
+        SATURDAY = 5, "Saturday"
+        SUNDAY = 6, "Sunday"
+
+    business = models.ForeignKey(
+        Business,
+        on_delete=models.CASCADE,
+        related_name="opening_hours",
+    )
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices)
+    opens_at = models.TimeField()
+    closes_at = models.TimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["business", "weekday"], name="unique_business_weekday_hours"),
+            models.CheckConstraint(condition=models.Q(closes_at__gt=models.F("opens_at")), name="business_hours_closes_after_opens"),
+        ]
+
+    def __str__(self):
+        return f"{self.business.name} {self.get_weekday_display()} {self.opens_at}-{self.closes_at}"
+
+
 class Category(TimeStampedModel):
     name = models.CharField(max_length=120, unique=True)
     slug = models.SlugField(max_length=140, unique=True)
@@ -79,10 +159,17 @@ class Service(TimeStampedModel):
 
     is_available = models.BooleanField(default=True)
 
+    # Name, description, business and category names; maintained by catalog.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         indexes = [
+            GinIndex(fields=["search_vector"]),
             models.Index(fields=["price"]),
             models.Index(fields=["created_at"]),
+            # Keyset pagination tie-breakers (see common.pagination.KeysetPagination)
+            models.Index(fields=["price", "id"]),
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self):
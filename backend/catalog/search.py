@@ -0,0 +1,90 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, OuterRef, Subquery
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+SEARCH_CONFIG = "english"
+
+# Service name ranks above business/category names, which rank above the description.
+SEARCH_WEIGHTS = {
+    "name": "A",
+    "business_name": "B",
+    "category_name": "B",
+    "description": "C",
+}
+
+
+def search_enabled():
+    return connection.vendor == "postgresql"
+
+
+def service_search_vector():
+    """
+    Expression for Service.search_vector.
+
+    Related names go through subqueries rather than joins so the expression
+    can be used in `QuerySet.update()`.
+    """
+    from .models import Business, Category
+
+    business_name = Subquery(Business.objects.filter(pk=OuterRef("business_id")).values("name")[:1])
+    category_name = Subquery(Category.objects.filter(pk=OuterRef("category_id")).values("name")[:1])
+
+    return (
+        SearchVector("name", weight=SEARCH_WEIGHTS["name"], config=SEARCH_CONFIG)
+        + SearchVector(business_name, weight=SEARCH_WEIGHTS["business_name"], config=SEARCH_CONFIG)
+        + SearchVector(category_name, weight=SEARCH_WEIGHTS["category_name"], config=SEARCH_CONFIG)
+        + SearchVector("description", weight=SEARCH_WEIGHTS["description"], config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(queryset):
+    """Recompute search_vector for every service in `queryset` with one UPDATE."""
+    if not search_enabled():
+        return 0
+    return queryset.update(search_vector=service_search_vector())
+
+
+def build_search_query(terms):
+    """
+    Turn free-text terms into a prefix-matching tsquery (`fade:* & hair:*`),
+    so partially typed words still match like the old icontains search did.
+    """
+    words = [word for term in terms for word in re.findall(r"\w+", term)]
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+
+
+class ServiceSearchFilter(SearchFilter):
+    """
+    `?search=` backed by the indexed Service.search_vector on Postgres.
+
+    Results are ranked by relevance unless the client passed an explicit
+    `?ordering=`. Other databases fall back to DRF's icontains SearchFilter.
+    """
+
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        if not search_enabled():
+            return super().filter_queryset(request, queryset, view)
+
+        query = build_search_query(self.get_search_terms(request))
+        if query is None:
+            return queryset
+
+        queryset = queryset.filter(search_vector=query)
+        if request.query_params.get(self.ordering_param):
+            return queryset
+
+        return queryset.annotate(
+            search_rank=SearchRank(F("search_vector"), query),
+        ).order_by("-search_rank", "-created_at", "-id")
@@ -0,0 +1,261 @@
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from engagement.models import Message, Review
+from transactions.availability import DEFAULT_OPENING_HOURS
+from transactions.models import Booking, Payment
+from .models import Business, Category, Service
+
+LOAD_USER_PREFIX = "load_"
+LOAD_PASSWORD = "Pass1234!"
+
+CITIES = [
+    ("Pretoria", -25.7479, 28.2293),
+    ("Johannesburg", -26.2041, 28.0473),
+    ("Cape Town", -33.9249, 18.4241),
+    ("Durban", -29.8587, 31.0218),
+]
+AREAS = ["Central", "North", "South", "East", "West", "Hills", "Park", "Gardens"]
+SERVICE_NAMES = [
+    "Fade Haircut", "Beard Trim", "Classic Shave", "Wash & Blow", "Braids",
+    "Gel Nails", "Manicure", "Pedicure", "Deep Cleansing Facial", "Hydrating Facial",
+    "Swedish Massage", "Deep Tissue Massage", "Lash Extensions", "Brow Shaping", "Makeup Session",
+]
+PRICES = [80, 120, 150, 200, 250, 300, 450, 600]
+DURATIONS = [30, 45, 60, 90]
+COMMENTS = [
+    "Great service, very professional!",
+    "Loved the experience. Will come again.",
+    "Clean, fast, and friendly.",
+    "Excellent attention to detail!",
+    "Decent, but I had to wait a while.",
+]
+
+
+class LoadTestSeeder:
+    """
+    Deterministic, chunked generator for load-test datasets.
+
+    Everything is drawn from one `random.Random(seed)` and written in chunks of
+    `batch_size` rows (one transaction per chunk) with `bulk_create`. Only ids
+    and a few scalars per service are kept between chunks, so memory stays
+    flat however many bookings are generated. Signals
+    don't fire, so search vectors, rating aggregates and the stats rollup are
+    rebuilt at the end by the caller (geohashes are filled in by their field).
+    """
+
+    def __init__(self, seed=42, batch_size=5000, log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def insert(self, model, objs):
+        with transaction.atomic():
+            return model._default_manager.bulk_create(objs)
+
+    def insert_all(self, model, make, count, label):
+        """Build `count` objects with `make(i)` and insert them chunk by chunk; return their pks."""
+        pks = []
+        for start in range(0, count, self.batch_size):
+            objs = [make(i) for i in range(start, min(start + self.batch_size, count))]
+            pks.extend(obj.pk for obj in self.insert(model, objs))
+            self.log(f"{label}: {len(pks)}/{count}")
+        return pks
+
+    def users(self, kind, count):
+        User = get_user_model()
+        # Hashing once keeps a million users from costing a million PBKDF2 rounds.
+        password = make_password(LOAD_PASSWORD)
+        return self.insert_all(
+            User,
+            lambda i: User(
+                username=f"{LOAD_USER_PREFIX}{kind}{i + 1}",
+                email=f"{LOAD_USER_PREFIX}{kind}{i + 1}@groombuzz.test",
+                password=password,
+            ),
+            count,
+            f"{kind.title()}s",
+        )
+
+    def businesses(self, count, owner_ids):
+        rng = self.rng
+
+        def make(i):
+            city, lat, lng = rng.choice(CITIES)
+            latitude = round(lat + rng.uniform(-0.15, 0.15), 6)
+            longitude = round(lng + rng.uniform(-0.15, 0.15), 6)
+            return Business(
+                owner_id=owner_ids[i % len(owner_ids)],
+                name=f"{rng.choice(SERVICE_NAMES).split()[0]} Studio {i + 1}",
+                description=f"Load-test business {i + 1} in {city}",
+                city=city,
+                area=rng.choice(AREAS),
+                address=f"{rng.randint(1, 999)} Main Road",
+                phone_number=f"+27 6{rng.randint(10000000, 99999999)}",
+                latitude=latitude,
+                longitude=longitude,
+                is_active=rng.random() > 0.05,
+            )
+
+        return self.insert_all(Business, make, count, "Businesses")
+
+    def services(self, count, business_ids, category_ids):
+        """Insert services; return `[(pk, business_id, price, duration)]` for the bookings."""
+        rng = self.rng
+        meta = []
+
+        def make(i):
+            name = rng.choice(SERVICE_NAMES)
+            return Service(
+                business_id=rng.choice(business_ids),
+                category_id=rng.choice(category_ids),
+                name=f"{name} #{i + 1}",
+                description=f"{name} ({rng.choice(['express', 'classic', 'deluxe', 'premium'])})",
+                price=Decimal(rng.choice(PRICES)),
+                currency="ZAR",
+                duration_minutes=rng.choice(DURATIONS),
+                is_available=rng.random() > 0.1,
+            )
+
+        for start in range(0, count, self.batch_size):
+            objs = self.insert(Service, [make(i) for i in range(start, min(start + self.batch_size, count))])
+            meta.extend((s.pk, s.business_id, s.price, timedelta(minutes=s.duration_minutes)) for s in objs)
+            self.log(f"Services: {len(meta)}/{count}")
+        return meta
+
+    def booking_status(self, scheduled_at):
+        roll = self.rng.random()
+        if scheduled_at < self.now:
+            if roll < 0.75:
+                return Booking.Status.COMPLETED
+            return Booking.Status.CANCELED if roll < 0.9 else Booking.Status.CONFIRMED
+        if roll < 0.5:
+            return Booking.Status.PENDING
+        return Booking.Status.CONFIRMED if roll < 0.9 else Booking.Status.CANCELED
+
+    @staticmethod
+    def next_opening(after, duration, gap=timedelta(0)):
+        """
+        Earliest start, `gap` of open time after `after`, where `duration`
+        fits within the default opening hours.
+        """
+        day = timezone.localtime(after).date()
+        while True:
+            hours = DEFAULT_OPENING_HOURS.get(day.weekday())
+            if hours is not None:
+                opens, closes = (timezone.make_aware(datetime.combine(day, at)) for at in hours)
+                start = max(after, opens)
+                if start + gap + duration <= closes:
+                    return start + gap
+                gap = max(gap - max(closes - start, timedelta(0)), timedelta(0))
+            day += timedelta(days=1)
+
+    def bookings(self, count, services, client_ids, reviews):
+        """
+        Bookings from a year ago onwards, each with a payment; the first
+        `reviews` completed bookings also get a review. Each service's
+        bookings are laid out in time order within opening hours, a random
+        gap apart, so no two of them overlap (as the booking API enforces).
+        Returns the number of reviews written.
+        """
+        rng = self.rng
+        first_day = timezone.localdate(self.now) - timedelta(days=365)
+        origin = timezone.make_aware(datetime.combine(first_day, datetime.min.time()))
+        # Open minutes in the ~13 months the bookings should span, shared between the services.
+        open_per_week = sum(
+            (closes.hour - opens.hour) * 60 + closes.minute - opens.minute
+            for opens, closes in DEFAULT_OPENING_HOURS.values()
+        )
+        open_minutes_per_service = 395 / 7 * open_per_week * len(services) / max(count, 1)
+        next_free = {}
+        written, reviews_left = 0, reviews
+
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            rows = []
+            for _ in range(size):
+                service_id, business_id, price, duration = rng.choice(services)
+                # Quarter-hour gaps of open time, averaging out to the service's share of it.
+                mean_gap = max(open_minutes_per_service - duration.total_seconds() / 60, 0)
+                gap = timedelta(minutes=15 * rng.randrange(int(2 * mean_gap // 15) + 1))
+                scheduled_at = self.next_opening(next_free.get(service_id, origin), duration, gap)
+                next_free[service_id] = scheduled_at + duration
+                rows.append((business_id, price, Booking(
+                    service_id=service_id,
+                    client_id=rng.choice(client_ids),
+                    scheduled_at=scheduled_at,
+                    ends_at=scheduled_at + duration,
+                    status=self.booking_status(scheduled_at),
+                )))
+
+            with transaction.atomic():
+                Booking.objects.bulk_create([booking for _b, _p, booking in rows])
+
+                payments, chunk_reviews = [], []
+                for business_id, price, booking in rows:
+                    completed = booking.status == Booking.Status.COMPLETED
+                    payments.append(Payment(
+                        booking_id=booking.pk,
+                        amount=price,
+                        payment_method=rng.choice(Payment.Method.values),
+                        payment_status=(
+                            Payment.Status.COMPLETED if completed
+                            else Payment.Status.FAILED if booking.status == Booking.Status.CANCELED
+                            else Payment.Status.PENDING
+                        ),
+                        payment_date=booking.scheduled_at + timedelta(hours=1) if completed else None,
+                    ))
+                    if completed and reviews_left:
+                        reviews_left -= 1
+                        chunk_reviews.append(Review(
+                            booking_id=booking.pk,
+                            business_id=business_id,
+                            client_id=booking.client_id,
+                            rating=rng.choices([1, 2, 3, 4, 5], weights=[1, 2, 6, 12, 14])[0],
+                            comment=rng.choice(COMMENTS),
+                        ))
+                Payment.objects.bulk_create(payments)
+                Review.objects.bulk_create(chunk_reviews)
+            written += len(chunk_reviews)
+            self.log(f"Bookings: {start + size}/{count} (+payments, reviews: {written})")
+        return written
+
+    def messages(self, count, client_ids, businesses):
+        """`businesses` is `[(pk, owner_id)]`; each message goes between a client and an owner."""
+        rng = self.rng
+
+        def make(i):
+            client_id = rng.choice(client_ids)
+            business_id, owner_id = rng.choice(businesses)
+            sender, recipient = (client_id, owner_id) if rng.random() < 0.5 else (owner_id, client_id)
+            return Message(
+                sender_id=sender,
+                recipient_id=recipient,
+                business_id=business_id,
+                message_body=rng.choice([
+                    "Hi, do you have availability this week?",
+                    "Yes, we have slots open. Please pick a time.",
+                    "Can I move my booking to the afternoon?",
+                    "Thanks, see you then!",
+                ]),
+            )
+
+        return len(self.insert_all(Message, make, count, "Messages"))
+
+    def run(self, users, businesses, services, bookings, reviews, messages):
+        categories = list(Category.objects.values_list("pk", flat=True))
+        owner_ids = self.users("owner", max(1, (businesses + 1) // 2))
+        client_ids = self.users("client", users)
+        business_ids = self.businesses(businesses, owner_ids)
+        service_meta = self.services(services, business_ids, categories)
+        written_reviews = self.bookings(bookings, service_meta, client_ids, reviews)
+        owners = [(pk, owner_ids[i % len(owner_ids)]) for i, pk in enumerate(business_ids)]
+        self.messages(messages, client_ids, owners)
+        return {"reviews": written_reviews}
@@ -1,22 +1,78 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
+from common.expand import ExpandableFieldsMixin
+from common.instrumentation import MeasuredSerializerMixin
 from .models import Business, Category, Service
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = "__all__"
 
 
-class BusinessSerializer(serializers.ModelSerializer):
+class BusinessSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Business
         fields = "__all__"
-        read_only_fields = ["owner", "created_at", "updated_at"]
+        read_only_fields = [
+            "owner",
+            "rating_avg",
+            "rating_count",
+            "rating_histogram",
+            "created_at",
+            "updated_at",
+        ]
 
 
-class ServiceSerializer(serializers.ModelSerializer):
+class ServiceSerializer(MeasuredSerializerMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Service
-        fields = "__all__"
+        exclude = ["search_vector"]
         read_only_fields = ["created_at", "updated_at"]
+        expandable_fields = {
+            "business": BusinessSerializer,
+            "category": CategorySerializer,
+        }
+
+
+class NearbyBusinessSerializer(BusinessSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
+
+class NearbyServiceSerializer(ServiceSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
+
+class NearbyQuerySerializer(serializers.Serializer):
+    """Query parameters for the `nearby` discovery endpoints."""
+
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(min_value=0.1, max_value=100, default=5)
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """Query parameters for `/services/{id}/availability/`."""
+
+    date = serializers.DateField(required=False)
+
+
+class StatsQuerySerializer(serializers.Serializer):
+    """Query parameters for `/businesses/{id}/stats/`; defaults to the last 12 months."""
+
+    MAX_DAYS = 731
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        end = attrs.get("end") or timezone.localdate()
+        start = attrs.get("start") or end - timedelta(days=364)
+        if start > end:
+            raise serializers.ValidationError({"start": "start must be on or before end."})
+        if (end - start).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({"start": f"The range can span at most {self.MAX_DAYS} days."})
+        return {"start": start, "end": end}
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.cache import invalidate_cached_responses
+
+from .models import Business, Category, Service
+from .search import refresh_search_vectors
+
+
+@receiver(post_save, sender=Service)
+def refresh_service_search_vector(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_search_vectors(Service.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Business)
+def refresh_business_services_search_vectors(sender, instance, created=False, raw=False, **kwargs):
+    # A new business has no services yet; otherwise its name may have changed.
+    if not raw and not created:
+        refresh_search_vectors(Service.objects.filter(business_id=instance.pk))
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_services_search_vectors(sender, instance, created=False, raw=False, **kwargs):
+    if not raw and not created:
+        refresh_search_vectors(Service.objects.filter(category_id=instance.pk))
+
+
+for model in (Category, Business, Service):
+    post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cache-save-{model.__name__}")
+    post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cache-delete-{model.__name__}")
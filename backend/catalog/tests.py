@@ -1,3 +1,761 @@
-from django.test import TestCase
+import io
+import math
+import random
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from common import fast, instrumentation
+from common.fast import compile_row_plan
+from common.pagination import KeysetPagination
+
+from .geo import covering_prefixes, distance_km_expression, encode_geohash, geohash_for, within_radius
+from .models import Business, Category, Service
+from .search import SEARCH_CONFIG, build_search_query, refresh_search_vectors
+from .seeding import LoadTestSeeder
+from .serializers import BusinessSerializer, CategorySerializer, ServiceSerializer
+
+
+class AsyncReadPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user("owner", password="x")
+        cls.category = Category.objects.create(name="Barbershop", slug="barbershop")
+        other = Category.objects.create(name="Nails", slug="nails")
+        business = Business.objects.create(owner=owner, name="Kings")
+        cls.services = [
+            Service.objects.create(
+                business=business,
+                category=cls.category if i % 2 else other,
+                name=f"Cut {i}",
+                price=50 + i * 10,
+                is_available=i != 3,
+            )
+            for i in range(14)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def get_both(self, path):
+        sync = self.client.get(f"/api/{path}")
+        native = async_to_sync(AsyncClient().get)(f"/api/async/{path}")
+        return sync, native
+
+    def test_async_views_match_viewsets(self):
+        for path in [
+            "categories/",
+            "businesses/",
+            f"services/?category={self.category.pk}&is_available=true&ordering=-price",
+            "services/?ordering=price&page=2",
+            "services/?count=false",
+            f"services/{self.services[0].pk}/",
+        ]:
+            sync, native = self.get_both(path)
+            self.assertEqual(native.status_code, sync.status_code, path)
+            self.assertEqual(
+                native.content.decode().replace("/api/async/", "/api/"),
+                sync.content.decode(),
+                path,
+            )
+
+    def test_async_missing_object_and_page_are_404(self):
+        for path in ["services/999999/", "services/?page=9"]:
+            sync, native = self.get_both(path)
+            self.assertEqual((sync.status_code, native.status_code), (404, 404), path)
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {"anon": "12/min", "user": None}})
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_search_costs_more_and_limits_are_per_client(self):
+        # A search costs 1 + 5, so two fit in the 12 per minute.
+        for _ in range(2):
+            self.assertEqual(self.client.get("/api/services/", {"search": "cut"}).status_code, 200)
+        response = self.client.get("/api/services/", {"search": "cut"})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(self.client.get("/api/services/").status_code, 429)
+
+        # Another client IP has its own counters.
+        self.assertEqual(self.client.get("/api/services/", REMOTE_ADDR="10.0.0.2").status_code, 200)
+
+    def test_async_views_share_the_viewsets_limits(self):
+        native = AsyncClient()
+        for _ in range(6):
+            self.assertEqual(self.client.get("/api/services/").status_code, 200)
+            self.assertEqual(async_to_sync(native.get)("/api/async/services/").status_code, 200)
+        response = async_to_sync(native.get)("/api/async/services/")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertIn("throttled", response.json()["detail"])
+        self.assertEqual(self.client.get("/api/services/").status_code, 429)
+
+    def test_previous_window_spend_slides_out(self):
+        start = 60 * 1_000_000
+        with mock.patch("common.throttling.time.time", return_value=start):
+            for _ in range(2):
+                self.assertEqual(self.client.get("/api/services/", {"search": "cut"}).status_code, 200)
+        # Halfway through the next window, half of the previous spend still counts: room for 6 more.
+        with mock.patch("common.throttling.time.time", return_value=start + 90):
+            self.assertEqual(self.client.get("/api/services/", {"search": "cut"}).status_code, 200)
+            response = self.client.get("/api/services/")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "5")
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user("owner", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        cls.businesses = [
+            Business.objects.create(
+                owner=owner,
+                name=f"Shop {i}",
+                rating_avg=None if i % 3 == 0 else Decimal(i % 5) + Decimal("0.5"),
+            )
+            for i in range(13)
+        ]
+        # Few distinct prices, so most pages end in the middle of a tie.
+        for i in range(23):
+            Service.objects.create(business=cls.businesses[0], category=category, name=f"Cut {i}", price=50 + i % 3 * 10)
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, path, params):
+        """Follow `next` links to the end; return each page's ids and the last response."""
+        pages, response = [], self.client.get(path, {**params, "pagination": "cursor"})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([row["id"] for row in response.json()["results"]])
+            if not response.json()["next"]:
+                return pages, response
+            response = self.client.get(response.json()["next"])
+
+    def test_cursor_pages_cover_ties_exactly_once_and_walk_back(self):
+        pages, last = self.walk("/api/services/", {"ordering": "price"})
+        expected = list(Service.objects.order_by("price", "id").values_list("id", flat=True))
+        self.assertEqual(sum(pages, []), expected)
+
+        previous = self.client.get(last.json()["previous"]).json()
+        self.assertEqual([row["id"] for row in previous["results"]], pages[-2])
+
+    def test_nullable_ordering_keeps_nulls_last(self):
+        pages, last = self.walk("/api/businesses/", {"ordering": "-rating_avg"})
+        rated = sorted((b for b in self.businesses if b.rating_avg is not None), key=lambda b: (-b.rating_avg, -b.pk))
+        unrated = sorted((b for b in self.businesses if b.rating_avg is None), key=lambda b: -b.pk)
+        self.assertEqual(sum(pages, []), [b.pk for b in rated + unrated])
+
+        previous = self.client.get(last.json()["previous"]).json()
+        self.assertEqual([row["id"] for row in previous["results"]], pages[-2])
+
+    def test_requested_ordering_is_honoured(self):
+        pages, _last = self.walk("/api/businesses/", {"ordering": "created_at"})
+        self.assertEqual(sum(pages, []), sorted(b.pk for b in self.businesses))
+
+    def test_plain_fields_stay_orderable(self):
+        response = self.client.get("/api/businesses/", {"ordering": "-name"})
+        names = [row["name"] for row in response.json()["results"]]
+        self.assertEqual(names, sorted((b.name for b in self.businesses), reverse=True)[:10])
+
+    def test_unseekable_ordering_is_rejected_or_falls_back(self):
+        factory = APIRequestFactory()
+        queryset = Service.objects.order_by(Lower("name"))
+
+        requested = Request(factory.get("/api/services/", {"ordering": "name"}))
+        with self.assertRaises(ValidationError):
+            KeysetPagination().get_ordering(requested, queryset, view=None)
+
+        # Not asked for by the client: fall back to the default ordering.
+        ordering = KeysetPagination().get_ordering(Request(factory.get("/api/services/")), queryset, view=None)
+        self.assertEqual([(name, descending) for name, _field, descending, _null in ordering], [("created_at", True), ("pk", True)])
+
+    def test_tampered_cursor_is_404(self):
+        response = self.client.get("/api/services/", {"pagination": "cursor", "cursor": "bm9wZQ"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_decimal_annotation_cursor_compares_as_numbers(self):
+        factory = APIRequestFactory()
+        queryset = Service.objects.annotate(cost=F("price") * 10).order_by("cost")
+        paginator = KeysetPagination()
+        first = paginator.paginate_queryset(queryset, Request(factory.get("/api/services/")))
+
+        # As strings, "700.00" > "1000" and the second page would come back empty.
+        second_request = Request(factory.get(paginator.get_next_link()))
+        paginator = KeysetPagination()
+        second = paginator.paginate_queryset(queryset, second_request)
+        position, _reverse = paginator.decode_cursor(second_request)
+        self.assertIsInstance(position[0], Decimal)
+        expected = list(Service.objects.order_by("price", "pk").values_list("pk", flat=True))
+        self.assertEqual([s.pk for s in first + second], expected[:20])
+
+
+def destination(latitude, longitude, km, bearing_degrees):
+    """The point `km` from a start point along a bearing (spherical earth)."""
+    angular = km / 6371.0
+    lat1, lng1, bearing = map(math.radians, (latitude, longitude, bearing_degrees))
+    lat2 = math.asin(math.sin(lat1) * math.cos(angular) + math.cos(lat1) * math.sin(angular) * math.cos(bearing))
+    lng2 = lng1 + math.atan2(
+        math.sin(bearing) * math.sin(angular) * math.cos(lat1),
+        math.cos(angular) - math.sin(lat1) * math.sin(lat2),
+    )
+    return math.degrees(lat2), math.degrees(lng2)
+
+
+class GeoTests(TestCase):
+    CENTRE = (-25.7479, 28.2293)  # Pretoria
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = get_user_model().objects.create_user("owner", password="x")
+
+    def setUp(self):
+        cache.clear()
+
+    def business(self, km, bearing=90, **kwargs):
+        latitude, longitude = destination(*self.CENTRE, km, bearing)
+        return Business.objects.create(owner=self.owner, name=f"{km} km", latitude=latitude, longitude=longitude, **kwargs)
+
+    def test_encode_geohash(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(encode_geohash(-25.7479, 28.2293), encode_geohash(-25.7479, 28.2293, 12)[:9])
+        self.assertEqual(geohash_for(None, 28.2293), "")
+
+    def test_covering_prefixes_contain_every_point_in_the_radius(self):
+        rng = random.Random(7)
+        for latitude, longitude, radius in [(*self.CENTRE, 5), (*self.CENTRE, 0.5), (64.1, -21.9, 20), (0.01, 179.99, 3)]:
+            prefixes = covering_prefixes(latitude, longitude, radius)
+            for _ in range(200):
+                point = destination(latitude, longitude, rng.uniform(0, radius), rng.uniform(0, 360))
+                self.assertTrue(encode_geohash(*point).startswith(tuple(prefixes)), (latitude, longitude, radius, point))
+
+    def test_haversine_distance(self):
+        business = self.business(0)
+        johannesburg = Business.objects.annotate(km=distance_km_expression(-26.2041, 28.0473)).get(pk=business.pk).km
+        self.assertAlmostEqual(johannesburg, 53.6, delta=0.5)
+
+    def test_radius_filter_is_exact_and_closest_first(self):
+        near, nearer = self.business(4, bearing=200), self.business(1)
+        self.business(6)
+        self.business(4.9, is_active=False)
+        found = within_radius(Business.objects.filter(is_active=True), *self.CENTRE, 5)
+        self.assertEqual(list(found), [nearer, near])
+
+    def test_nearby_cursor_pages_by_distance(self):
+        expected = [self.business(0.2 * (i + 1), bearing=i * 30).pk for i in range(13)]
+        pages, url = [], "/api/businesses/nearby/?lat=-25.7479&lng=28.2293&radius_km=5&pagination=cursor"
+        while url:
+            data = self.client.get(url).json()
+            pages += [row["id"] for row in data["results"]]
+            url = data["next"]
+        self.assertEqual(pages, expected)
+
+    def test_every_write_path_sets_the_geohash(self):
+        created = self.business(1)
+        self.assertEqual(created.geohash, geohash_for(created.latitude, created.longitude))
+
+        [bulk] = Business.objects.bulk_create([Business(owner=self.owner, name="Bulk", latitude=-33.9, longitude=18.4)])
+        Business.objects.filter(pk=bulk.pk).update(latitude=F("latitude") + 1)
+        bulk.refresh_from_db()
+        self.assertEqual(bulk.geohash, encode_geohash(-32.9, 18.4))
+
+        Business.objects.filter(pk=created.pk).update(latitude=None)
+        created.refresh_from_db()
+        self.assertEqual(created.geohash, "")
+
+        created.latitude, created.longitude = -29.8587, 31.0218
+        Business.objects.bulk_update([created], ["latitude", "longitude"])
+        created.refresh_from_db()
+        self.assertEqual(created.geohash, encode_geohash(-29.8587, 31.0218))
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user("owner", password="x")
+        cls.category = Category.objects.create(name="Barbershop", slug="barbershop")
+        cls.business = Business.objects.create(owner=owner, name="Kings")
+        cls.fade = Service.objects.create(business=cls.business, category=cls.category, name="Skin fade", price=80)
+        cls.beard = Service.objects.create(
+            business=cls.business, category=cls.category, name="Beard trim", description="Hot towel and fade", price=60
+        )
+        Service.objects.create(business=cls.business, category=cls.category, name="Manicure", price=90)
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, terms, **params):
+        response = self.client.get("/api/services/", {"search": terms, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_build_search_query_prefix_matches_every_word(self):
+        self.assertEqual(
+            build_search_query(["skin fa", "beard"]),
+            SearchQuery("skin:* & fa:* & beard:*", search_type="raw", config=SEARCH_CONFIG),
+        )
+
+    def test_build_search_query_drops_tsquery_syntax(self):
+        # Quotes and operators would make a raw tsquery invalid (or change its meaning); only words survive.
+        self.assertEqual(
+            build_search_query(["o'neil's", "fade & !(trim | :*)"]),
+            SearchQuery("o:* & neil:* & s:* & fade:* & trim:*", search_type="raw", config=SEARCH_CONFIG),
+        )
+
+    def test_build_search_query_without_words_is_none(self):
+        for terms in [[], [""], ["  "], ["&|!:*'()"]]:
+            self.assertIsNone(build_search_query(terms), terms)
+
+    @skipUnless(connection.vendor != "postgresql", "Postgres searches the vector instead.")
+    def test_search_filter_falls_back_to_icontains(self):
+        self.assertEqual(sorted(self.search("fade")), sorted([self.fade.pk, self.beard.pk]))
+        self.assertEqual(self.search("kings trim"), [self.beard.pk])
+        self.assertEqual(self.search("colour"), [])
+        self.assertEqual(refresh_search_vectors(Service.objects.all()), 0)
+
+    def test_signals_refresh_the_affected_services(self):
+        with mock.patch("catalog.signals.refresh_search_vectors") as refresh:
+            self.fade.save()
+            self.business.save()
+            self.category.save()
+            Business.objects.create(owner=self.business.owner, name="New")
+            Category.objects.create(name="Nails", slug="nails")
+        refreshed = [sorted(queryset.values_list("pk", flat=True)) for (queryset,), _ in refresh.call_args_list]
+        every_service = sorted(Service.objects.values_list("pk", flat=True))
+        # Created businesses and categories have no services to refresh.
+        self.assertEqual(refreshed, [[self.fade.pk], every_service, every_service])
+
+    def vector(self, service):
+        return str(Service.objects.values_list("search_vector", flat=True).get(pk=service.pk))
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs Postgres.")
+    def test_search_filter_ranks_names_above_descriptions(self):
+        self.assertEqual(self.search("fade"), [self.fade.pk, self.beard.pk])
+        self.assertEqual(self.search("fa"), [self.fade.pk, self.beard.pk])
+        self.assertEqual(self.search("kings trim"), [self.beard.pk])
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs Postgres.")
+    def test_explicit_ordering_replaces_the_rank(self):
+        self.assertEqual(self.search("fade", ordering="price"), [self.beard.pk, self.fade.pk])
+
+    @skipUnless(connection.vendor == "postgresql", "Full-text search needs Postgres.")
+    def test_vectors_follow_service_business_and_category_names(self):
+        self.assertIn("'skin':1A", self.vector(self.fade))
+
+        self.business.name = "Royal Cuts"
+        self.business.save()
+        self.category.name = "Grooming"
+        self.category.save()
+        vector = self.vector(self.fade)
+        self.assertIn("'royal'", vector)
+        self.assertIn("'groom'", vector)
+        self.assertNotIn("'king'", vector)
+        self.assertEqual(len(self.search("royal")), 3)
+
+        Service.objects.filter(pk=self.fade.pk).update(name="Buzz cut")
+        refresh_search_vectors(Service.objects.filter(pk=self.fade.pk))
+        self.assertEqual(self.search("buzz"), [self.fade.pk])
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = get_user_model().objects.create_user("owner", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        business = Business.objects.create(owner=cls.owner, name="Kings")
+        for i in range(3):
+            Service.objects.create(business=business, category=category, name=f"Cut {i}", price=50)
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.api.force_authenticate(self.owner)
+
+    def test_plain_first_get_gets_a_validator_to_poll_with(self):
+        first = self.api.get("/api/services/")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        # A deleted row doesn't move MAX(updated_at), so lists don't offer Last-Modified.
+        self.assertNotIn("Last-Modified", first)
+
+        with self.assertNumQueries(1):
+            second = self.api.get("/api/services/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+
+        Service.objects.filter(name="Cut 0").delete()
+        third = self.api.get("/api/services/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third["ETag"], first["ETag"])
+
+    def test_details_keep_last_modified(self):
+        service = Service.objects.first()
+        first = self.api.get(f"/api/services/{service.pk}/")
+        self.assertIn("Last-Modified", first)
+        second = self.api.get(f"/api/services/{service.pk}/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(second.status_code, 304)
+
+    def test_cached_anonymous_responses_replay_their_validators(self):
+        miss = self.client.get("/api/services/")
+        self.assertEqual(miss["X-Cache"], "MISS")
+        self.assertIn("ETag", miss)
+
+        with self.assertNumQueries(0):
+            hit = self.client.get("/api/services/")
+            not_modified = self.client.get("/api/services/", HTTP_IF_NONE_MATCH=miss["ETag"])
+        self.assertEqual((hit["X-Cache"], hit["ETag"]), ("HIT", miss["ETag"]))
+        self.assertEqual(hit.json(), miss.json())
+        self.assertEqual(not_modified.status_code, 304)
+
+
+class CachedResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = get_user_model().objects.create_user("owner", password="x")
+        cls.category = Category.objects.create(name="Barbershop", slug="barbershop")
+        cls.business = Business.objects.create(owner=cls.owner, name="Kings")
+        cls.service = Service.objects.create(business=cls.business, category=cls.category, name="Cut", price=50)
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.api.force_authenticate(self.owner)
+
+    def anonymous(self, path):
+        response = self.client.get(path)
+        return response["X-Cache"], response.json()
+
+    def names(self, data):
+        return [row["name"] for row in data["results"]]
+
+    def write(self, method, path, data=None):
+        # Versions are bumped on commit; run those callbacks as a real commit would.
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.api, method)(path, data, format="json")
+        self.assertLess(response.status_code, 300, getattr(response, "data", None))
+        return response
+
+    def test_writes_invalidate_lists_and_details(self):
+        detail = f"/api/services/{self.service.pk}/"
+        self.assertEqual(self.anonymous("/api/services/")[0], "MISS")
+        self.assertEqual(self.anonymous(detail)[0], "MISS")
+        self.assertEqual(self.anonymous("/api/services/")[0], "HIT")
+        self.assertEqual(self.anonymous(detail)[0], "HIT")
+
+        created = self.write("post", "/api/services/", {
+            "business": self.business.pk, "category": self.category.pk, "name": "Shave", "price": "80.00",
+        })
+        state, data = self.anonymous("/api/services/")
+        self.assertEqual((state, sorted(self.names(data))), ("MISS", ["Cut", "Shave"]))
+
+        self.write("patch", detail, {"name": "Fade"})
+        state, data = self.anonymous(detail)
+        self.assertEqual((state, data["name"]), ("MISS", "Fade"))
+
+        self.write("delete", f"/api/services/{created.data['id']}/")
+        state, data = self.anonymous("/api/services/")
+        self.assertEqual((state, self.names(data)), ("MISS", ["Fade"]))
+
+    def test_expanded_relations_invalidate_too(self):
+        path = "/api/services/?expand=business"
+        self.anonymous(path)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business.name = "Queens"
+            self.business.save()
+        state, data = self.anonymous(path)
+        self.assertEqual((state, data["results"][0]["business"]["name"]), ("MISS", "Queens"))
+
+    def test_rating_updates_invalidate_businesses(self):
+        from engagement.ratings import apply_rating_change
+
+        self.anonymous("/api/businesses/")
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_rating_change(self.business.pk, added=[4])
+        state, data = self.anonymous("/api/businesses/")
+        self.assertEqual((state, data["results"][0]["rating_avg"]), ("MISS", "4.00"))
+
+    def test_authenticated_responses_are_per_user_and_never_shared(self):
+        self.anonymous("/api/services/")
+
+        # An owner is neither served the anonymous copy nor writes one.
+        owner = self.api.get("/api/services/")
+        self.assertNotIn("X-Cache", owner)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.anonymous("/api/services/")[0], "HIT")
+
+        # Validators differ per user, so one user's ETag never revalidates another's copy.
+        other = APIClient()
+        other.force_authenticate(get_user_model().objects.create_user("other", password="x"))
+        theirs = other.get("/api/services/", HTTP_IF_NONE_MATCH=owner["ETag"])
+        self.assertEqual(theirs.status_code, 200)
+        self.assertNotEqual(theirs["ETag"], owner["ETag"])
+
+
+class RowPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from engagement.models import Message, Review
+        from transactions.models import Booking, Payment
+
+        User = get_user_model()
+        owner = User.objects.create_user("owner", password="x")
+        client = User.objects.create_user("client", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop", description="Cuts")
+        rated = Business.objects.create(
+            owner=owner, name="Kings", latitude=-25.7479, longitude=28.2293,
+            rating_avg=Decimal("4.50"), rating_count=2, rating_histogram={"4": 1, "5": 1},
+        )
+        Business.objects.create(owner=owner, name="Queens")
+        service = Service.objects.create(business=rated, category=category, name="Fade", price=Decimal("99.90"))
+        Service.objects.create(business=rated, category=category, name="Shave", price=50, duration_minutes=30, is_available=False)
+        booking = Booking.objects.create(
+            service=service, client=client, scheduled_at=timezone.now() - timedelta(days=1), status=Booking.Status.COMPLETED,
+        )
+        Payment.objects.create(booking=booking, amount=Decimal("99.90"), payment_status="completed", payment_date=timezone.now())
+        Review.objects.create(booking=booking, business=rated, client=client, rating=5, comment="Great")
+        Message.objects.create(sender=client, recipient=owner, business=rated, message_body="Hi")
+
+    def assertRendersLikeSerializer(self, serializer_class, queryset):
+        serializer = serializer_class(context={})
+        plan = compile_row_plan(serializer, queryset)
+        self.assertIsNotNone(plan, serializer_class.__name__)
+        rows = queryset.order_by("pk").values(*plan.sources)
+        expected = serializer_class(queryset.order_by("pk"), many=True, context={}).data
+        self.assertEqual(plan.render(rows), [dict(item) for item in expected], serializer_class.__name__)
+
+    def test_values_rows_render_like_the_serializer(self):
+        from engagement.models import Message, Review
+        from engagement.serializers import MessageSerializer, ReviewSerializer
+        from transactions.models import Booking, Payment
+        from transactions.serializers import BookingSerializer, PaymentSerializer
+
+        for serializer_class, queryset in [
+            (CategorySerializer, Category.objects.all()),
+            (BusinessSerializer, Business.objects.all()),
+            (ServiceSerializer, Service.objects.defer("search_vector")),
+            (BookingSerializer, Booking.objects.all()),
+            (PaymentSerializer, Payment.objects.all()),
+            (ReviewSerializer, Review.objects.all()),
+            (MessageSerializer, Message.objects.all()),
+        ]:
+            self.assertRendersLikeSerializer(serializer_class, queryset)
+
+    def test_fast_list_matches_the_regular_path(self):
+        for path in ["/api/services/", "/api/businesses/?fields=id,name,rating_avg,rating_histogram"]:
+            cache.clear()
+            fast_response = self.client.get(path).json()
+            cache.clear()
+            with mock.patch("common.fast.compile_row_plan", return_value=None):
+                regular = self.client.get(path).json()
+            self.assertEqual(fast_response, regular, path)
+
+    def test_plan_memo_is_bounded(self):
+        with mock.patch.object(fast, "PLAN_CACHE_SIZE", 2), mock.patch.object(fast, "_plans", type(fast._plans)()):
+            for fields in ["id", "id,name", "id,name,price", "name"]:
+                serializer = ServiceSerializer(context={})
+                for name in set(serializer.fields) - set(fields.split(",")):
+                    serializer.fields.pop(name)
+                compile_row_plan(serializer, Service.objects.all())
+            self.assertEqual(len(fast._plans), 2)
+            self.assertEqual([len(key[2]) for key in fast._plans], [3, 1])
+
+
+class LoadTestSeedingTests(TestCase):
+    def seed(self, **options):
+        call_command(
+            "seed", "--load-test", "--users=20", "--businesses=4", "--services=6", "--bookings=400",
+            "--reviews=30", "--messages=10", "--batch-size=64", **options, stdout=io.StringIO(),
+        )
+
+    def test_counts_and_reruns_need_reset(self):
+        from engagement.models import Message, Review
+        from transactions.models import Booking, Payment
+
+        self.seed()
+        self.assertEqual(Service.objects.count(), 6)
+        self.assertEqual(Booking.objects.count(), 400)
+        self.assertEqual(Payment.objects.count(), 400)
+        self.assertEqual(Review.objects.count(), 30)
+        self.assertEqual(Message.objects.count(), 10)
+        self.assertFalse(Business.objects.filter(geohash="").exists())
+        with self.assertRaises(CommandError):
+            self.seed()
+
+    def test_bookings_fit_opening_hours_without_overlapping(self):
+        from transactions.availability import DEFAULT_OPENING_HOURS
+        from transactions.models import Booking
+
+        self.seed()
+        previous = {}
+        for booking in Booking.objects.select_related("service").order_by("service", "scheduled_at"):
+            self.assertEqual(booking.ends_at - booking.scheduled_at, timedelta(minutes=booking.service.duration_minutes))
+            start, end = timezone.localtime(booking.scheduled_at), timezone.localtime(booking.ends_at)
+            self.assertEqual(start.minute % 15, 0)
+            opens, closes = DEFAULT_OPENING_HOURS[start.weekday()]
+            self.assertTrue(opens <= start.time() and end.date() == start.date() and end.time() <= closes, booking)
+            self.assertLessEqual(previous.get(booking.service_id, booking.scheduled_at), booking.scheduled_at)
+            previous[booking.service_id] = booking.ends_at
+
+    def test_bookings_span_the_year(self):
+        from transactions.models import Booking
+
+        self.seed()
+        starts = Booking.objects.values_list("scheduled_at", flat=True)
+        first, last = starts.order_by("scheduled_at")[0], starts.order_by("-scheduled_at")[0]
+        self.assertLess(first, timezone.now() - timedelta(days=300))
+        self.assertGreater(last, timezone.now() - timedelta(days=60))
+
+    def test_same_seed_same_schedule(self):
+        def schedule(seed):
+            seeder = LoadTestSeeder(seed=seed, batch_size=50)
+            services = [(i, i, Decimal(100), timedelta(minutes=45)) for i in range(3)]
+            with mock.patch("catalog.seeding.Booking.objects.bulk_create") as insert, \
+                    mock.patch("catalog.seeding.Payment.objects.bulk_create"), \
+                    mock.patch("catalog.seeding.Review.objects.bulk_create"):
+                seeder.bookings(120, services, client_ids=[1, 2], reviews=0)
+            return [(b.service_id, b.scheduled_at) for call in insert.call_args_list for b in call.args[0]]
+
+        self.assertEqual(schedule(7), schedule(7))
+        self.assertNotEqual(schedule(7), schedule(8))
+
+
+@override_settings(INSTRUMENTATION={**settings.INSTRUMENTATION, "SAMPLE_RATE": 1.0, "PUBLIC_SERVER_TIMING": False})
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.staff = User.objects.create_user("staff", password="x", is_staff=True)
+        cls.user = User.objects.create_user("user", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        business = Business.objects.create(owner=cls.user, name="Kings")
+        cls.service = Service.objects.create(business=business, category=category, name="Fade", price=90)
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.slow_requests.clear()
+        self.api = APIClient()
+
+    def get(self, path, user=None):
+        """GET `path` and return the response with the request's RequestProfile."""
+        profiles = []
+
+        class RecordingProfile(instrumentation.RequestProfile):
+            def __init__(self):
+                super().__init__()
+                profiles.append(self)
+
+        if user is not None:
+            self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        with mock.patch.object(instrumentation, "RequestProfile", RecordingProfile):
+            response = self.api.get(path)
+        return response, profiles[0] if profiles else None
+
+    def timings(self, response):
+        return {
+            name: dict(part.split("=", 1) for part in rest)
+            for name, *rest in (entry.split(";") for entry in response["Server-Timing"].split(", "))
+        }
+
+    def test_staff_get_server_timing_with_query_count(self):
+        response, profile = self.get(f"/api/services/{self.service.pk}/", self.staff)
+        timings = self.timings(response)
+        self.assertEqual(set(timings), {"db", "serialize", "view", "app"})
+        self.assertEqual(timings["db"]["desc"], f'"{profile.queries} queries"')
+        self.assertGreater(profile.queries, 0)
+
+    def test_server_timing_is_staff_only_unless_public(self):
+        for user in [None, self.user]:
+            response, profile = self.get("/api/services/", user)
+            self.assertIsNotNone(profile)
+            self.assertNotIn("Server-Timing", response)
+        with override_settings(INSTRUMENTATION={**settings.INSTRUMENTATION, "PUBLIC_SERVER_TIMING": True}):
+            response = APIClient().get("/api/services/")
+        self.assertIn("Server-Timing", response)
+
+    def test_serialize_span_covers_serializers_fast_path_and_encoding(self):
+        paths = [
+            f"/api/services/{self.service.pk}/",  # ModelSerializer
+            "/api/services/",  # row plan
+            "/api/services/?expand=business",  # no row plan: ModelSerializer per row
+        ]
+        for path in paths:
+            with mock.patch.object(instrumentation.MeasuredSerializerMixin, "to_representation", autospec=True,
+                                   side_effect=instrumentation.MeasuredSerializerMixin.to_representation) as rendered:
+                response, profile = self.get(path, self.user)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertIn("serialize", profile.spans, path)
+            self.assertEqual(rendered.called, path != "/api/services/", path)
+
+    def test_nested_serializers_are_not_counted_twice(self):
+        profile = instrumentation.RequestProfile()
+        token = instrumentation._current.set(profile)
+        try:
+            with mock.patch.object(instrumentation.time, "perf_counter", side_effect=[0.0, 1.0, 2.0, 3.0]):
+                with instrumentation.measure("serialize"):
+                    with instrumentation.measure("serialize"):
+                        pass
+                    with instrumentation.measure("view"):
+                        pass
+        finally:
+            instrumentation._current.reset(token)
+        self.assertEqual(profile.spans, {"view": 1.0, "serialize": 3.0})
+
+    def test_db_span_under_asgi(self):
+        token = AccessToken.for_user(self.staff)
+        response = async_to_sync(AsyncClient().get)("/api/services/", headers={"Authorization": f"Bearer {token}"})
+        queries = int(self.timings(response)["db"]["desc"].strip('"').split()[0])
+        self.assertGreater(queries, 0)
+        self.assertEqual(instrumentation.slow_requests.entries()[0]["queries"], queries)
+
+    def test_unsampled_requests_are_untouched(self):
+        with override_settings(INSTRUMENTATION={**settings.INSTRUMENTATION, "SAMPLE_RATE": 0}):
+            response, profile = self.get(f"/api/services/{self.service.pk}/", self.staff)
+        self.assertIsNone(profile)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(instrumentation.slow_requests.entries(), [])
+
+    def test_repeated_statements_are_logged(self):
+        with override_settings(INSTRUMENTATION={**settings.INSTRUMENTATION, "N_PLUS_ONE_THRESHOLD": 1}):
+            with self.assertLogs("common.instrumentation", "WARNING") as logs:
+                self.get("/api/services/", self.user)
+        self.assertIn("Possible N+1 on GET /api/services/", logs.output[0])
+
+    def test_slow_request_log_is_admin_only(self):
+        self.get("/api/services/")
+        self.get("/api/categories/")
+        self.assertEqual(self.get("/api/admin/slow-requests/", self.user)[0].status_code, 403)
+
+        response, _profile = self.get("/api/admin/slow-requests/", self.staff)
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"]
+        self.assertLessEqual({"/api/services/", "/api/categories/"}, {entry["path"] for entry in results})
+        self.assertEqual(results, sorted(results, key=lambda entry: -entry["total_ms"]))
+        self.assertEqual(self.api.delete("/api/admin/slow-requests/").status_code, 204)
+        # Only the DELETE itself, recorded after it ran.
+        self.assertEqual([entry["method"] for entry in instrumentation.slow_requests.entries()], ["DELETE"])
+
+    def test_slow_log_keeps_the_slowest(self):
+        log = instrumentation.SlowRequestLog(2)
+        for duration in [0.3, 0.1, 0.5, 0.2]:
+            log.add(duration, duration)
+        self.assertEqual(log.entries(), [0.5, 0.3])
@@ -1,4 +1,6 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
+from .async_views import AsyncBusinessView, AsyncCategoryView, AsyncServiceView
 from .views import BusinessViewSet, CategoryViewSet, ServiceViewSet
 
 router = DefaultRouter()
@@ -6,4 +8,14 @@ router.register(r"categories", CategoryViewSet)
 router.register(r"businesses", BusinessViewSet)
 router.register(r"services", ServiceViewSet)
 
-urlpatterns = router.urls
+# Native async read path (list/retrieve only); pays off under an ASGI server.
+async_urlpatterns = [
+    path("async/categories/", AsyncCategoryView.as_view(), name="async-category-list"),
+    path("async/categories/<int:pk>/", AsyncCategoryView.as_view(), name="async-category-detail"),
+    path("async/businesses/", AsyncBusinessView.as_view(), name="async-business-list"),
+    path("async/businesses/<int:pk>/", AsyncBusinessView.as_view(), name="async-business-detail"),
+    path("async/services/", AsyncServiceView.as_view(), name="async-service-list"),
+    path("async/services/<int:pk>/", AsyncServiceView.as_view(), name="async-service-detail"),
+]
+
+urlpatterns = router.urls + async_urlpatterns
@@ -1,33 +1,123 @@
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter, SearchFilter
+from .geo import within_radius
 from .models import Business, Category, Service
-from .serializers import BusinessSerializer, CategorySerializer, ServiceSerializer
+from .search import ServiceSearchFilter
+from .serializers import (
+    AvailabilityQuerySerializer,
+    BusinessSerializer,
+    CategorySerializer,
+    NearbyBusinessSerializer,
+    NearbyQuerySerializer,
+    NearbyServiceSerializer,
+    ServiceSerializer,
+    StatsQuerySerializer,
+)
+from common.cache import CachedResponseMixin
+from common.conditional import ConditionalGetMixin
+from common.expand import ExpandMixin
+from common.fast import FastListMixin
+from common.filters import NullsLastOrderingFilter
 from common.permissions import IsStaffOrReadOnly
+from common.sparse import SparseFieldsMixin
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from transactions.availability import free_slots, service_duration
+from transactions.stats import business_stats
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+def nearby_response(view, queryset, prefix=""):
+    """Shared body of the `nearby` actions: validate ?lat&lng&radius_km, then page by distance."""
+    params = NearbyQuerySerializer(data=view.request.query_params)
+    params.is_valid(raise_exception=True)
+
+    queryset = within_radius(
+        queryset,
+        params.validated_data["lat"],
+        params.validated_data["lng"],
+        params.validated_data["radius_km"],
+        prefix=prefix,
+    )
+    page = view.paginate_queryset(queryset)
+    if page is not None:
+        return view.get_paginated_response(view.get_serializer(page, many=True).data)
+    return Response(view.get_serializer(queryset, many=True).data)
+
+
+class CategoryViewSet(SparseFieldsMixin, ExpandMixin, CachedResponseMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsStaffOrReadOnly]
 
 
-class BusinessViewSet(viewsets.ModelViewSet):
+class BusinessViewSet(SparseFieldsMixin, ExpandMixin, CachedResponseMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Business.objects.all()
     serializer_class = BusinessSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsStaffOrReadOnly]
 
+    filter_backends = [DjangoFilterBackend, NullsLastOrderingFilter, SearchFilter]
+    ordering_fields = [
+        "id", "owner", "name", "description", "phone_number", "address", "city", "area",
+        "rating_avg", "rating_count", "is_active", "created_at", "updated_at",
+    ]
+    sparse_fields_actions = ("list", "retrieve", "nearby")
+
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+    @action(detail=False, methods=["get"], serializer_class=NearbyBusinessSerializer)
+    def nearby(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).filter(is_active=True)
+        return nearby_response(self, queryset)
+
+    @action(detail=True, methods=["get"], permission_classes=[permissions.IsAuthenticated])
+    def stats(self, request, pk=None):
+        params = StatsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
 
-class ServiceViewSet(viewsets.ModelViewSet):
-    queryset = Service.objects.select_related("business", "category").all()
+        business = self.get_object()
+        if not (request.user.is_staff or business.owner_id == request.user.pk):
+            raise PermissionDenied("You can only view stats for your own business.")
+        return Response(business_stats(business, params.validated_data["start"], params.validated_data["end"]))
+
+
+class ServiceViewSet(SparseFieldsMixin, ExpandMixin, CachedResponseMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
+    queryset = Service.objects.select_related("business", "category").defer("search_vector")
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    filter_backends = [DjangoFilterBackend, OrderingFilter, ServiceSearchFilter]
     filterset_fields = ["category", "business", "is_available"]
     search_fields = ["name", "description", "business__name"]
     ordering_fields = ["price", "created_at"]
     ordering = ["-created_at"]
+    sparse_fields_actions = ("list", "retrieve", "nearby")
+
+    @action(detail=False, methods=["get"], serializer_class=NearbyServiceSerializer)
+    def nearby(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            is_available=True,
+            business__is_active=True,
+        )
+        return nearby_response(self, queryset, prefix="business__")
+
+    @action(detail=True, methods=["get"])
+    def availability(self, request, pk=None):
+        params = AvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        day = params.validated_data.get("date") or timezone.localdate()
+
+        service = self.get_object()
+        slots = free_slots(service, day)
+        return Response({
+            "service": service.pk,
+            "date": day,
+            "duration_minutes": int(service_duration(service).total_seconds() // 60),
+            "slots": [{"start": start, "end": end} for start, end in slots],
+        })
 
     def perform_create(self, serializer):
         business = serializer.validated_data["business"]
@@ -0,0 +1,124 @@
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves pks from objects loaded up front instead of one query per item."""
+
+    def __init__(self, objects, model, **kwargs):
+        self.objects = objects
+        super().__init__(queryset=model.objects.none(), **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.objects[int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """ListSerializer that validates items independently, so one bad item doesn't sink the batch."""
+
+    def validate_items(self):
+        """Return one `(validated_data, errors)` pair per item; exactly one of them is None."""
+        results = []
+        for item in self.initial_data:
+            try:
+                results.append((self.child.run_validation(item), None))
+            except ValidationError as exc:
+                results.append((None, exc.detail))
+        return results
+
+
+def collect_pks(items, field_name):
+    """Integer pks referenced by `field_name` across raw items (malformed values are skipped)."""
+    pks = set()
+    for item in items:
+        if not isinstance(item, dict) or isinstance(item.get(field_name), bool):
+            continue
+        try:
+            pks.add(int(item.get(field_name)))
+        except (TypeError, ValueError):
+            continue
+    return pks
+
+
+class BulkCreateMixin:
+    """
+    `POST <list-url>/bulk/` taking a JSON array of up to `bulk_max_items` items.
+
+    Items are validated with a list serializer whose related fields resolve
+    against objects prefetched in one query (`get_bulk_prefetch`), and the
+    valid ones are inserted by `perform_bulk_create` (normally a single
+    `bulk_create`) inside one transaction. Each item gets its own result:
+    201 with the created object, or 400 with its errors. The response is 201
+    if every item was created, 400 if none was, and 207 otherwise.
+    """
+
+    bulk_max_items = 100
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        return self.bulk_create(request)
+
+    def bulk_create(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"non_field_errors": ["Expected a non-empty list of items."]})
+        if len(items) > self.bulk_max_items:
+            raise ValidationError({"non_field_errors": [f"At most {self.bulk_max_items} items per request."]})
+
+        with transaction.atomic():
+            child = self.get_serializer()
+            for field_name, (model, objects) in self.get_bulk_prefetch(items).items():
+                child.fields[field_name] = PrefetchedPrimaryKeyRelatedField(objects, model)
+            serializer = BulkListSerializer(child=child, data=items, context=self.get_serializer_context())
+
+            validated = serializer.validate_items()
+            valid = [(index, data) for index, (data, errors) in enumerate(validated) if errors is None]
+            outcomes = self.perform_bulk_create(valid) if valid else {}
+
+        results = []
+        for index, (_data, errors) in enumerate(validated):
+            outcome = errors if errors is not None else outcomes[index]
+            if isinstance(outcome, dict):
+                results.append({"index": index, "status": status.HTTP_400_BAD_REQUEST, "errors": outcome})
+            else:
+                results.append({"index": index, "status": status.HTTP_201_CREATED, "data": self.get_serializer(outcome).data})
+
+        created = sum(1 for result in results if result["status"] == status.HTTP_201_CREATED)
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created == 0:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+
+        return Response(
+            {"created": created, "failed": len(results) - created, "results": results},
+            status=response_status,
+        )
+
+    def get_bulk_prefetch(self, items):
+        """Return `{field_name: (model, {pk: obj})}` for related fields to resolve in bulk."""
+        return {}
+
+    def perform_bulk_create(self, valid_items):
+        """
+        Create the validated items. `valid_items` is a list of `(index, validated_data)`;
+        return `{index: instance}`, or `{index: errors_dict}` for items rejected here.
+
+        By default every item is inserted as validated, with one `bulk_create`
+        (so no `save()` or signals); override to add checks or side effects.
+        """
+        model = self.get_queryset().model
+        instances = {index: model(**data) for index, data in valid_items}
+        model._default_manager.bulk_create(instances.values())
+        return instances
@@ -0,0 +1,140 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+CACHE_ALIAS = "default"
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def version_key(model):
+    return f"api-version:{model._meta.label_lower}"
+
+
+def get_cache_versions(models):
+    """
+    Current version number of each model, in order.
+
+    Missing counters (never set, or evicted by LRU) are seeded from the clock
+    rather than 0, so a reset counter can never line up with an older cached
+    response again.
+    """
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_cache_versions(models):
+    """Async twin of `get_cache_versions`, for the native async views."""
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def response_cache_key(path, query_params, versions):
+    """Cache key for a response, from the path, the sorted query string and the model versions."""
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in query_params.lists()
+        for value in values
+    ))
+    raw = f"{path}?{query}|{'.'.join(str(v) for v in versions)}"
+    return "api-response:" + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def bump_cache_version(model):
+    """Invalidate every cached response that depends on `model`."""
+    cache = get_cache()
+    key = version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    post_save / post_delete receiver.
+
+    Bumps after commit; bumping earlier would let a concurrent read cache the
+    pre-commit rows under the new version.
+    """
+    transaction.on_commit(lambda: bump_cache_version(sender))
+
+
+class CachedResponseMixin:
+    """
+    Read-through cache for anonymous list/retrieve responses.
+
+    Entries are keyed on the path, the normalized query string and the
+    version counters of `queryset.model` plus `cache_dependencies`. Writes
+    bump the counters (see `invalidate_cached_responses`), which orphans old
+    entries; the cache backend's own LRU/expiry reclaims them.
+
+    The ETag / Last-Modified validators are stored with each entry, so a hit
+    (including a 304 for a matching conditional request) runs no queries.
+    List it before ConditionalGetMixin so hits are served ahead of it and
+    misses ask it for validators to store.
+    """
+
+    cache_dependencies = ()
+    cache_timeout = 300
+    cached_headers = ("ETag", "Last-Modified", "Vary")
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def is_authenticated(self, request):
+        return bool(request.user and request.user.is_authenticated)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.is_authenticated(request):
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            last_modified = parse_http_date_safe(headers.get("Last-Modified", ""))
+            response = get_conditional_response(
+                request._request, etag=headers.get("ETag"), last_modified=last_modified,
+            ) or Response(data)
+            for name, value in headers.items():
+                response[name] = value
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {name: response[name] for name in self.cached_headers if response.has_header(name)}
+            cache.set(key, (response.data, headers), self.cache_timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def get_cache_models(self):
+        return (self.get_queryset().model, *self.cache_dependencies)
+
+    def get_response_cache_key(self, request):
+        return response_cache_key(request.path, request.query_params, get_cache_versions(self.get_cache_models()))
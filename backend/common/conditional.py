@@ -0,0 +1,120 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def latest(*stamps):
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def related_stamps(instance, path, field):
+    """`field` of every object reached from `instance` along `path` (already loaded by the plan)."""
+    objects = [instance]
+    for name in path:
+        reached = []
+        for obj in objects:
+            value = getattr(obj, name, None)
+            if value is None:
+                continue
+            if hasattr(value, "all"):
+                reached.extend(value.all())
+            else:
+                reached.append(value)
+        objects = reached
+    return [getattr(obj, field) for obj in objects]
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified validators for list and retrieve.
+
+    Lists are validated with one `MAX(updated_at), COUNT(*)` query over the
+    filtered queryset (any insert, update or delete moves one of the two) and
+    carry only an ETag: a delete leaves `MAX(updated_at)` where it was, so a
+    list `Last-Modified` would answer `If-Modified-Since` with a stale 304.
+    Details use the object's own `updated_at` for both validators. Relations
+    embedded in the response (see `get_validator_relations`) feed their
+    `updated_at` into the same validators. A matching `If-None-Match` /
+    `If-Modified-Since` gets a 304 before any page is fetched or serialized.
+    """
+
+    last_modified_field = "updated_at"
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        relations = self.get_validator_relations()
+        aggregates = {
+            f"m{i}": Max(f"{lookup}__{self.last_modified_field}")
+            for i, (lookup, _many) in enumerate(relations)
+        }
+        state = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field),
+            # Joins to to-many relations repeat rows; count the rows themselves.
+            count=Count("pk", distinct=any(many for _lookup, many in relations)),
+            **aggregates,
+        )
+        return self.conditional_response(
+            request,
+            latest(state["last_modified"], *(state[name] for name in aggregates)),
+            state["count"],
+            super().list,
+            *args,
+            send_last_modified=False,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        stamps = [getattr(instance, self.last_modified_field)]
+        for lookup, _many in self.get_validator_relations():
+            stamps.extend(related_stamps(instance, lookup.split("__"), self.last_modified_field))
+        return self.conditional_response(
+            request,
+            latest(*stamps),
+            instance.pk,
+            super().retrieve,
+            *args,
+            **kwargs,
+        )
+
+    def get_validator_relations(self):
+        """`[(lookup, many)]` of related rows rendered into the response."""
+        return []
+
+    def get_object(self):
+        # retrieve() looks the object up once for the validators; reuse it.
+        if getattr(self, "_conditional_object", None) is None:
+            self._conditional_object = super().get_object()
+        return self._conditional_object
+
+    def conditional_response(self, request, last_modified, discriminator, handler, *args,
+                             send_last_modified=True, **kwargs):
+        etag = self.make_etag(request, last_modified, discriminator)
+        last_modified_ts = int(last_modified.timestamp()) if last_modified and send_last_modified else None
+
+        not_modified = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=last_modified_ts,
+        )
+        response = not_modified or handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified_ts is not None:
+                response["Last-Modified"] = http_date(last_modified_ts)
+            patch_vary_headers(response, ["Authorization"])
+        return response
+
+    def make_etag(self, request, last_modified, discriminator):
+        user_id = request.user.pk if request.user and request.user.is_authenticated else ""
+        raw = "|".join([
+            request.get_full_path(),
+            str(user_id),
+            last_modified.isoformat() if last_modified else "",
+            str(discriminator),
+        ])
+        return "W/" + quote_etag(hashlib.sha1(raw.encode()).hexdigest())
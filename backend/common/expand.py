@@ -0,0 +1,219 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+logger = logging.getLogger(__name__)
+
+MAX_EXPAND_DEPTH = 3
+
+
+class QueryBudgetExceeded(Exception):
+    """An `?expand=` read ran more queries than its budget allows."""
+
+
+class ExpandableFieldsMixin:
+    """
+    Serializer side of `?expand=`.
+
+    `Meta.expandable_fields` maps a relation field to the serializer that
+    embeds it, e.g. `{"business": BusinessSerializer}`. The expansion tree
+    comes from the `expand` kwarg (nested serializers) or `context["expand"]`
+    (the root serializer), and each named field is swapped for a read-only
+    nested serializer that receives its own subtree. Leaf serializers don't
+    need the mixin.
+    """
+
+    def __init__(self, *args, expand=None, **kwargs):
+        self._expand = expand
+        super().__init__(*args, **kwargs)
+
+    def get_expand_tree(self):
+        if self._expand is not None:
+            return self._expand
+        is_root = self.parent is None or (self.parent is self.root and isinstance(self.parent, ListSerializer))
+        if not is_root:
+            # Nested without an explicit subtree: the root's tree doesn't apply here.
+            return {}
+        return self.context.get("expand") or {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        opts = self.Meta.model._meta
+        for name, subtree in self.get_expand_tree().items():
+            relation = opts.get_field(name)
+            kwargs = {"read_only": True, "many": relation.one_to_many or relation.many_to_many}
+            if subtree:
+                kwargs["expand"] = subtree
+            fields[name] = resolve_serializer(expandable[name])(**kwargs)
+        return fields
+
+
+def resolve_serializer(target):
+    """Expandable targets may be given as classes or, to break import cycles, dotted paths."""
+    if isinstance(target, str):
+        return import_string(target)
+    return target
+
+
+def parse_expand(value):
+    """Turn `"service.business,client"` into `{"service": {"business": {}}, "client": {}}`."""
+    tree = {}
+    for path in value.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def validate_expand(tree, serializer_class, path=()):
+    """Reject names the serializer doesn't declare as expandable, and overly deep paths."""
+    expandable = getattr(getattr(serializer_class, "Meta", None), "expandable_fields", {})
+    for name, subtree in tree.items():
+        dotted = ".".join([*path, name])
+        if len(path) >= MAX_EXPAND_DEPTH:
+            raise ValidationError({"expand": f"'{dotted}' is nested too deeply."})
+        if name not in expandable:
+            raise ValidationError({"expand": f"'{dotted}' cannot be expanded."})
+        validate_expand(subtree, resolve_serializer(expandable[name]), (*path, name))
+
+
+def relation_plan(model, tree, prefix="", prefetched=False):
+    """
+    Walk the expansion tree over the model graph.
+
+    Returns `(select_related, prefetch_related, relations)`: forward FK and
+    one-to-one chains are joined in with `select_related`, anything
+    to-many (and everything below it) goes through `prefetch_related`.
+    `relations` is `[(lookup, model, many)]` for every expanded node.
+    """
+    select, prefetch, relations = [], [], []
+    for name, subtree in tree.items():
+        field = model._meta.get_field(name)
+        if not field.is_relation:
+            raise ImproperlyConfigured(f"{model.__name__}.{name} is not a relation and can't be expanded.")
+        lookup = prefix + name
+        many = prefetched or field.many_to_many or field.one_to_many
+        (prefetch if many else select).append(lookup)
+        relations.append((lookup, field.related_model, many))
+
+        child_select, child_prefetch, child_relations = relation_plan(
+            field.related_model, subtree, prefix=lookup + "__", prefetched=many,
+        )
+        select.extend(child_select)
+        prefetch.extend(child_prefetch)
+        relations.extend(child_relations)
+    return select, prefetch, relations
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class ExpandMixin:
+    """
+    `?expand=a,b.c` for viewsets whose serializer uses ExpandableFieldsMixin.
+
+    The expansion is validated against the serializer, turned into a
+    `select_related` / `prefetch_related` plan on the filtered queryset, and
+    handed to the serializer through its context. Expansion only applies to
+    reads, so writes keep accepting plain primary keys. Each list/retrieve is held
+    to `expand_query_budget` queries plus one per prefetched relation; going
+    over means a relation slipped through the plan (an N+1). With
+    `EXPAND_STRICT_QUERY_BUDGET` (the default under DEBUG and in tests) that
+    raises QueryBudgetExceeded; otherwise it is logged as a warning and the
+    response is still served.
+    """
+
+    expand_query_param = "expand"
+    # ETag aggregate + COUNT + page (or the object lookup on detail routes).
+    expand_query_budget = 3
+
+    def get_expand_tree(self):
+        if not hasattr(self, "_expand_tree"):
+            request = self.request
+            raw = ""
+            if request is not None and request.method in SAFE_METHODS:
+                raw = request.query_params.get(self.expand_query_param, "")
+            tree = parse_expand(raw)
+            if tree:
+                validate_expand(tree, self.get_serializer_class())
+            self._expand_tree = tree
+        return self._expand_tree
+
+    def get_expand_plan(self):
+        if not hasattr(self, "_expand_plan"):
+            self._expand_plan = relation_plan(self.get_queryset().model, self.get_expand_tree())
+        return self._expand_plan
+
+    def get_expanded_relations(self):
+        return self.get_expand_plan()[2]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand_tree()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.get_expand_tree():
+            return queryset
+        select, prefetch, _relations = self.get_expand_plan()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def get_cache_models(self):
+        return (*super().get_cache_models(), *(model for _lookup, model, _many in self.get_expanded_relations()))
+
+    def get_validator_relations(self):
+        # Only relations that track their own modification time can move the validators.
+        field = getattr(self, "last_modified_field", "updated_at")
+        return [
+            (lookup, many)
+            for lookup, model, many in self.get_expanded_relations()
+            if any(f.name == field for f in model._meta.concrete_fields)
+        ]
+
+    def list(self, request, *args, **kwargs):
+        return self.within_query_budget(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.within_query_budget(super().retrieve, request, *args, **kwargs)
+
+    def within_query_budget(self, handler, request, *args, **kwargs):
+        if not self.get_expand_tree():
+            return handler(request, *args, **kwargs)
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = handler(request, *args, **kwargs)
+
+        budget = self.expand_query_budget + len(self.get_expand_plan()[1])
+        if counter.count > budget:
+            message = "%s ran %s queries for ?expand=%s (budget %s)." % (
+                type(self).__name__,
+                counter.count,
+                request.query_params.get(self.expand_query_param),
+                budget,
+            )
+            if getattr(settings, "EXPAND_STRICT_QUERY_BUDGET", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
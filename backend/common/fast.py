@@ -0,0 +1,116 @@
+from collections import OrderedDict
+
+from rest_framework import serializers
+from rest_framework.response import Response
+from .instrumentation import measure
+from .pagination import ordering_columns
+
+# Fields whose to_representation is a no-op for values already coming out of
+# the database driver, so the fast path can copy them straight through.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.ReadOnlyField,
+)
+
+UNSUPPORTED_FIELDS = (
+    serializers.BaseSerializer,
+    serializers.HiddenField,
+    serializers.ManyRelatedField,
+    serializers.SerializerMethodField,
+)
+
+# Plans are keyed on the rendered field set, which `?fields=` lets clients
+# vary, so the memo is an LRU bounded at this many entries.
+PLAN_CACHE_SIZE = 512
+_plans = OrderedDict()
+
+
+class RowPlan:
+    """Render `.values()` rows exactly as `serializer.to_representation` would render instances."""
+
+    def __init__(self, columns):
+        # [(output_name, column, converter_or_None)]
+        self.columns = columns
+        self.sources = [column for _name, column, _convert in columns]
+
+    def render(self, rows):
+        columns = self.columns
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in columns:
+                value = row[column]
+                item[name] = convert(value) if convert is not None and value is not None else value
+            data.append(item)
+        return data
+
+
+def compile_row_plan(serializer, queryset):
+    """
+    Build (and memoize) a RowPlan for `serializer`, or return None when some
+    readable field has no plain column behind it (method fields, nested
+    serializers, dotted sources) and the regular serializer must be used.
+    """
+    fields = list(serializer._readable_fields)
+    # Field classes are part of the key: ?expand= swaps a pk field for a nested serializer.
+    key = (type(serializer), queryset.model, tuple((field.field_name, type(field)) for field in fields))
+    try:
+        _plans.move_to_end(key)
+        return _plans[key]
+    except KeyError:
+        pass
+
+    model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+    columns = []
+    for field in fields:
+        source = field.source
+        if isinstance(field, UNSUPPORTED_FIELDS) or source == "*" or "." in source:
+            columns = None
+            break
+        if source not in model_fields and source not in queryset.query.annotations:
+            columns = None
+            break
+        convert = None if isinstance(field, PASSTHROUGH_FIELDS) else field.to_representation
+        columns.append((field.field_name, source, convert))
+
+    plan = RowPlan(columns) if columns is not None else None
+    # Annotation-backed plans depend on the queryset, so only cache plain ones.
+    if plan is None or all(source in model_fields for source in plan.sources):
+        _plans[key] = plan
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+class FastListMixin:
+    """
+    Read-only fast path for `list`.
+
+    Rows are fetched with `.values()` and rendered by a plan compiled once per
+    serializer, skipping model instantiation and per-row ModelSerializer
+    machinery. The JSON is identical to `serializer_class`; serializers the
+    plan can't express fall back to the regular path.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = compile_row_plan(self.get_serializer(), queryset)
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        # Keep the pk, sort columns and annotations (e.g. search_rank) around for keyset cursors.
+        extra = [queryset.model._meta.pk.attname, *ordering_columns(queryset, self), *queryset.query.annotations]
+        rows = queryset.values(*dict.fromkeys([*plan.sources, *extra]))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            with measure("serialize"):
+                data = plan.render(page)
+            return self.get_paginated_response(data)
+        with measure("serialize"):
+            data = plan.render(rows)
+        return Response(data)
@@ -0,0 +1,21 @@
+from django.db.models import F
+from rest_framework.filters import OrderingFilter
+
+
+class NullsLastOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter that always sorts NULLs after real values.
+
+    Postgres puts NULLs first on DESC, which would push e.g. unrated
+    businesses to the top of `?ordering=-rating_avg`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+
+        return queryset.order_by(*[
+            F(field[1:]).desc(nulls_last=True) if field.startswith("-") else F(field).asc(nulls_last=True)
+            for field in ordering
+        ])
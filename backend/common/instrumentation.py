@@ -0,0 +1,269 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("request_profile", default=None)
+
+
+def setting(name, default):
+    return getattr(settings, "INSTRUMENTATION", {}).get(name, default)
+
+
+class RequestProfile:
+    """Per-request counters, filled in by the DB execute wrapper and `measure()` spans."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.spans = {}
+        self.open_spans = set()
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            # Parameters are kept out of the SQL text, so an N+1 repeats the same string.
+            self.statements[sql] = self.statements.get(sql, 0) + 1
+
+    def duplicates(self, threshold):
+        return sorted(
+            ((sql, count) for sql, count in self.statements.items() if count >= threshold),
+            key=lambda item: -item[1],
+        )
+
+
+def profile_queries(execute, sql, params, many, context):
+    """Execute wrapper kept on every connection; hands queries to the current request's profile, if any."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def install_profilers(**kwargs):
+    """
+    Make sure this thread's connections carry `profile_queries`. Connected to
+    `request_started`, which Django sends from the thread that will run the
+    request's sync code and queries (under ASGI too).
+    """
+    for connection in connections.all():
+        if profile_queries not in connection.execute_wrappers:
+            connection.execute_wrappers.append(profile_queries)
+
+
+@contextmanager
+def measure(name):
+    """
+    Add the time spent in the block to the current request's `name` span
+    (no-op when unsampled, or inside a block already measuring `name`).
+    """
+    profile = _current.get()
+    if profile is None or name in profile.open_spans:
+        yield
+        return
+    profile.open_spans.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.open_spans.discard(name)
+        profile.spans[name] = profile.spans.get(name, 0.0) + time.perf_counter() - started
+
+
+class MeasuredSerializerMixin:
+    """Serializer mixin reporting `to_representation()` as part of the `serialize` span."""
+
+    def to_representation(self, instance):
+        if _current.get() is None:
+            return super().to_representation(instance)
+        with measure("serialize"):
+            return super().to_representation(instance)
+
+
+# Query parameters that carry credentials (EventStreamView's `?token=`) and must not be logged.
+SECRET_PARAMS = ("token",)
+
+
+def loggable_path(request):
+    """`request.get_full_path()` without the values of `SECRET_PARAMS`."""
+    if not any(name in request.GET for name in SECRET_PARAMS):
+        return request.get_full_path()
+    query = request.GET.copy()
+    for name in SECRET_PARAMS:
+        query.pop(name, None)
+    return f"{request.path}?{query.urlencode()}" if query else request.path
+
+
+class SlowRequestLog:
+    """Thread-safe, fixed-size record of the slowest sampled requests."""
+
+    def __init__(self, size):
+        self.size = size
+        self._heap = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, duration, entry):
+        item = (duration, next(self._counter), entry)
+        with self._lock:
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, item)
+            elif duration > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def entries(self):
+        with self._lock:
+            items = sorted(self._heap, reverse=True)
+        return [entry for _duration, _n, entry in items]
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+
+slow_requests = SlowRequestLog(setting("SLOW_LOG_SIZE", 50))
+
+
+class InstrumentationMiddleware:
+    """
+    Per-request SQL and timing instrumentation.
+
+    A `SAMPLE_RATE` fraction of requests is profiled: every query is counted
+    and timed, and the slowest requests are kept in `slow_requests` for the
+    admin endpoint. SQL that repeats `N_PLUS_ONE_THRESHOLD` times in one
+    request is logged as a likely N+1. Staff users (everyone, with
+    `PUBLIC_SERVER_TIMING`) also get a `Server-Timing` header with `db` (time
+    and query count), `serialize` (serializer or fast-path rendering and JSON
+    encoding, see `measure`), `view` (see ViewTimingMiddleware) and `app`
+    (everything inside this middleware).
+
+    Queries reach the profile through `profile_queries`, an execute wrapper
+    kept on every connection (see `install_profilers`) that looks the profile
+    up in a context variable. asgiref copies the context into the threads
+    that run sync code for async requests, so queries are attributed to the
+    right request under ASGI too. Unsampled requests pay for one `random()`
+    call, the wrapper check at `request_started` and a context lookup per
+    query; `manage.py bench_instrumentation` measures the overhead.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = setting("SAMPLE_RATE", 1.0 if settings.DEBUG else 0.1)
+        self.threshold = setting("N_PLUS_ONE_THRESHOLD", 5)
+        self.public_timing = setting("PUBLIC_SERVER_TIMING", False)
+        request_started.connect(install_profilers, dispatch_uid="common.instrumentation.install_profilers")
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.sample_rate and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, profile, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, profile, time.perf_counter() - started)
+        return response
+
+    def shows_timing(self, request):
+        """Server-Timing reveals where the time goes, so only staff see it unless it's made public."""
+        if self.public_timing:
+            return True
+        # DRF copies the user it authenticated onto the Django request.
+        user = getattr(request, "user", None)
+        return bool(user is not None and user.is_staff)
+
+    def record(self, request, response, profile, total):
+        serialize = profile.spans.get("serialize", 0.0)
+        view = profile.spans.get("view", 0.0)
+        if self.shows_timing(request):
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={profile.db_seconds * 1000:.1f};desc="{profile.queries} queries"',
+                f"serialize;dur={serialize * 1000:.1f}",
+                f"view;dur={view * 1000:.1f}",
+                f"app;dur={total * 1000:.1f}",
+            ])
+
+        duplicates = profile.duplicates(self.threshold)
+        for sql, count in duplicates:
+            logger.warning("Possible N+1 on %s %s: %d x %s", request.method, request.path, count, sql[:300])
+
+        slow_requests.add(total, {
+            "method": request.method,
+            "path": loggable_path(request),
+            "status": response.status_code,
+            "at": timezone.now().isoformat(),
+            "total_ms": round(total * 1000, 2),
+            "db_ms": round(profile.db_seconds * 1000, 2),
+            "serialize_ms": round(serialize * 1000, 2),
+            "view_ms": round(view * 1000, 2),
+            "queries": profile.queries,
+            "duplicates": [{"sql": sql[:500], "count": count} for sql, count in duplicates],
+        })
+
+
+class ViewTimingMiddleware:
+    """Innermost middleware: times the view (and response rendering) as the `view` span."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with measure("view"):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with measure("view"):
+            return await self.get_response(request)
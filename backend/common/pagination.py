@@ -0,0 +1,325 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, FieldError, ValidationError as DjangoValidationError
+from django.db.models import F, OrderBy, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+FALSE_VALUES = {"0", "false", "no", "off"}
+
+
+def ordering_name(item):
+    """`"-name"` for an ordering term on a plain name (a string or `F("name").desc()`), else None."""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, OrderBy) and isinstance(item.expression, F):
+        return ("-" if item.descending else "") + item.expression.name
+    return None
+
+
+def ordering_columns(queryset, view=None):
+    """
+    Concrete columns any pagination mode may sort or seek on for this queryset.
+
+    Narrowed querysets (`.only()`, `.values()`) must keep these so keyset
+    cursors can be built from the rows without extra queries.
+    """
+    names = [
+        *(ordering_name(item) for item in queryset.query.order_by),
+        *(getattr(view, "ordering", None) or []),
+        *KeysetPagination.default_ordering,
+    ]
+    concrete = {field.name: field.attname for field in queryset.model._meta.concrete_fields}
+    return [
+        concrete[name.lstrip("-")]
+        for name in dict.fromkeys(names)
+        if isinstance(name, str) and name.lstrip("-") in concrete
+    ]
+
+
+def cursor_json_default(value):
+    """Decimals (e.g. annotated prices) go into cursors as numbers, so they are compared as numbers."""
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Count-free keyset (seek) pagination.
+
+    Rows are ordered by the queryset's ordering (or `default_ordering`) with the
+    primary key appended as a tie-breaker, and every page is fetched with
+    `WHERE (field, id) < (last_field, last_id)` instead of `OFFSET`, so page 1000
+    costs the same as page 1 and can walk a `(field, id)` index.
+    """
+
+    default_ordering = ("-created_at",)
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.annotations = set(queryset.query.annotations)
+        self.ordering = self.get_ordering(request, queryset, view)
+        position, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*[
+            self.order_term(name, descending != reverse, nullable, reverse)
+            for name, _field, descending, nullable in self.ordering
+        ])
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position, reverse))
+
+        # One extra row tells us whether there is a page beyond this one.
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_next or self.has_previous) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    @staticmethod
+    def order_term(name, descending, nullable, reverse):
+        if not nullable:
+            return ("-" if descending else "") + name
+        # NULLs sort after every value (as with NullsLastOrderingFilter), so walking backwards meets them first.
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        return F(name).desc(**nulls) if descending else F(name).asc(**nulls)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering as `(name, field, descending, nullable)` tuples ending in the pk.
+
+        The ordering already applied by OrderingFilter wins, then `view.ordering`,
+        then `default_ordering`. Columns may be given as names or as
+        `F("name").asc()/.desc()` (NullsLastOrderingFilter); nullable columns
+        sort NULLs last. Annotations (e.g. a computed distance) are seeked on
+        with their output field. An ordering the cursor can't seek on
+        (relation lookups, other expressions) is a 400 when the client asked
+        for it with `?ordering=`, and otherwise falls back to the default.
+        """
+        ordering = list(queryset.query.order_by)
+        if ordering:
+            resolved = self._resolve_ordering(queryset, ordering)
+            if resolved is not None:
+                return resolved
+            if api_settings.ORDERING_PARAM in request.query_params:
+                raise ValidationError({
+                    api_settings.ORDERING_PARAM: "This ordering can't be used with cursor pagination; use page numbers.",
+                })
+        return (
+            self._resolve_ordering(queryset, getattr(view, "ordering", None) or [])
+            or self._resolve_ordering(queryset, self.default_ordering)
+        )
+
+    def _resolve_ordering(self, queryset, ordering):
+        model = queryset.model
+        pk = model._meta.pk
+        resolved = []
+        for item in ordering:
+            name = ordering_name(item)
+            if name is None or "__" in name:
+                return None
+            descending = name.startswith("-")
+            name = name.lstrip("-")
+            if name in ("pk", pk.name):
+                resolved.append(("pk", pk, descending, False))
+                return resolved
+            if name in queryset.query.annotations:
+                try:
+                    output_field = queryset.query.annotations[name].output_field
+                except FieldError:
+                    return None
+                resolved.append((name, output_field, descending, False))
+                continue
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete:
+                return None
+            resolved.append((name, field, descending, field.null))
+
+        if not resolved:
+            return None
+        # Tie-break in the same direction as the leading column so a single
+        # `(field, id)` index scan serves the whole page.
+        resolved.append(("pk", pk, resolved[0][2], False))
+        return resolved
+
+    def seek_filter(self, position, reverse):
+        """
+        Build the row-value comparison `(a, b, id) > (x, y, z)` as OR-ed ANDs:
+        strictly past the cursor on one column, equal on every column before it.
+        """
+        condition = Q()
+        equal = Q()
+        for (name, _field, descending, nullable), value in zip(self.ordering, position):
+            if value is None:
+                # NULLs come last: nothing is past a NULL going forwards, every value is going backwards.
+                past = Q(**{f"{name}__isnull": False}) if reverse else None
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                past = Q(**{f"{name}__{'lt' if descending != reverse else 'gt'}": value})
+                if nullable and not reverse:
+                    past |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            if past is not None:
+                condition |= equal & past
+            equal &= same
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode("ascii")), parse_float=Decimal)
+            raw_position = payload["p"]
+            if len(raw_position) != len(self.ordering):
+                raise ValueError
+            position = []
+            for (_name, field, _desc, nullable), value in zip(self.ordering, raw_position):
+                if value is None and not nullable:
+                    raise ValueError
+                position.append(value if value is None else field.to_python(value))
+            reverse = bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def position_value(self, instance, name, field):
+        """Cursor value for one ordering column of a model instance or a `.values()` row."""
+        if name in self.annotations:
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+        elif isinstance(instance, dict):
+            value = instance[field.attname]
+        else:
+            value = field.value_from_object(instance)
+        return value.isoformat() if hasattr(value, "isoformat") else value
+
+    def encode_cursor(self, instance, reverse):
+        payload = {"p": [self.position_value(instance, name, field) for name, field, _desc, _null in self.ordering]}
+        if reverse:
+            payload["r"] = 1
+        encoded = urlsafe_b64encode(json.dumps(payload, separators=(",", ":"), default=cursor_json_default).encode("ascii"))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode("ascii"))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class DefaultPagination(PageNumberPagination):
+    """
+    Project-wide pagination.
+
+    Page numbers remain the default. Clients can opt in per request to:
+    - keyset pagination with `?pagination=cursor` (or any `?cursor=` value),
+    - count-free page numbers with `?count=false`, which skips `COUNT(*)` and
+      detects the next page by fetching one extra row.
+    """
+
+    mode_query_param = "pagination"
+    count_query_param = "count"
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        self.count_free = False
+
+        if self.wants_keyset(request):
+            self.keyset = self.keyset_class()
+            page = self.keyset.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.keyset.display_page_controls
+            return page
+
+        if request.query_params.get(self.count_query_param, "").lower() in FALSE_VALUES:
+            return self.paginate_without_count(queryset, request)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def wants_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) in ("cursor", "keyset")
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_without_count(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        raw_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            number = int(raw_number)
+            if number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message)
+
+        offset = (number - 1) * page_size
+        results = list(queryset[offset: offset + page_size + 1])
+
+        self.count_free = True
+        self.number = number
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        if self.count_free:
+            return Response({
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            })
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if not self.count_free:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if not self.count_free:
+            return super().get_previous_link()
+        if self.number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
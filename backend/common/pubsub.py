@@ -0,0 +1,138 @@
+import asyncio
+import itertools
+import logging
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The process-wide broker named by `settings.PUSH["BROKER"]`."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, "PUSH", {})
+                _broker = import_string(config.get("BROKER", "common.pubsub.InProcessBroker"))()
+    return _broker
+
+
+@receiver(setting_changed)
+def reset_broker(*, setting, **kwargs):
+    global _broker
+    if setting == "PUSH":
+        _broker = None
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """
+    One listener's queue of events.
+
+    Bounded: a consumer that falls `QUEUE_SIZE` events behind is closed
+    instead of buffering without limit; push clients reconnect and refetch.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self, broker, channels, loop):
+        self.broker = broker
+        self.channels = channels
+        self.loop = loop
+        self.queue = asyncio.Queue(self.QUEUE_SIZE)
+        self.closed = False
+
+    def deliver(self, event):
+        """Called on the subscriber's loop."""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Dropping slow push subscriber on %s", ", ".join(self.channels))
+            self.close()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        """Next event, or None once the subscription has been closed for falling behind."""
+        return await self.queue.get()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Fan-out to the subscribers of this process.
+
+    Publishing is thread-safe and non-blocking: sync views publish from
+    worker threads and events are handed to each subscriber's event loop
+    with `call_soon_threadsafe`. Nothing crosses process boundaries, so with
+    several workers the push endpoint only sees events published by its own
+    worker; a shared backend (Redis, Postgres LISTEN/NOTIFY) plugs in through
+    `settings.PUSH["BROKER"]` with the same `publish` / `subscribe` interface.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, channels, loop=None):
+        subscription = Subscription(self, list(channels), loop or asyncio.get_running_loop())
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                listeners = self._channels.get(channel)
+                if listeners is not None:
+                    listeners.discard(subscription)
+                    if not listeners:
+                        del self._channels[channel]
+
+    def publish(self, channel, event):
+        event = {"id": next(self._ids), **event}
+        with self._lock:
+            listeners = list(self._channels.get(channel, ()))
+        for subscription in listeners:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop is gone (server shutting down).
+                subscription.close()
+        return len(listeners)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({subscription for listeners in self._channels.values() for subscription in listeners})
+
+
+class RecordingBroker(InProcessBroker):
+    """Test stand-in: fans out like InProcessBroker and also keeps every `(channel, event)` published."""
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, channel, event):
+        self.published.append((channel, event))
+        return super().publish(channel, event)
@@ -0,0 +1,20 @@
+from django.db import transaction
+
+from .pubsub import get_broker, user_channel
+
+
+def push(user_ids, event_type, data):
+    """
+    Publish `{"type": event_type, "data": data}` to each user's push channel
+    once the current transaction commits (immediately outside one), so
+    listeners never hear about a write that was rolled back.
+    """
+    event = {"type": event_type, "data": data}
+    recipients = sorted({user_id for user_id in user_ids if user_id is not None})
+
+    def send():
+        broker = get_broker()
+        for user_id in recipients:
+            broker.publish(user_channel(user_id), event)
+
+    transaction.on_commit(send)
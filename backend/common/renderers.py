@@ -0,0 +1,11 @@
+from rest_framework.renderers import JSONRenderer
+
+from .instrumentation import measure
+
+
+class InstrumentedJSONRenderer(JSONRenderer):
+    """JSONRenderer whose encoding time is reported as part of the `serialize` span."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure("serialize"):
+            return super().render(data, accepted_media_type, renderer_context)
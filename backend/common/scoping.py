@@ -0,0 +1,15 @@
+def owned_by(queryset, user, *paths):
+    """
+    Restrict `queryset` to rows where any of the lookup `paths` equals `user`.
+
+    `Q(a=user) | Q(b__c__owner=user)` makes the planner evaluate the OR over
+    the whole join tree (no single index serves it) and callers then reach
+    for DISTINCT. Instead, each path becomes its own index-driven
+    `SELECT id ... WHERE <path> = user`; the arms are glued with UNION ALL
+    and applied as a `pk IN (...)` semi-join, which deduplicates for free.
+    """
+    model = queryset.model
+    arms = [model._default_manager.filter(**{path: user}).values("pk") for path in paths]
+    if len(arms) == 1:
+        return queryset.filter(pk__in=arms[0])
+    return queryset.filter(pk__in=arms[0].union(*arms[1:], all=True))
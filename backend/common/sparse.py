@@ -0,0 +1,98 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from .pagination import ordering_columns
+
+
+def related_lookups(select_related, prefix=""):
+    """Flatten `query.select_related` (`{"a": {"b": {}}}`) into `["a", "a__b"]`."""
+    lookups = []
+    for name, children in select_related.items():
+        lookups.append(prefix + name)
+        lookups.extend(related_lookups(children, prefix + name + "__"))
+    return lookups
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=id,name,price` sparse fieldsets for reads.
+
+    The serializer is trimmed to the requested fields and the queryset is
+    narrowed to match with `.only()`: the columns behind those fields plus the
+    pk, the sort columns and the modification timestamp the validators need.
+    `select_related` joins for relations that were dropped are pruned too,
+    so payload size and DB I/O shrink together. Serializers with fields that
+    can't be mapped onto columns (`source="*"`) keep every column.
+    """
+
+    fields_query_param = "fields"
+    sparse_fields_actions = ("list", "retrieve")
+
+    def get_sparse_fields(self):
+        """Requested field names in order, or None when the full representation applies."""
+        if not hasattr(self, "_sparse_fields"):
+            request = self.request
+            raw = ""
+            if request is not None and request.method in SAFE_METHODS:
+                raw = request.query_params.get(self.fields_query_param, "")
+            names = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+            self._sparse_fields = names or None
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        names = self.get_sparse_fields()
+        if names is None:
+            return serializer
+
+        target = getattr(serializer, "child", serializer)
+        unknown = [name for name in names if name not in target.fields]
+        if unknown:
+            raise ValidationError({self.fields_query_param: f"Unknown field(s): {', '.join(unknown)}."})
+        for name in set(target.fields) - set(names):
+            target.fields.pop(name)
+        return serializer
+
+    def get_expand_tree(self):
+        # Expanding a relation that isn't in ?fields= would only add joins.
+        tree = super().get_expand_tree()
+        names = self.get_sparse_fields()
+        if names is None:
+            return tree
+        return {name: subtree for name, subtree in tree.items() if name in names}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fields() is None or self.action not in self.sparse_fields_actions:
+            return queryset
+
+        columns = self.get_sparse_columns(queryset)
+        if columns is None:
+            return queryset
+
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict):
+            kept = [lookup for lookup in related_lookups(select_related) if lookup.split("__")[0] in columns]
+            queryset = queryset.select_related(None)
+            if kept:
+                queryset = queryset.select_related(*kept)
+        return queryset.only(*columns)
+
+    def get_sparse_columns(self, queryset):
+        opts = queryset.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        columns = {opts.pk.name}
+        columns.update(
+            name for name in ordering_columns(queryset, self) if name in concrete
+        )
+        last_modified = getattr(self, "last_modified_field", None)
+        if last_modified in concrete:
+            columns.add(last_modified)
+
+        for field in self.get_serializer().fields.values():
+            if field.source == "*":
+                return None
+            head = field.source.split(".")[0]
+            if head in concrete:
+                columns.add(head)
+        return sorted(columns)
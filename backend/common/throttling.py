@@ -0,0 +1,107 @@
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .cache import get_cache
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+DEFAULT_COSTS = {"default": 1, "search": 5, "bulk_item": 1}
+
+
+def parse_rate(rate):
+    """`"600/min"` -> `(600, 60)`: the cost allowed per window and the window in seconds."""
+    amount, period = rate.split("/")
+    return int(amount), PERIODS[period[0]]
+
+
+def consume(cache, key, amount, timeout):
+    """Atomically add `amount` to the counter at `key`, creating it if needed; return the new value."""
+    try:
+        return cache.incr(key, amount)
+    except ValueError:
+        if cache.add(key, amount, timeout):
+            return amount
+        # Someone else created it in between.
+        return cache.incr(key, amount)
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Cost-weighted sliding-window rate limit per user (or per client IP when
+    anonymous).
+
+    At most `limit` cost may be spent per `period`, from
+    `DEFAULT_THROTTLE_RATES[scope]` (e.g. `"600/min"`). The scope is the
+    view's `throttle_scope`, else `user` or `anon`. A request costs
+    `get_cost()`, weighted by `THROTTLE_COSTS`: per action, plus extra for
+    `?search=` and for each item of a bulk payload.
+
+    Spend is kept as two counters in the cache, for the current and the
+    previous fixed window, and the spend in the sliding window ending now is
+    estimated as `previous * (1 - elapsed / period) + current`. Every update
+    is an atomic `incr` and a rejected request gets its cost back.
+
+    The counters are only as shared as the cache: with a per-process backend
+    such as the default LocMemCache every worker process keeps its own, and
+    a client gets the full limit from each of them. Multi-worker deployments
+    need a shared cache (see `CACHE_BACKEND`) for the limits to hold.
+    """
+
+    cache_format = "throttle:{scope}:{ident}:{slot}"
+
+    def get_scope(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if scope:
+            return scope
+        return "user" if request.user and request.user.is_authenticated else "anon"
+
+    def get_client_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"u{request.user.pk}"
+        return f"ip{self.get_ident(request)}"
+
+    def get_cost(self, request, view):
+        costs = {**DEFAULT_COSTS, **getattr(settings, "THROTTLE_COSTS", {})}
+        cost = costs.get(getattr(view, "action", None), costs["default"])
+        if request.query_params.get(api_settings.SEARCH_PARAM):
+            cost += costs["search"]
+        if request.method == "POST" and isinstance(request.data, list):
+            cost += costs["bulk_item"] * len(request.data)
+        return cost
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        limit, period = parse_rate(rate)
+        # A request costlier than the whole limit would never get through.
+        cost = min(self.get_cost(request, view), limit)
+
+        cache = get_cache()
+        slot, elapsed = divmod(time.time(), period)
+        ident = self.get_client_ident(request)
+        key = self.cache_format.format(scope=scope, ident=ident, slot=int(slot))
+        previous_key = self.cache_format.format(scope=scope, ident=ident, slot=int(slot) - 1)
+
+        current = consume(cache, key, cost, timeout=2 * period)
+        previous = cache.get(previous_key, 0)
+        draining = previous * (1 - elapsed / period)
+        spent = draining + current
+        if spent <= limit:
+            return True
+
+        cache.decr(key, cost)
+        excess = spent - limit
+        if previous and excess <= draining:
+            self.wait_seconds = excess * period / previous
+        else:
+            # The current period's spend only starts draining in the next one.
+            self.wait_seconds = period - elapsed + (excess - draining) * period / (current - cost)
+        return False
+
+    def wait(self):
+        return getattr(self, "wait_seconds", None)
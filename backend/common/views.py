@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+
+from .instrumentation import slow_requests
+from .pubsub import get_broker, user_channel
+
+
+class SlowRequestsView(APIView):
+    """Admin-only view of the slowest sampled requests; DELETE clears the log."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"size": slow_requests.size, "results": slow_requests.entries()})
+
+    def delete(self, request):
+        slow_requests.clear()
+        return Response(status=204)
+
+
+def sse_frame(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], cls=JSONEncoder)}\n\n"
+
+
+class EventStreamView(View):
+    """
+    Server-Sent Events stream of the authenticated user's push events
+    (`message.created`, `booking.status`).
+
+    Native async: an idle connection is a suspended coroutine waiting on its
+    subscription queue, not a thread, so one uvicorn worker holds thousands.
+    ASGI only: a WSGI server would drain the endless stream into one buffered
+    response and never return the worker, so WSGI requests get a 501.
+    Browsers' EventSource can't set headers, so the access token may also be
+    passed as `?token=`.
+    """
+
+    http_method_names = ["get"]
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({"detail": "The event stream is only served under ASGI."}, status=501)
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+        subscription = get_broker().subscribe([user_channel(user.pk)])
+        keepalive = getattr(settings, "PUSH", {}).get("KEEPALIVE_SECONDS", 25)
+
+        async def stream():
+            try:
+                yield f"retry: 3000\n: connected {user.pk}\n\n"
+                while True:
+                    try:
+                        event = await asyncio.wait_for(subscription.get(), keepalive)
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                        continue
+                    if event is None:
+                        # Fell too far behind; the client reconnects and refetches.
+                        return
+                    yield sse_frame(event)
+            finally:
+                subscription.close()
+
+        response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def authenticate(self, request):
+        token = request.GET.get("token")
+        if token and "HTTP_AUTHORIZATION" not in request.META:
+            request.META["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            user = drf_request.user
+        except APIException:
+            return None
+        return user if user.is_authenticated else None
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -28,6 +29,8 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv("DEBUG", 0) == "1"
 
+TESTING = sys.argv[1:2] == ["test"]
+
 CSRF_TRUSTED_ORIGINS = [
     o.strip() for o in os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",") if o.strip()
 ]
@@ -60,17 +63,24 @@ INSTALLED_APPS = [
     "catalog",
     "transactions",
     "engagement",
+    "outbox",
+    "idempotency",
 ]
 
 MIDDLEWARE = [
+    # First, so its Server-Timing covers the whole stack below it.
+    "common.instrumentation.InstrumentationMiddleware",
     'django.middleware.security.SecurityMiddleware',
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, made async-capable so ASGI requests stay on the event loop.
+    "common.static.AsyncWhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last, so the `view` span excludes the middleware above.
+    "common.instrumentation.ViewTimingMiddleware",
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -169,9 +179,28 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# Local memory (LRU, bounded by MAX_ENTRIES) by default; point CACHE_BACKEND /
+# CACHE_LOCATION at a shared backend (e.g. Redis) when running several workers.
+# The throttle keeps its counters here, so with the per-process default each
+# worker enforces the rate limits on its own.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.getenv("CACHE_LOCATION", "groombuzz"),
+    }
+}
+if CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 5000))}
+
+# Seconds a JWT-authenticated user is served from the cache (see accounts.authentication).
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", 60))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -181,6 +210,70 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
         "rest_framework.filters.SearchFilter",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_RENDERER_CLASSES": (
+        "common.renderers.InstrumentedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_THROTTLE_CLASSES": (
+        "common.throttling.SlidingWindowThrottle",
+    ),
+    "DEFAULT_THROTTLE_RATES": {
+        "user": os.getenv("THROTTLE_USER_RATE", "600/min"),
+        "anon": os.getenv("THROTTLE_ANON_RATE", "120/min"),
+    },
+    "DEFAULT_PAGINATION_CLASS": "common.pagination.DefaultPagination",
     "PAGE_SIZE": 10,
 }
+
+# What a request costs against its throttle rate (see common.throttling):
+# per action, plus `search` for ?search= and `bulk_item` per item of a bulk POST.
+THROTTLE_COSTS = {
+    "default": 1,
+    "search": 5,
+    "bulk_item": 1,
+    "nearby": 3,
+    "stats": 3,
+    "export": 50,
+}
+
+# Server-Sent Events push (see common.pubsub and /api/events/). The in-process
+# broker only fans out within one worker; point BROKER at a shared backend to
+# run the push endpoint on several. Keepalives stop proxies closing idle streams.
+PUSH = {
+    "BROKER": os.getenv("PUSH_BROKER", "common.pubsub.InProcessBroker"),
+    "KEEPALIVE_SECONDS": int(os.getenv("PUSH_KEEPALIVE_SECONDS", 25)),
+}
+
+# Whether a read that goes over its ?expand= query budget (an N+1 the expansion
+# plan missed; see common.expand) fails instead of only logging a warning.
+EXPAND_STRICT_QUERY_BUDGET = os.getenv("EXPAND_STRICT_QUERY_BUDGET", "1" if DEBUG or TESTING else "0") == "1"
+
+# Seconds a stored Idempotency-Key response is replayed (see idempotency.mixins).
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 3600))
+
+# Side effects queued in the writing transaction and run by `manage.py run_outbox`
+# workers (see outbox.worker). HANDLERS maps a topic ("booking.created"), a
+# family ("booking.*") or "*" to handler paths; failures retry with exponential
+# backoff up to MAX_ATTEMPTS, and a claimed batch is released after LEASE_SECONDS.
+OUTBOX = {
+    "HANDLERS": {
+        "*": ["outbox.handlers.log_event", "outbox.handlers.post_webhook"],
+    },
+    "WEBHOOK_URL": os.getenv("OUTBOX_WEBHOOK_URL", ""),
+    "WEBHOOK_TIMEOUT": int(os.getenv("OUTBOX_WEBHOOK_TIMEOUT", 10)),
+    "BATCH_SIZE": int(os.getenv("OUTBOX_BATCH_SIZE", 100)),
+    "MAX_ATTEMPTS": int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8)),
+    "BACKOFF_SECONDS": 5,
+    "MAX_BACKOFF_SECONDS": 3600,
+    "LEASE_SECONDS": 300,
+}
+
+# Request instrumentation (see common.instrumentation): the sampled fraction of
+# requests gets N+1 logging, a slot in the slow log and, for staff users (or
+# everyone with PUBLIC_SERVER_TIMING), a Server-Timing header.
+INSTRUMENTATION = {
+    "SAMPLE_RATE": float(os.getenv("INSTRUMENTATION_SAMPLE_RATE", "1.0" if DEBUG else "0.1")),
+    "PUBLIC_SERVER_TIMING": os.getenv("INSTRUMENTATION_PUBLIC_SERVER_TIMING", 0) == "1",
+    "N_PLUS_ONE_THRESHOLD": int(os.getenv("INSTRUMENTATION_N_PLUS_ONE_THRESHOLD", 5)),
+    "SLOW_LOG_SIZE": int(os.getenv("INSTRUMENTATION_SLOW_LOG_SIZE", 50)),
+}
@@ -48,6 +48,7 @@ from django.contrib import admin
 from django.urls import include, path
 from django.http import JsonResponse
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from common.views import EventStreamView, SlowRequestsView
 
 def health(request):
     return JsonResponse({"status": "ok", "service": "GroomBuzz API"})
@@ -63,6 +64,12 @@ urlpatterns = [
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 
+    # Slowest sampled requests (admin only)
+    path("api/admin/slow-requests/", SlowRequestsView.as_view(), name="slow_requests"),
+
+    # Server-Sent Events push channel (ASGI only; 501 under WSGI)
+    path("api/events/", EventStreamView.as_view(), name="events"),
+
     # APIs
     path("api/", include("accounts.urls")),
     path("api/", include("catalog.urls")),
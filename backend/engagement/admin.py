@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Review, Message
+from .models import Conversation, Review, Message
 
 admin.site.register(Review)
 admin.site.register(Message)
 
+admin.site.register(Conversation)
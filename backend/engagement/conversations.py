@@ -0,0 +1,111 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Conversation, Message
+
+UNREAD_COLUMNS = {"client": "client_unread", "business": "business_unread"}
+
+
+def client_of(sender_id, recipient_id, owner_id):
+    """The client side of a message between a client and a business owner, or None."""
+    if sender_id == owner_id:
+        return recipient_id
+    if recipient_id == owner_id:
+        return sender_id
+    return None
+
+
+def participant_side(conversation, user):
+    """`"client"`, `"business"` or None for someone outside the thread."""
+    if conversation.client_id == user.pk:
+        return "client"
+    if conversation.business.owner_id == user.pk:
+        return "business"
+    return None
+
+
+def conversation_for(client_id, business_id):
+    """Get or create the thread; safe against a concurrent first message."""
+    lookup = {"client_id": client_id, "business_id": business_id}
+    conversation = Conversation.objects.filter(**lookup).first()
+    if conversation is not None:
+        return conversation
+    try:
+        # Savepoint only on the rare first message, so a lost race rolls back just this insert.
+        with transaction.atomic():
+            return Conversation.objects.create(**lookup)
+    except IntegrityError:
+        return Conversation.objects.get(**lookup)
+
+
+def record_message(message):
+    """Point the thread at its newest message and bump the recipient's unread count."""
+    conversation = message.conversation
+    side = "business" if message.sender_id == conversation.client_id else "client"
+    Conversation.objects.filter(pk=conversation.pk).update(
+        last_message=message,
+        last_message_at=message.created_at,
+        updated_at=timezone.now(),
+        **{UNREAD_COLUMNS[side]: F(UNREAD_COLUMNS[side]) + 1},
+    )
+
+
+def mark_read(conversation, side):
+    Conversation.objects.filter(pk=conversation.pk).update(updated_at=timezone.now(), **{UNREAD_COLUMNS[side]: 0})
+
+
+def refresh_last_messages(conversations):
+    """Re-point `last_message` at the newest remaining message (after deletes or backfills)."""
+    latest = Message.objects.filter(conversation=OuterRef("pk")).order_by("-created_at", "-id")
+    conversations.update(
+        last_message=Subquery(latest.values("pk")[:1]),
+        # An emptied thread keeps its place in the inbox.
+        last_message_at=Coalesce(Subquery(latest.values("created_at")[:1]), F("last_message_at")),
+        updated_at=timezone.now(),
+    )
+
+
+def rebuild_conversations(chunk_size=2000):
+    """
+    Attach threadless messages (bulk inserts, history from before threads) to
+    their conversations, creating those as needed, then refresh the
+    last-message pointers. Unread counters of new threads start at 0.
+    Returns the number of messages attached.
+    """
+    pending = (
+        Message.objects.filter(conversation__isnull=True)
+        .values_list("pk", "sender_id", "recipient_id", "business_id", "business__owner_id")
+        .order_by("pk")
+    )
+    attached = 0
+    last_pk = 0
+    while True:
+        rows = list(pending.filter(pk__gt=last_pk)[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        threads = {}
+        for pk, sender_id, recipient_id, business_id, owner_id in rows:
+            client_id = client_of(sender_id, recipient_id, owner_id)
+            if client_id is not None:
+                threads.setdefault((client_id, business_id), []).append(pk)
+
+        with transaction.atomic():
+            Conversation.objects.bulk_create(
+                [Conversation(client_id=client_id, business_id=business_id) for client_id, business_id in threads],
+                ignore_conflicts=True,
+            )
+            clients = {client_id for client_id, _business_id in threads}
+            ids = {
+                (client_id, business_id): pk
+                for pk, client_id, business_id in Conversation.objects.filter(client_id__in=clients)
+                .values_list("pk", "client_id", "business_id")
+            }
+            for key, message_ids in threads.items():
+                Message.objects.filter(pk__in=message_ids).update(conversation_id=ids[key])
+                attached += len(message_ids)
+            refresh_last_messages(Conversation.objects.filter(pk__in=[ids[key] for key in threads]))
+    return attached
@@ -0,0 +1,115 @@
+import asyncio
+import http.client
+import json
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from rest_framework_simplejwt.tokens import AccessToken
+
+from catalog.management.commands.bench_api import percentile
+from catalog.management.commands.bench_asgi import HOST, Server
+from engagement.models import Message
+
+
+def raise_open_files_limit(wanted):
+    """Lift the soft file-descriptor limit (inherited by the server) as far as the hard limit allows."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+async def open_stream(port, token):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(
+        f"GET /api/events/?token={token} HTTP/1.1\r\nHost: {HOST}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        raise CommandError(f"Event stream refused: {status.decode().strip()}")
+    # Headers, then wait for the stream's greeting.
+    await reader.readuntil(b"connected")
+    return reader, writer
+
+
+async def wait_for_event(reader, started):
+    await reader.readuntil(b"event: message.created")
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Hold many idle Server-Sent Events connections against one uvicorn worker, report its "
+        "resident memory per connection, then post a message and time its fan-out to every "
+        "stream. Uses the configured database; seed it first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=2000, help="Idle streams to open (default: 2000).")
+        parser.add_argument("--batch", type=int, default=200, help="Streams opened concurrently (default: 200).")
+        parser.add_argument("--idle", type=float, default=5, help="Seconds to hold the streams idle (default: 5).")
+        parser.add_argument("--port", type=int, default=8732, help="Port for the server under test (default: 8732).")
+
+    def handle(self, *args, **options):
+        # A client who has written to a business owner: the owner listens, the client posts.
+        message = (
+            Message.objects.select_related("sender", "business__owner")
+            .filter(recipient=F("business__owner"))
+            .order_by("pk")
+            .first()
+        )
+        if message is None:
+            raise CommandError("No conversations to push to; run `manage.py seed --load-test` first.")
+
+        limit = raise_open_files_limit(options["connections"] * 2 + 256)
+        if limit < options["connections"] + 256:
+            raise CommandError(f"Open files limit is {limit}; too low for {options['connections']} connections.")
+
+        with Server("asgi", 1, options["port"]) as server:
+            baseline = server.rss_mb()
+            asyncio.run(self.run(server, message.business, message.sender, baseline, options))
+
+    async def run(self, server, business, sender, baseline, options):
+        token = str(AccessToken.for_user(business.owner))
+        streams = []
+        started = time.perf_counter()
+        while len(streams) < options["connections"]:
+            batch = min(options["batch"], options["connections"] - len(streams))
+            streams += await asyncio.gather(*(open_stream(server.port, token) for _ in range(batch)))
+        opened = time.perf_counter() - started
+
+        await asyncio.sleep(options["idle"])
+        rss = server.rss_mb()
+        self.stdout.write(
+            f"{len(streams)} streams opened in {opened:.1f}s; worker RSS {baseline:.1f} -> {rss:.1f} MB "
+            f"({(rss - baseline) * 1024 / len(streams):.1f} KB per connection)"
+        )
+
+        waiting = [asyncio.ensure_future(wait_for_event(reader, time.perf_counter())) for reader, _writer in streams]
+        await asyncio.to_thread(self.post_message, server.port, business, sender)
+        latencies = [seconds * 1000 for seconds in await asyncio.wait_for(asyncio.gather(*waiting), 30)]
+        self.stdout.write(
+            f"fan-out to {len(latencies)} streams: p50 {percentile(latencies, 50):.1f} ms, "
+            f"p99 {percentile(latencies, 99):.1f} ms, last {max(latencies):.1f} ms"
+        )
+
+        for _reader, writer in streams:
+            writer.close()
+
+    def post_message(self, port, business, sender):
+        connection = http.client.HTTPConnection(HOST, port, timeout=30)
+        body = json.dumps({"recipient": business.owner_id, "business": business.pk, "message_body": "ping"})
+        connection.request(
+            "POST",
+            "/api/messages/",
+            body,
+            {"Content-Type": "application/json", "Authorization": f"Bearer {AccessToken.for_user(sender)}"},
+        )
+        response = connection.getresponse()
+        response.read()
+        if response.status != 201:
+            raise CommandError(f"Posting the message failed with {response.status}.")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from engagement.conversations import rebuild_conversations
+
+
+class Command(BaseCommand):
+    help = "Attach messages without a conversation (e.g. bulk-loaded ones) to their client/business threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of messages threaded per transaction (default: 2000).",
+        )
+
+    def handle(self, *args, **options):
+        attached = rebuild_conversations(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Attached {attached} messages to conversations."))
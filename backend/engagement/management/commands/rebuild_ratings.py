@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from engagement.ratings import rebuild_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = "Rebuild Business rating_avg / rating_count / rating_histogram from reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of businesses recomputed per query/transaction (default: 500).",
+        )
+        parser.add_argument(
+            "--business",
+            type=int,
+            action="append",
+            dest="business_ids",
+            help="Only rebuild the given business id (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        processed = rebuild_rating_aggregates(
+            business_ids=options["business_ids"],
+            chunk_size=options["chunk_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating aggregates for {processed} businesses."))
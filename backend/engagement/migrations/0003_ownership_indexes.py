@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_business_hours'),
+        ('engagement', '0002_keyset_indexes'),
+        ('transactions', '0005_ownership_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'created_at'], name='engagement__sender__33d222_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['recipient', 'created_at'], name='engagement__recipie_737fed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['client', 'created_at'], name='engagement__client__143e58_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['business', 'created_at'], name='engagement__busines_d04d2f_idx'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_conversations(apps, schema_editor):
+    """Thread the existing messages; unread counters start at 0."""
+    Message = apps.get_model("engagement", "Message")
+    Conversation = apps.get_model("engagement", "Conversation")
+
+    threads = {}
+    rows = Message.objects.values_list("pk", "sender_id", "recipient_id", "business_id", "business__owner_id", "created_at")
+    for pk, sender_id, recipient_id, business_id, owner_id, created_at in rows.order_by("created_at", "pk").iterator():
+        if owner_id not in (sender_id, recipient_id):
+            continue  # not between a client and the business; stays threadless
+        client_id = recipient_id if sender_id == owner_id else sender_id
+        thread = threads.setdefault((client_id, business_id), {"ids": []})
+        thread["ids"].append(pk)
+        thread["last"] = (pk, created_at)
+
+    for (client_id, business_id), thread in threads.items():
+        last_pk, last_at = thread["last"]
+        conversation = Conversation.objects.create(
+            client_id=client_id,
+            business_id=business_id,
+            last_message_id=last_pk,
+            last_message_at=last_at,
+        )
+        Message.objects.filter(pk__in=thread["ids"]).update(conversation=conversation)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_business_hours'),
+        ('engagement', '0003_ownership_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_message_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('client_unread', models.PositiveIntegerField(default=0)),
+                ('business_unread', models.PositiveIntegerField(default=0)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to='catalog.business')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to=settings.AUTH_USER_MODEL)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='engagement.message')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='engagement.conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'created_at', 'id'], name='engagement__convers_3a429b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['client', 'last_message_at', 'id'], name='engagement__client__0692d4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['business', 'last_message_at', 'id'], name='engagement__busines_c32009_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('client', 'business'), name='unique_conversation_per_client_business'),
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 
@@ -36,6 +37,10 @@ class Review(TimeStampedModel):
         indexes = [
             models.Index(fields=["rating"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["created_at", "id"]),
+            # Ownership-scoping arms (see common.scoping.owned_by)
+            models.Index(fields=["client", "created_at"]),
+            models.Index(fields=["business", "created_at"]),
         ]
 
     def __str__(self):
@@ -58,12 +63,68 @@ class Message(TimeStampedModel):
         on_delete=models.CASCADE,
         related_name="messages",
     )
+    conversation = models.ForeignKey(
+        "Conversation",
+        on_delete=models.CASCADE,
+        related_name="messages",
+        null=True,
+        blank=True,
+    )
     message_body = models.TextField()
 
     class Meta:
         indexes = [
             models.Index(fields=["created_at"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["sender", "created_at"]),
+            models.Index(fields=["recipient", "created_at"]),
+            # Per-thread keyset pages
+            models.Index(fields=["conversation", "created_at", "id"]),
         ]
 
     def __str__(self):
         return f"Message({self.sender} → {self.recipient})"
+
+
+class Conversation(TimeStampedModel):
+    """
+    One thread between a client and a business (its owner).
+
+    `last_message` / `last_message_at` and the per-participant unread counters
+    are denormalized from the messages (see engagement.conversations), so an
+    inbox page is read from this table alone.
+    """
+
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="conversations",
+    )
+    business = models.ForeignKey(
+        "catalog.Business",
+        on_delete=models.CASCADE,
+        related_name="conversations",
+    )
+    last_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    last_message_at = models.DateTimeField(default=timezone.now)
+    client_unread = models.PositiveIntegerField(default=0)
+    business_unread = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["client", "business"], name="unique_conversation_per_client_business"),
+        ]
+        indexes = [
+            # Inbox keyset pages, one per participant side
+            models.Index(fields=["client", "last_message_at", "id"]),
+            models.Index(fields=["business", "last_message_at", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Conversation({self.client} ↔ {self.business})"
@@ -0,0 +1,97 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from catalog.models import Business
+from common.cache import bump_cache_version
+from .models import Review
+
+STARS = range(1, 6)
+
+
+def empty_histogram():
+    return {str(star): 0 for star in STARS}
+
+
+def aggregate_fields(histogram):
+    """Derive the denormalized Business rating columns from a per-star histogram."""
+    count = sum(histogram.values())
+    if not count:
+        return {"rating_histogram": histogram, "rating_count": 0, "rating_avg": None}
+
+    total = sum(int(star) * n for star, n in histogram.items())
+    avg = (Decimal(total) / count).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return {"rating_histogram": histogram, "rating_count": count, "rating_avg": avg}
+
+
+def apply_rating_change(business_id, added=(), removed=()):
+    """
+    Incrementally adjust a business's rating aggregates.
+
+    Locks the single business row, so it must run inside the same transaction
+    as the review write that caused it.
+    """
+    business = (
+        Business.objects.select_for_update()
+        .only("id", "rating_histogram")
+        .get(pk=business_id)
+    )
+    histogram = {**empty_histogram(), **(business.rating_histogram or {})}
+    for rating in added:
+        histogram[str(rating)] += 1
+    for rating in removed:
+        histogram[str(rating)] = max(histogram[str(rating)] - 1, 0)
+
+    Business.objects.filter(pk=business_id).update(
+        updated_at=timezone.now(),
+        **aggregate_fields(histogram),
+    )
+    # .update() skips post_save, so invalidate cached business responses here.
+    transaction.on_commit(lambda: bump_cache_version(Business))
+
+
+def rebuild_rating_aggregates(business_ids=None, chunk_size=500):
+    """
+    Recompute rating aggregates from the reviews table, one chunk of businesses
+    at a time (one GROUP BY query and one bulk update per chunk).
+
+    Returns the number of businesses processed.
+    """
+    businesses = Business.objects.order_by("pk")
+    if business_ids is not None:
+        businesses = businesses.filter(pk__in=business_ids)
+
+    processed = 0
+    last_pk = 0
+    while True:
+        chunk = list(businesses.filter(pk__gt=last_pk).only("id")[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        histograms = {business.pk: empty_histogram() for business in chunk}
+        rows = (
+            Review.objects.filter(business_id__in=histograms)
+            .values("business_id", "rating")
+            .annotate(n=Count("id"))
+        )
+        for row in rows:
+            histograms[row["business_id"]][str(row["rating"])] = row["n"]
+
+        now = timezone.now()
+        for business in chunk:
+            for field, value in aggregate_fields(histograms[business.pk]).items():
+                setattr(business, field, value)
+            business.updated_at = now
+
+        with transaction.atomic():
+            Business.objects.bulk_update(
+                chunk,
+                ["rating_avg", "rating_count", "rating_histogram", "updated_at"],
+            )
+        processed += len(chunk)
+
+    bump_cache_version(Business)
+    return processed
@@ -1,16 +1,60 @@
 from rest_framework import serializers
-from .models import Review, Message
+from accounts.serializers import UserSummarySerializer
+from catalog.serializers import BusinessSerializer
+from common.expand import ExpandableFieldsMixin
+from common.instrumentation import MeasuredSerializerMixin
+from transactions.serializers import BookingSerializer
+from .conversations import participant_side
+from .models import Conversation, Message, Review
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(MeasuredSerializerMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = "__all__"
         read_only_fields = ["client", "created_at", "updated_at"]
+        expandable_fields = {
+            "booking": BookingSerializer,
+            "business": BusinessSerializer,
+            "client": UserSummarySerializer,
+        }
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(MeasuredSerializerMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Message
         fields = "__all__"
-        read_only_fields = ["sender", "created_at", "updated_at"]
+        read_only_fields = ["sender", "conversation", "created_at", "updated_at"]
+        expandable_fields = {
+            "sender": UserSummarySerializer,
+            "recipient": UserSummarySerializer,
+            "business": BusinessSerializer,
+        }
+
+
+class LastMessageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Message
+        fields = ["id", "sender", "message_body", "created_at"]
+        read_only_fields = fields
+
+
+class ConversationSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
+    """An inbox row; `unread` is the requesting participant's own counter."""
+
+    last_message = LastMessageSerializer(read_only=True)
+    unread = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Conversation
+        fields = ["id", "client", "business", "last_message", "last_message_at", "unread", "created_at", "updated_at"]
+        read_only_fields = fields
+
+    def get_unread(self, conversation):
+        request = self.context.get("request")
+        side = participant_side(conversation, request.user) if request else None
+        if side == "client":
+            return conversation.client_unread
+        if side == "business":
+            return conversation.business_unread
+        return None
@@ -1,3 +1,272 @@
-from django.test import TestCase
+import asyncio
+import json
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from catalog.models import Business, Category, Service
+from common.instrumentation import slow_requests
+from common.pubsub import get_broker
+from common.scoping import owned_by
+from transactions.models import Booking
+from .models import Message, Review
+from .serializers import ReviewSerializer
+from .views import ReviewViewSet
+
+
+class MessageScopingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.alice = User.objects.create_user("alice", password="x")
+        cls.bob = User.objects.create_user("bob", password="x")
+        cls.carol = User.objects.create_user("carol", password="x")
+        business = Business.objects.create(owner=cls.bob, name="Kings")
+
+        cls.sent = Message.objects.create(sender=cls.alice, recipient=cls.bob, business=business, message_body="hi")
+        cls.received = Message.objects.create(sender=cls.bob, recipient=cls.alice, business=business, message_body="hello")
+        Message.objects.create(sender=cls.bob, recipient=cls.carol, business=business, message_body="other")
+
+    def test_lists_sent_and_received_messages(self):
+        api = APIClient()
+        api.force_authenticate(self.alice)
+        with self.assertNumQueries(3):
+            response = api.get("/api/messages/")
+        self.assertCountEqual([m["id"] for m in response.data["results"]], [self.sent.pk, self.received.pk])
+
+    def test_sparse_fields_narrow_payload_and_columns(self):
+        api = APIClient()
+        api.force_authenticate(self.alice)
+        # ETag aggregate and the keyset page.
+        with self.assertNumQueries(2) as queries:
+            response = api.get("/api/messages/", {"fields": "id,sender", "pagination": "cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data["results"][0]), {"id", "sender"})
+        self.assertNotIn("message_body", queries.captured_queries[-1]["sql"])
+
+        retrieved = api.get(f"/api/messages/{self.sent.pk}/", {"fields": "id,message_body"})
+        self.assertEqual(retrieved.data, {"id": self.sent.pk, "message_body": "hi"})
+
+    def test_unknown_sparse_field_is_rejected(self):
+        api = APIClient()
+        api.force_authenticate(self.alice)
+        response = api.get("/api/messages/", {"fields": "id,nope"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_explain_uses_sender_and_recipient_indexes(self):
+        queryset = owned_by(Message.objects.all(), self.alice, "sender", "recipient")
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        if connection.vendor == "postgresql":
+            self.assertNotIn("Seq Scan", plan)
+        else:
+            self.assertNotRegex(plan, r"\bSCAN\b")
+
+
+class ConversationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.client_user = User.objects.create_user("client", password="x")
+        cls.owner = User.objects.create_user("owner", password="x")
+        cls.stranger = User.objects.create_user("stranger", password="x")
+        cls.business = Business.objects.create(owner=cls.owner, name="Kings")
+
+    def api(self, user):
+        api = APIClient()
+        api.force_authenticate(user)
+        return api
+
+    def send(self, sender, recipient, body):
+        return self.api(sender).post(
+            "/api/messages/",
+            {"recipient": recipient.pk, "business": self.business.pk, "message_body": body},
+            format="json",
+        )
+
+    def test_messages_thread_into_one_conversation_with_unread_counts(self):
+        self.send(self.client_user, self.owner, "hi")
+        self.send(self.owner, self.client_user, "hello")
+        last = self.send(self.client_user, self.owner, "friday?")
+
+        owner_inbox = self.api(self.owner).get("/api/conversations/").data["results"]
+        self.assertEqual(len(owner_inbox), 1)
+        self.assertEqual(owner_inbox[0]["last_message"]["id"], last.data["id"])
+        self.assertEqual(owner_inbox[0]["unread"], 2)
+        self.assertEqual(self.api(self.client_user).get("/api/conversations/").data["results"][0]["unread"], 1)
+
+        conversation = owner_inbox[0]["id"]
+        self.assertEqual(self.api(self.owner).post(f"/api/conversations/{conversation}/read/").status_code, 204)
+        self.assertEqual(self.api(self.owner).get("/api/conversations/").data["results"][0]["unread"], 0)
+
+        with self.assertNumQueries(2):
+            thread = self.api(self.client_user).get(f"/api/conversations/{conversation}/messages/")
+        self.assertEqual([m["message_body"] for m in thread.data["results"]], ["friday?", "hello", "hi"])
+
+        self.assertEqual(self.api(self.stranger).get(f"/api/conversations/{conversation}/messages/").status_code, 404)
+
+    def test_message_must_involve_the_business_owner(self):
+        response = self.send(self.client_user, self.stranger, "hi")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("recipient", response.data)
+
+
+@override_settings(PUSH={"BROKER": "common.pubsub.RecordingBroker", "KEEPALIVE_SECONDS": 5})
+class PushTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.client_user = User.objects.create_user("client", password="x")
+        cls.owner = User.objects.create_user("owner", password="x")
+        cls.business = Business.objects.create(owner=cls.owner, name="Kings")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        cls.service = Service.objects.create(business=cls.business, category=category, name="Cut", price=50)
+
+    def setUp(self):
+        get_broker().published.clear()
+
+    def api(self, user):
+        api = APIClient()
+        api.force_authenticate(user)
+        return api
+
+    def test_event_stream_receives_new_messages(self):
+        async def listen():
+            response = await AsyncClient().get("/api/events/", {"token": str(AccessToken.for_user(self.owner))})
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            chunks = aiter(response.streaming_content)
+            self.assertIn(b"connected", await anext(chunks))
+
+            def send():
+                with self.captureOnCommitCallbacks(execute=True):
+                    return self.api(self.client_user).post(
+                        "/api/messages/",
+                        {"recipient": self.owner.pk, "business": self.business.pk, "message_body": "hi"},
+                        format="json",
+                    )
+
+            sent = await sync_to_async(send)()
+            frame = (await asyncio.wait_for(anext(chunks), 1)).decode()
+            await chunks.aclose()
+            return sent, frame
+
+        sent, frame = async_to_sync(listen)()
+        self.assertIn("event: message.created\n", frame)
+        data = json.loads(frame.split("data: ", 1)[1])
+        self.assertEqual((data["id"], data["message_body"]), (sent.data["id"], "hi"))
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+        # The sender's other sessions hear about it too.
+        self.assertEqual([channel for channel, _event in get_broker().published], [f"user:{self.client_user.pk}", f"user:{self.owner.pk}"])
+
+    def test_booking_status_changes_are_pushed_to_both_sides(self):
+        booking = Booking.objects.create(service=self.service, client=self.client_user, scheduled_at=timezone.now())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api(self.owner).patch(f"/api/bookings/{booking.pk}/", {"scheduled_at": timezone.now()}, format="json")
+        self.assertEqual(get_broker().published, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api(self.owner).patch(f"/api/bookings/{booking.pk}/", {"status": "confirmed"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        published = get_broker().published
+        self.assertEqual([channel for channel, _event in published], [f"user:{self.client_user.pk}", f"user:{self.owner.pk}"])
+        self.assertEqual(published[0][1]["type"], "booking.status")
+        self.assertEqual(published[0][1]["data"]["previous_status"], "pending")
+
+    def test_event_stream_requires_authentication(self):
+        response = async_to_sync(AsyncClient().get)("/api/events/", {"token": "nope"})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(INSTRUMENTATION={**settings.INSTRUMENTATION, "SAMPLE_RATE": 1.0})
+    def test_event_stream_is_asgi_only_and_its_token_is_not_logged(self):
+        slow_requests.clear()
+        token = str(AccessToken.for_user(self.owner))
+        # Under WSGI the endless stream would be buffered forever; it's refused instead.
+        response = self.client.get("/api/events/", {"token": token, "since": "5"})
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual([entry["path"] for entry in slow_requests.entries()], ["/api/events/?since=5"])
+
+
+class ReviewRatingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.client_user = User.objects.create_user("client", password="x")
+        cls.owner = User.objects.create_user("owner", password="x")
+        cls.business = Business.objects.create(owner=cls.owner, name="Kings")
+        cls.other_business = Business.objects.create(owner=cls.owner, name="Queens")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        service = Service.objects.create(business=cls.business, category=category, name="Cut", price=100)
+        cls.bookings = [
+            Booking.objects.create(
+                service=service,
+                client=cls.client_user,
+                scheduled_at=timezone.now() - timedelta(days=i + 1),
+                status=Booking.Status.COMPLETED,
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def review(self, booking, rating):
+        response = self.api.post(
+            "/api/reviews/",
+            {"booking": booking.pk, "business": self.business.pk, "rating": rating, "comment": "ok"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data["id"]
+
+    def assertRatings(self, business, avg, histogram):
+        business.refresh_from_db()
+        self.assertEqual(business.rating_avg, None if avg is None else Decimal(avg))
+        self.assertEqual(business.rating_count, sum(histogram.values()))
+        self.assertEqual(business.rating_histogram, {**{str(star): 0 for star in range(1, 6)}, **histogram})
+
+    def test_create_update_and_delete_adjust_the_aggregates(self):
+        first = self.review(self.bookings[0], 5)
+        self.review(self.bookings[1], 4)
+        self.review(self.bookings[2], 4)
+        self.assertRatings(self.business, "4.33", {"5": 1, "4": 2})
+
+        self.api.patch(f"/api/reviews/{first}/", {"rating": 2}, format="json")
+        self.assertRatings(self.business, "3.33", {"2": 1, "4": 2})
+
+        self.api.delete(f"/api/reviews/{first}/")
+        self.assertRatings(self.business, "4.00", {"4": 2})
+
+    def test_a_review_cant_be_moved_to_another_business(self):
+        review = self.review(self.bookings[0], 3)
+        response = self.api.patch(f"/api/reviews/{review}/", {"business": self.other_business.pk}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("business", response.data)
+        self.assertRatings(self.business, "3.00", {"3": 1})
+        self.other_business.refresh_from_db()
+        self.assertEqual(self.other_business.rating_count, 0)
+
+    def test_update_uses_the_stored_rating_not_a_stale_copy(self):
+        review = Review.objects.get(pk=self.review(self.bookings[0], 3))
+        # Another request changed the rating after this one loaded the review.
+        stale = Review.objects.get(pk=review.pk)
+        self.api.patch(f"/api/reviews/{review.pk}/", {"rating": 5}, format="json")
+
+        serializer = ReviewSerializer(stale, data={"rating": 4}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        ReviewViewSet().perform_update(serializer)
+
+        self.assertRatings(self.business, "4.00", {"4": 1})
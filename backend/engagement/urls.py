@@ -1,8 +1,9 @@
 from rest_framework.routers import DefaultRouter
-from .views import ReviewViewSet, MessageViewSet
+from .views import ConversationViewSet, ReviewViewSet, MessageViewSet
 
 router = DefaultRouter()
 router.register(r"reviews", ReviewViewSet, basename="review")
 router.register(r"messages", MessageViewSet, basename="message")
+router.register(r"conversations", ConversationViewSet, basename="conversation")
 
 urlpatterns = router.urls
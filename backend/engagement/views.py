@@ -1,23 +1,51 @@
-from django.db.models import Q
+from django.db import transaction
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError
-from .models import Review, Message
-from .serializers import ReviewSerializer, MessageSerializer
+from rest_framework.response import Response
+from common.conditional import ConditionalGetMixin
+from common.expand import ExpandMixin
+from common.fast import FastListMixin
+from common.pagination import KeysetPagination
+from common.push import push
+from common.scoping import owned_by
+from common.sparse import SparseFieldsMixin
+from outbox.events import enqueue
+from .conversations import (
+    client_of,
+    conversation_for,
+    mark_read,
+    participant_side,
+    record_message,
+    refresh_last_messages,
+)
+from .models import Conversation, Review, Message
+from .ratings import apply_rating_change
+from .serializers import ConversationSerializer, ReviewSerializer, MessageSerializer
 from transactions.models import Booking
+from transactions.stats import record_stats_change, review_contributions
 
+# What a review's outbox events carry besides the id.
+REVIEW_EVENT_FIELDS = ("booking", "business", "client", "rating")
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(SparseFieldsMixin, ExpandMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ["-created_at"]
 
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
             return Review.objects.select_related("booking", "business", "client").all()
 
-        return Review.objects.select_related("booking", "business", "client").filter(
-            Q(client=user) | Q(business__owner=user)
-        ).distinct()
+        return owned_by(
+            Review.objects.select_related("booking", "business", "client"),
+            user,
+            "client",
+            "business__owner",
+        )
 
     def perform_create(self, serializer):
         booking = serializer.validated_data["booking"]
@@ -31,24 +59,125 @@ class ReviewViewSet(viewsets.ModelViewSet):
         if hasattr(booking, "review"):
             raise ValidationError("This booking already has a review.")
 
-        serializer.save(
-            client=self.request.user,
-            business=booking.service.business,
-        )
+        with transaction.atomic():
+            review = serializer.save(
+                client=self.request.user,
+                business=booking.service.business,
+            )
+            apply_rating_change(review.business_id, added=[review.rating])
+            record_stats_change(after=review_contributions([review]))
+            enqueue("review.created", review, REVIEW_EVENT_FIELDS)
+
+    def locked(self, review):
+        """Re-read a review's rating under a row lock, so concurrent edits can't both undo the same one."""
+        return Review.objects.select_for_update().only("business_id", "rating", "created_at").get(pk=review.pk)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        for field in ("booking", "business"):
+            if field in serializer.validated_data and serializer.validated_data[field] != getattr(instance, field):
+                raise ValidationError({field: "A review can't be moved to another booking or business."})
+
+        with transaction.atomic():
+            current = self.locked(instance)
+            old_rating = current.rating
+            before = review_contributions([current])
 
+            review = serializer.save()
+            if review.rating != old_rating:
+                apply_rating_change(review.business_id, added=[review.rating], removed=[old_rating])
+            record_stats_change(before, review_contributions([review]))
+            enqueue("review.updated", review, REVIEW_EVENT_FIELDS)
 
-class MessageViewSet(viewsets.ModelViewSet):
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            current = self.locked(instance)
+            business_id, rating = current.business_id, current.rating
+            before = review_contributions([current])
+            enqueue("review.deleted", instance, REVIEW_EVENT_FIELDS)
+            instance.delete()
+            apply_rating_change(business_id, removed=[rating])
+            record_stats_change(before)
+
+
+class MessageViewSet(SparseFieldsMixin, ExpandMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ["-created_at"]
 
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
             return Message.objects.select_related("sender", "recipient", "business").all()
 
-        return Message.objects.select_related("sender", "recipient", "business").filter(
-            Q(sender=user) | Q(recipient=user)
+        return owned_by(
+            Message.objects.select_related("sender", "recipient", "business"),
+            user,
+            "sender",
+            "recipient",
         )
 
     def perform_create(self, serializer):
-        serializer.save(sender=self.request.user)
+        data = serializer.validated_data
+        recipient, business = data["recipient"], data["business"]
+        client_id = client_of(self.request.user.pk, recipient.pk, business.owner_id)
+        if client_id is None or recipient == self.request.user:
+            raise ValidationError({"recipient": "Messages go between a client and the business owner."})
+
+        with transaction.atomic():
+            conversation = conversation_for(client_id, business.pk)
+            message = serializer.save(sender=self.request.user, conversation=conversation)
+            record_message(message)
+            push([message.sender_id, message.recipient_id], "message.created", serializer.data)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        for field in ("recipient", "business"):
+            if field in serializer.validated_data and serializer.validated_data[field] != getattr(instance, field):
+                raise ValidationError({field: "A message can't be moved to another conversation."})
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            if instance.conversation_id is not None:
+                refresh_last_messages(Conversation.objects.filter(pk=instance.conversation_id, last_message=None))
+
+
+class ConversationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    The inbox: one row per thread, newest activity first, keyset-paginated.
+
+    `messages` pages through a single thread (newest first) and `read`
+    clears the caller's unread counter; both cost O(page) however long the
+    history is.
+    """
+
+    serializer_class = ConversationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["business"]
+    ordering = ["-last_message_at"]
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = Conversation.objects.select_related("business", "last_message")
+        if user.is_staff:
+            return queryset.all()
+        return owned_by(queryset, user, "client", "business__owner")
+
+    @action(detail=True, methods=["get"], serializer_class=MessageSerializer)
+    def messages(self, request, pk=None):
+        conversation = self.get_object()
+        page = self.paginate_queryset(conversation.messages.order_by("-created_at"))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=True, methods=["post"])
+    def read(self, request, pk=None):
+        conversation = self.get_object()
+        side = participant_side(conversation, request.user)
+        if side is None:
+            raise PermissionDenied("Only participants can mark a conversation as read.")
+        mark_read(conversation, side)
+        return Response(status=204)
@@ -0,0 +1,97 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = 422
+    default_detail = "This Idempotency-Key was already used with a different request."
+    default_code = "idempotency_key_reused"
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, cls=JSONEncoder, sort_keys=True)
+    return hashlib.sha256(f"{request.method} {request.get_full_path()}\n{body}".encode()).hexdigest()
+
+
+def lock_key(user, key):
+    """
+    The key's row, locked until the end of the transaction. Inserted first if
+    new: a concurrent request with the same key waits on that one row (its
+    insert, then its lock) rather than on the table.
+    """
+    IdempotencyKey.objects.bulk_create(
+        [IdempotencyKey(user=user, key=key, expires_at=timezone.now())],
+        ignore_conflicts=True,
+    )
+    return IdempotencyKey.objects.select_for_update().get(user=user, key=key)
+
+
+class IdempotencyMixin:
+    """
+    Honour an `Idempotency-Key` header on `create` (and on `bulk_create`,
+    when the view also uses BulkCreateMixin).
+
+    The first request with a key runs normally and its response is stored
+    for `IDEMPOTENCY_KEY_TTL` seconds, in the same transaction as the write.
+    A retry with the same key and body gets the stored response back
+    (marked `Idempotent-Replayed: true`) without touching the serializer or
+    the database beyond the key's row; with a different body it's a 422.
+    Duplicates that arrive while the first is still running wait for it on
+    the key's row lock. A request that fails (raises, or answers with
+    anything but a 2xx) stores nothing, so it can be retried with the same
+    key.
+    """
+
+    def create(self, request, *args, **kwargs):
+        return self.idempotent(super().create, request, *args, **kwargs)
+
+    def bulk_create(self, request, *args, **kwargs):
+        return self.idempotent(super().bulk_create, request, *args, **kwargs)
+
+    def idempotent(self, handler, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return handler(request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            raise ValidationError({HEADER: "Ensure this header has no more than 255 characters."})
+
+        fingerprint = request_fingerprint(request)
+        with transaction.atomic():
+            record = lock_key(request.user, key)
+            if record.response_status is not None and record.expires_at > timezone.now():
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused()
+                response = Response(
+                    record.response_body,
+                    status=record.response_status,
+                    headers=self.get_success_headers(record.response_body),
+                )
+                response["Idempotent-Replayed"] = "true"
+                return response
+
+            response = handler(request, *args, **kwargs)
+            if not status.is_success(response.status_code):
+                # Failures come back as responses too (a bulk create where every item failed):
+                # leave no trace, so the request can be retried under the same key.
+                transaction.set_rollback(True)
+                return response
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                fingerprint=fingerprint,
+                response_status=response.status_code,
+                response_body=response.data,
+                expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+            )
+        return response
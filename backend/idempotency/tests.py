@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from catalog.models import Business, Category, Service
+from transactions.models import Booking, Payment
+from .models import IdempotencyKey
+
+
+class IdempotencyKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.client_user = User.objects.create_user("client", password="x")
+        owner = User.objects.create_user("owner", password="x")
+        business = Business.objects.create(owner=owner, name="Kings")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        service = Service.objects.create(business=business, category=category, name="Cut", price=50)
+        cls.booking = Booking.objects.create(service=service, client=cls.client_user, scheduled_at=timezone.now())
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def pay(self, key, amount="50.00"):
+        return self.api.post(
+            "/api/payments/",
+            {"booking": self.booking.pk, "amount": amount, "payment_status": "completed"},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_the_stored_response_without_writing(self):
+        first = self.pay("k1")
+        self.assertEqual(first.status_code, 201)
+
+        # The key's insert-if-new and locked read, inside a savepoint.
+        with self.assertNumQueries(4) as queries:
+            retry = self.pay("k1")
+        self.assertEqual((retry.status_code, retry.data), (201, first.data))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertFalse([q for q in queries.captured_queries if "transactions_payment" in q["sql"]])
+        self.assertEqual(Payment.objects.count(), 1)
+
+        # Keys are per user, and other keys create as usual.
+        self.assertEqual(self.pay("k2").status_code, 201)
+        self.assertEqual(Payment.objects.count(), 2)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        self.pay("k1")
+        self.assertEqual(self.pay("k1", amount="60.00").status_code, 422)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_failed_request_leaves_the_key_unused(self):
+        self.assertEqual(self.pay("k1", amount="0").status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.pay("k1").status_code, 201)
+
+    def test_failed_bulk_request_can_be_retried(self):
+        items = [{"booking": self.booking.pk, "amount": "0"}]
+        for _ in range(2):
+            response = self.api.post("/api/payments/bulk/", items, format="json", HTTP_IDEMPOTENCY_KEY="k1")
+            self.assertEqual(response.status_code, 400)
+            self.assertNotIn("Idempotent-Replayed", response)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        items[0]["amount"] = "50.00"
+        response = self.api.post("/api/payments/bulk/", items, format="json", HTTP_IDEMPOTENCY_KEY="k1")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_expired_keys_run_again_and_are_purged(self):
+        self.pay("k1")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertNotIn("Idempotent-Replayed", self.pay("k1"))
+        self.assertEqual(Payment.objects.count(), 2)
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        call_command("purge_idempotency_keys", stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.exists())
@@ -0,0 +1,26 @@
+from .models import OutboxEvent
+
+
+def build_event(topic, instance, fields=(), extra=None):
+    """An unsaved event for `instance`: its pk plus `fields` (foreign keys as ids) and `extra`."""
+    opts = instance._meta
+    payload = {"id": instance.pk}
+    for name in fields:
+        payload[name] = getattr(instance, opts.get_field(name).attname)
+    payload.update(extra or {})
+    return OutboxEvent(topic=topic, payload=payload)
+
+
+def enqueue(topic, instance, fields=(), extra=None):
+    """
+    Record a side effect of changing `instance`. Call it inside the transaction
+    making the change, so the event commits (or rolls back) with it.
+    """
+    event = build_event(topic, instance, fields, extra)
+    event.save()
+    return event
+
+
+def enqueue_many(topic, instances, fields=()):
+    """`enqueue` for a bulk write: one INSERT for all the events."""
+    return OutboxEvent.objects.bulk_create([build_event(topic, instance, fields) for instance in instances])
@@ -0,0 +1,31 @@
+import json
+import logging
+import urllib.request
+
+from .worker import outbox_setting
+
+logger = logging.getLogger(__name__)
+
+
+def log_event(event):
+    logger.info("%s %s", event.topic, json.dumps(event.payload))
+
+
+def post_webhook(event):
+    """
+    POST the event as JSON to `OUTBOX["WEBHOOK_URL"]` (a no-op when unset).
+    An error status or a timeout fails the attempt, so it's retried.
+    """
+    url = outbox_setting("WEBHOOK_URL")
+    if not url:
+        return
+    body = json.dumps({"id": event.pk, "topic": event.topic, "payload": event.payload}).encode()
+    request = urllib.request.Request(
+        url,
+        data=body,
+        method="POST",
+        # Lets the receiver drop the repeats of at-least-once delivery.
+        headers={"Content-Type": "application/json", "Idempotency-Key": f"outbox-{event.pk}"},
+    )
+    with urllib.request.urlopen(request, timeout=outbox_setting("WEBHOOK_TIMEOUT") or 10) as response:
+        response.read()
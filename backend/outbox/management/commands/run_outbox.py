@@ -0,0 +1,55 @@
+import logging
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from outbox.worker import outbox_setting, run_batch
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Carry out queued outbox events (webhooks, notifications, ...). Start as many of these "
+        "as needed, on any hosts sharing the database: each claims its own batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Events claimed at a time (default: OUTBOX['BATCH_SIZE']).")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to sleep when nothing is due (default: 1).")
+        parser.add_argument("--once", action="store_true", help="Exit once nothing is due instead of polling.")
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"[-64:]
+        size = options["batch_size"] or outbox_setting("BATCH_SIZE")
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            # Finish the current batch, then exit.
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        handled = failed = 0
+        while not stopping.is_set():
+            close_old_connections()
+            try:
+                done, errors = run_batch(worker_id, size)
+            except DatabaseError:
+                # Database restarting, lock timeouts...: back off and keep the worker alive.
+                logger.exception("Outbox worker %s could not run a batch", worker_id)
+                stopping.wait(options["poll"])
+                continue
+            handled += done
+            failed += errors
+            if done + errors == 0:
+                if options["once"]:
+                    break
+                stopping.wait(options["poll"])
+
+        self.stdout.write(self.style.SUCCESS(f"Handled {handled} events; {failed} failed attempts."))
@@ -0,0 +1,45 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """
+    A side effect to run after a write, recorded in the write's own transaction
+    (see outbox.events) and carried out by `manage.py run_outbox` workers.
+
+    Handled events are deleted; an event whose handlers keep failing ends up
+    `failed` with its last error, for inspection in the admin.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        FAILED = "failed", "Failed"
+
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # Due time: now for new events, the backoff for retries, the lease end while claimed.
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=64, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers' claim query: due pending events, oldest first
+            models.Index(
+                fields=["available_at", "id"],
+                condition=Q(status="pending"),
+                name="outbox_pending_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"OutboxEvent({self.topic} #{self.pk})"
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from catalog.models import Business, Category, Service
+from .events import enqueue
+from .models import OutboxEvent
+from .worker import claim_batch, run_batch
+
+handled = []
+
+
+def record(event):
+    handled.append((event.topic, event.payload["id"]))
+
+
+def explode(event):
+    raise RuntimeError("receiver is down")
+
+
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.client_user = User.objects.create_user("client", password="x")
+        cls.owner = User.objects.create_user("owner", password="x")
+        business = Business.objects.create(owner=cls.owner, name="Kings")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        cls.service = Service.objects.create(business=business, category=category, name="Cut", price=50)
+
+    def setUp(self):
+        handled.clear()
+
+    def book(self, scheduled_at):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        return api.post("/api/bookings/", {"service": self.service.pk, "scheduled_at": scheduled_at}, format="json")
+
+    def test_writes_enqueue_events_in_their_transaction(self):
+        scheduled_at = timezone.now() + timedelta(days=1)
+        booking = self.book(scheduled_at)
+        self.assertEqual(booking.status_code, 201)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, "booking.created")
+        self.assertEqual(
+            (event.payload["id"], event.payload["client"], event.payload["status"]),
+            (booking.data["id"], self.client_user.pk, "pending"),
+        )
+
+        # A rejected write leaves no event behind.
+        self.assertEqual(self.book(scheduled_at).status_code, 400)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    @override_settings(OUTBOX={"HANDLERS": {"booking.*": ["outbox.tests.record"]}})
+    def test_worker_runs_handlers_and_deletes_handled_events(self):
+        self.book(timezone.now() + timedelta(days=1))
+        self.book(timezone.now() + timedelta(days=2))
+        call_command("run_outbox", "--once", stdout=StringIO())
+        self.assertEqual([topic for topic, _id in handled], ["booking.created", "booking.created"])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    @override_settings(OUTBOX={"HANDLERS": {"*": ["outbox.tests.explode"]}, "MAX_ATTEMPTS": 2})
+    def test_failures_retry_with_backoff_then_give_up(self):
+        event = enqueue("booking.created", self.service)
+        with self.assertLogs("outbox.worker", "WARNING"):
+            self.assertEqual(run_batch("w1"), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts, event.claimed_by), ("pending", 1, ""))
+        self.assertGreater(event.available_at, timezone.now())
+        self.assertIn("receiver is down", event.last_error)
+
+        # Not due again until its backoff has passed.
+        self.assertEqual(run_batch("w1"), (0, 0))
+        OutboxEvent.objects.update(available_at=timezone.now())
+        with self.assertLogs("outbox.worker", "WARNING"):
+            self.assertEqual(run_batch("w1"), (0, 1))
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ("failed", 2))
+
+    def test_claimed_events_are_leased_to_one_worker(self):
+        for _ in range(3):
+            enqueue("booking.created", self.service)
+        self.assertEqual(len(claim_batch("w1", size=2)), 2)
+        self.assertEqual(len(claim_batch("w2", size=5)), 1)
+        self.assertEqual(claim_batch("w3"), [])
+
+        # A lapsed lease (the worker died) makes the events due again.
+        OutboxEvent.objects.filter(claimed_by="w1").update(available_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(claim_batch("w3")), 2)
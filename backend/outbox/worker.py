@@ -0,0 +1,108 @@
+import logging
+import random
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "HANDLERS": {},
+    "BATCH_SIZE": 100,
+    "MAX_ATTEMPTS": 8,
+    "BACKOFF_SECONDS": 5,
+    "MAX_BACKOFF_SECONDS": 3600,
+    "LEASE_SECONDS": 300,
+}
+
+
+def outbox_setting(name):
+    return getattr(settings, "OUTBOX", {}).get(name, DEFAULTS.get(name))
+
+
+def handlers_for(topic):
+    """Handlers registered for `topic` itself, its family (`"booking.*"`) and every topic (`"*"`)."""
+    handlers = outbox_setting("HANDLERS")
+    family = topic.split(".", 1)[0] + ".*"
+    return [import_string(path) for key in (topic, family, "*") for path in handlers.get(key, ())]
+
+
+def backoff(attempts):
+    """Seconds before retry number `attempts`: exponential, capped, with jitter so failures don't retry in lockstep."""
+    delay = min(outbox_setting("BACKOFF_SECONDS") * 2 ** (attempts - 1), outbox_setting("MAX_BACKOFF_SECONDS"))
+    return delay * random.uniform(0.5, 1)
+
+
+def claim_batch(worker_id, size=None):
+    """
+    Lease up to `size` due events to `worker_id` and return them.
+
+    Candidates are read with `FOR UPDATE SKIP LOCKED` where the database has
+    it, so concurrent workers take disjoint batches without waiting on each
+    other. The lease itself is a conditional UPDATE, which also keeps workers
+    on databases without SKIP LOCKED (SQLite) from claiming a row twice. A
+    worker that dies mid-batch loses its lease after `LEASE_SECONDS` and the
+    events become due again.
+    """
+    now = timezone.now()
+    lease_end = now + timedelta(seconds=outbox_setting("LEASE_SECONDS"))
+    due = OutboxEvent.objects.filter(status=OutboxEvent.Status.PENDING, available_at__lte=now).order_by("available_at", "id")
+    if connection.features.has_select_for_update_skip_locked:
+        due = due.select_for_update(skip_locked=True)
+        atomic = transaction.atomic()
+    else:
+        # No row locks to hold, and on SQLite a read-then-write transaction
+        # fails outright ("database is locked") when another worker writes first.
+        atomic = nullcontext()
+
+    with atomic:
+        ids = list(due.values_list("pk", flat=True)[: size or outbox_setting("BATCH_SIZE")])
+        if not ids:
+            return []
+        OutboxEvent.objects.filter(pk__in=ids, status=OutboxEvent.Status.PENDING, available_at__lte=now).update(
+            claimed_by=worker_id,
+            available_at=lease_end,
+            attempts=F("attempts") + 1,
+        )
+    return list(OutboxEvent.objects.filter(pk__in=ids, claimed_by=worker_id, available_at=lease_end).order_by("id"))
+
+
+def run_batch(worker_id, size=None):
+    """
+    Claim a batch and run each event's handlers. Returns `(handled, failed)`.
+
+    Delivery is at least once: handled events are deleted together at the
+    end of the batch, so a crash can repeat some of them. Handlers should be
+    idempotent (key on the event id).
+    """
+    events = claim_batch(worker_id, size)
+    handled = []
+    for event in events:
+        try:
+            for handler in handlers_for(event.topic):
+                handler(event)
+        except Exception as exc:
+            logger.warning("Outbox event %s (%s) failed on attempt %s: %r", event.pk, event.topic, event.attempts, exc)
+            record_failure(event, exc)
+        else:
+            handled.append(event.pk)
+    if handled:
+        OutboxEvent.objects.filter(pk__in=handled, claimed_by=worker_id).delete()
+    return len(handled), len(events) - len(handled)
+
+
+def record_failure(event, exc):
+    """Schedule a retry with backoff, or give up after `MAX_ATTEMPTS`."""
+    changes = {"last_error": repr(exc)[:2000], "claimed_by": ""}
+    if event.attempts >= outbox_setting("MAX_ATTEMPTS"):
+        changes["status"] = OutboxEvent.Status.FAILED
+    else:
+        changes["available_at"] = timezone.now() + timedelta(seconds=backoff(event.attempts))
+    OutboxEvent.objects.filter(pk=event.pk, claimed_by=event.claimed_by).update(**changes)
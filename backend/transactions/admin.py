@@ -1,5 +1,23 @@
 from django.contrib import admin
-from .models import Booking, Payment
+from .models import Booking, BusinessDailyStats, Payment, StatusTransition
 
 admin.site.register(Booking)
 admin.site.register(Payment)
+admin.site.register(BusinessDailyStats)
+
+
+@admin.register(StatusTransition)
+class StatusTransitionAdmin(admin.ModelAdmin):
+    """Read-only: the log is append-only."""
+
+    list_display = ["subject", "object_id", "from_status", "to_status", "version", "actor", "created_at"]
+    list_filter = ["subject"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
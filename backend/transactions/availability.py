@@ -0,0 +1,76 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+
+from catalog.models import Service
+from .models import Booking, service_duration
+
+# Used for businesses that haven't configured any BusinessHours: Mon-Sat 09:00-17:00.
+DEFAULT_OPENING_HOURS = {weekday: (time(9), time(17)) for weekday in range(6)}
+
+
+def lock_service(service):
+    """
+    Take a row lock on the service for the rest of the transaction.
+
+    Every booking write for a service goes through this lock, so the
+    conflict check and the insert can't interleave with another request.
+    """
+    return Service.objects.select_for_update().select_related("business").get(pk=service.pk)
+
+
+def overlapping_bookings(service, start, end, exclude_pk=None):
+    """
+    Non-canceled bookings of `service` overlapping [start, end).
+
+    Each booking keeps the end it was booked with, so this is a single range
+    scan on the (service, ends_at) index.
+    """
+    bookings = Booking.objects.filter(
+        service=service,
+        ends_at__gt=start,
+        scheduled_at__lt=end,
+    ).exclude(status=Booking.Status.CANCELED)
+    if exclude_pk is not None:
+        bookings = bookings.exclude(pk=exclude_pk)
+    return bookings
+
+
+def has_conflict(service, start, end, exclude_pk=None):
+    return overlapping_bookings(service, start, end, exclude_pk).exists()
+
+
+def opening_window(business, day):
+    """Aware (opens, closes) datetimes for `day`, or None if the business is closed."""
+    hours = {h.weekday: (h.opens_at, h.closes_at) for h in business.opening_hours.all()}
+    hours = hours or DEFAULT_OPENING_HOURS
+    if day.weekday() not in hours:
+        return None
+
+    opens_at, closes_at = hours[day.weekday()]
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(day, opens_at), tz),
+        timezone.make_aware(datetime.combine(day, closes_at), tz),
+    )
+
+
+def free_slots(service, day, now=None):
+    """Bookable (start, end) slots for `service` on `day`, one service duration apart."""
+    window = opening_window(service.business, day)
+    if window is None:
+        return []
+
+    opens, closes = window
+    duration = service_duration(service)
+    now = now or timezone.now()
+    busy = list(overlapping_bookings(service, opens, closes).values_list("scheduled_at", "ends_at"))
+
+    slots = []
+    start = opens
+    while start + duration <= closes:
+        end = start + duration
+        if start > now and not any(b_start < end and b_end > start for b_start, b_end in busy):
+            slots.append((start, end))
+        start = end
+    return slots
@@ -0,0 +1,84 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from catalog.models import Service
+from transactions.availability import service_duration
+
+
+class Command(BaseCommand):
+    help = "Compare booking throughput of per-item POST /api/bookings/ vs POST /api/bookings/bulk/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            default=500,
+            help="Bookings created on each path (default: 500).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Items per bulk request (default: 100).",
+        )
+        parser.add_argument(
+            "--username",
+            default="client1",
+            help="User the bookings are made as (default: client1 from `seed`).",
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(username=options["username"]).first()
+        service = Service.objects.first()
+        if user is None or service is None:
+            raise CommandError("Seed data missing. Run `manage.py seed` first.")
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        items, batch_size = options["items"], options["batch_size"]
+
+        setup_test_environment()
+        try:
+            # Everything is rolled back, so the benchmark leaves no bookings behind.
+            with transaction.atomic():
+                single = self.run_single(client, self.payloads(service, items, offset_days=400))
+                bulk = self.run_bulk(client, self.payloads(service, items, offset_days=800), batch_size)
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+
+        self.stdout.write(f"per-item POST : {items / single:9.1f} bookings/s ({single:.2f}s)")
+        self.stdout.write(f"bulk POST x{batch_size:<4}: {items / bulk:9.1f} bookings/s ({bulk:.2f}s)")
+        self.stdout.write(self.style.SUCCESS(f"speed-up: {single / bulk:.1f}x"))
+
+    def payloads(self, service, count, offset_days):
+        start = timezone.now().replace(microsecond=0) + timedelta(days=offset_days)
+        step = service_duration(service)
+        return [
+            {"service": service.pk, "scheduled_at": (start + i * step).isoformat()}
+            for i in range(count)
+        ]
+
+    def run_single(self, client, payloads):
+        started = time.perf_counter()
+        for payload in payloads:
+            response = client.post("/api/bookings/", payload, format="json")
+            if response.status_code != 201:
+                raise CommandError(f"Per-item create failed: {response.status_code} {response.data}")
+        return time.perf_counter() - started
+
+    def run_bulk(self, client, payloads, batch_size):
+        started = time.perf_counter()
+        for i in range(0, len(payloads), batch_size):
+            response = client.post("/api/bookings/bulk/", payloads[i: i + batch_size], format="json")
+            if response.status_code != 201:
+                raise CommandError(f"Bulk create failed: {response.status_code} {response.data}")
+        return time.perf_counter() - started
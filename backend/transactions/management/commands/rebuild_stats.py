@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from transactions.stats import rebuild_business_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the BusinessDailyStats rollup from bookings, payments and reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--business",
+            type=int,
+            action="append",
+            dest="business_ids",
+            help="Only rebuild the given business id (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        rows = rebuild_business_stats(business_ids=options["business_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily stats rows."))
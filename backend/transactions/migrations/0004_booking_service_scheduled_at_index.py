@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_business_hours'),
+        ('transactions', '0003_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['service', 'scheduled_at'], name='transaction_service_16a3df_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_business_hours'),
+        ('transactions', '0004_booking_service_scheduled_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['client', 'created_at'], name='transaction_client__0435bb_idx'),
+        ),
+    ]
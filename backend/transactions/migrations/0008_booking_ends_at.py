@@ -0,0 +1,50 @@
+# Generated by Django 5.2.11 on 2026-10-18 14:27
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+DEFAULT_DURATION_MINUTES = 60
+
+
+def backfill_ends_at(apps, schema_editor):
+    """Existing bookings end one (current) service duration after they start: one UPDATE per duration."""
+    Booking = apps.get_model("transactions", "Booking")
+    Service = apps.get_model("catalog", "Service")
+    for minutes in Service.objects.values_list("duration_minutes", flat=True).distinct():
+        Booking.objects.filter(service__duration_minutes=minutes).update(
+            ends_at=F("scheduled_at") + timedelta(minutes=minutes or DEFAULT_DURATION_MINUTES),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_geohash_field'),
+        ('transactions', '0007_status_versions_and_transition_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='transaction_service_16a3df_idx',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_ends_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='ends_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['service', 'ends_at'], name='transaction_service_e32f86_idx'),
+        ),
+    ]
@@ -1,7 +1,15 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator
 
+DEFAULT_DURATION_MINUTES = 60
+
+
+def service_duration(service):
+    return timedelta(minutes=service.duration_minutes or DEFAULT_DURATION_MINUTES)
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -29,21 +37,36 @@ class Booking(TimeStampedModel):
         related_name="bookings",
     )
     scheduled_at = models.DateTimeField()
+    # Fixed when the slot is booked, so later changes to the service's
+    # duration don't stretch or shrink existing bookings.
+    ends_at = models.DateTimeField(editable=False)
     status = models.CharField(
         max_length=20,
         choices=Status.choices,
         default=Status.PENDING,
     )
+    # Bumped on every update (see transactions.transitions).
+    version = models.PositiveIntegerField(default=0)
 
     class Meta:
         indexes = [
             models.Index(fields=["scheduled_at"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["created_at", "id"]),
+            # Availability / conflict range scans per service (bookings ending after a point)
+            models.Index(fields=["service", "ends_at"]),
+            # Ownership-scoping arm (see common.scoping.owned_by)
+            models.Index(fields=["client", "created_at"]),
         ]
 
     def __str__(self):
         return f"Booking({self.client} → {self.service} at {self.scheduled_at})"
 
+    def save(self, *args, **kwargs):
+        if self.ends_at is None:
+            self.ends_at = self.scheduled_at + service_duration(self.service)
+        super().save(*args, **kwargs)
+
 
 class Payment(TimeStampedModel):
     class Method(models.TextChoices):
@@ -79,12 +102,89 @@ class Payment(TimeStampedModel):
         default=Status.PENDING,
     )
     payment_date = models.DateTimeField(null=True, blank=True)
+    # Bumped on every update (see transactions.transitions).
+    version = models.PositiveIntegerField(default=0)
 
     class Meta:
         indexes = [
             models.Index(fields=["payment_status"]),
             models.Index(fields=["payment_method"]),
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self):
         return f"Payment({self.amount} for booking {self.booking_id})"
+
+
+class StatusTransition(models.Model):
+    """
+    Append-only log of booking and payment status changes, written with the
+    change itself (see transactions.transitions). It outlives the rows it
+    describes, so audits read this rather than reconstructing history.
+    """
+
+    class Subject(models.TextChoices):
+        BOOKING = "booking", "Booking"
+        PAYMENT = "payment", "Payment"
+
+    subject = models.CharField(max_length=20, choices=Subject.choices)
+    object_id = models.PositiveBigIntegerField()
+    from_status = models.CharField(max_length=20)
+    to_status = models.CharField(max_length=20)
+    # The row's version after the change
+    version = models.PositiveIntegerField()
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["subject", "object_id", "id"]),
+        ]
+
+    def __str__(self):
+        return f"StatusTransition({self.subject} {self.object_id}: {self.from_status} → {self.to_status})"
+
+
+class BusinessDailyStats(models.Model):
+    """
+    Per-business, per-day rollup behind the owner dashboard.
+
+    Bookings count on the day they are scheduled for, completed revenue on
+    its payment day and ratings on the review day. Rows are adjusted
+    incrementally by `transactions.stats` as bookings, payments and reviews
+    change, and can be rebuilt with `manage.py rebuild_stats`.
+    """
+
+    business = models.ForeignKey(
+        "catalog.Business",
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+    )
+    day = models.DateField()
+
+    bookings_pending = models.IntegerField(default=0)
+    bookings_confirmed = models.IntegerField(default=0)
+    bookings_canceled = models.IntegerField(default=0)
+    bookings_completed = models.IntegerField(default=0)
+
+    payments_completed = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["business", "day"], name="uniq_business_daily_stats"),
+        ]
+
+    def __str__(self):
+        return f"BusinessDailyStats({self.business_id} @ {self.day})"
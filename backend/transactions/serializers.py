@@ -1,13 +1,46 @@
 from django.utils import timezone
 from rest_framework import serializers
-from .models import Booking, Payment
+from accounts.serializers import UserSummarySerializer
+from catalog.serializers import ServiceSerializer
+from common.expand import ExpandableFieldsMixin
+from common.instrumentation import MeasuredSerializerMixin
+from .models import Booking, Payment, StatusTransition
+from .transitions import apply_changes, check_initial_status, check_transition
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class StatusMachineSerializerMixin:
+    """
+    New rows must start in one of the model's `INITIAL_STATUSES`. Updates go
+    through `transactions.transitions.apply_changes`: the status must follow
+    the model's transitions, and an update that sends the `version` it last
+    saw fails with 409 if the row has changed since.
+    """
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if self.instance is None:
+            # New rows start at version 0.
+            attrs.pop("version", None)
+            check_initial_status(self.Meta.model, attrs)
+        else:
+            check_transition(self.instance, attrs)
+        return attrs
+
+    def update(self, instance, validated_data):
+        expected_version = validated_data.pop("version", None)
+        request = self.context.get("request")
+        return apply_changes(instance, validated_data, expected_version, actor=getattr(request, "user", None))
+
+
+class BookingSerializer(MeasuredSerializerMixin, StatusMachineSerializerMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = "__all__"
         read_only_fields = ["client", "created_at", "updated_at"]
+        expandable_fields = {
+            "service": ServiceSerializer,
+            "client": UserSummarySerializer,
+        }
 
     def validate_scheduled_at(self, value):
         # Preventing booking in the past
@@ -16,29 +49,36 @@ class BookingSerializer(serializers.ModelSerializer):
         return value
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(MeasuredSerializerMixin, StatusMachineSerializerMixin, ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = "__all__"
         read_only_fields = ["created_at", "updated_at"]
+        expandable_fields = {"booking": BookingSerializer}
 
     def validate(self, attrs):
         amount = attrs.get("amount")
         if amount is not None and amount <= 0:
             raise serializers.ValidationError({"amount": "Amount must be greater than 0."})
-        return attrs
-
-    def create(self, validated_data):
-        from django.utils import timezone
+        return super().validate(attrs)
 
+    @staticmethod
+    def stamp_payment_date(validated_data):
         if validated_data.get("payment_status") == "completed" and not validated_data.get("payment_date"):
             validated_data["payment_date"] = timezone.now()
-        return super().create(validated_data)
+        return validated_data
 
-    def update(self, instance, validated_data):
-        from django.utils import timezone
+    def create(self, validated_data):
+        return super().create(self.stamp_payment_date(validated_data))
 
+    def update(self, instance, validated_data):
         new_status = validated_data.get("payment_status")
         if new_status == "completed" and instance.payment_date is None:
             validated_data["payment_date"] = timezone.now()
         return super().update(instance, validated_data)
+
+
+class StatusTransitionSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = StatusTransition
+        fields = ["id", "from_status", "to_status", "version", "actor", "created_at"]
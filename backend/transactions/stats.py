@@ -0,0 +1,193 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from engagement.models import Review
+from .models import Booking, BusinessDailyStats, Payment
+
+STATUS_COLUMNS = {status: f"bookings_{status}" for status in Booking.Status.values}
+
+
+def local_day(value):
+    return timezone.localdate(value or timezone.now())
+
+
+def booking_contributions(bookings):
+    """`[((business_id, day), {column: delta})]` a set of bookings adds to the rollup."""
+    return [
+        (
+            (booking.service.business_id, local_day(booking.scheduled_at)),
+            {STATUS_COLUMNS[booking.status]: 1},
+        )
+        for booking in bookings
+    ]
+
+
+def payment_contributions(payments):
+    return [
+        (
+            (payment.booking.service.business_id, local_day(payment.payment_date or payment.created_at)),
+            {"payments_completed": 1, "revenue": payment.amount},
+        )
+        for payment in payments
+        if payment.payment_status == Payment.Status.COMPLETED
+    ]
+
+
+def completed_payments(booking):
+    """Completed payments of `booking`, pointed at that same instance so they follow its edits."""
+    payments = list(booking.payments.filter(payment_status=Payment.Status.COMPLETED))
+    for payment in payments:
+        payment.booking = booking
+    return payments
+
+
+def review_contributions(reviews):
+    return [
+        (
+            (review.business_id, local_day(review.created_at)),
+            {"rating_sum": review.rating, "rating_count": 1},
+        )
+        for review in reviews
+    ]
+
+
+def record_stats_change(before=(), after=()):
+    """
+    Apply `after - before` to the daily rollup.
+
+    Callers snapshot an object's contributions before a write and again after
+    it; only the difference is written, as `col = col + delta` updates, so
+    concurrent writers to the same day never lose each other's counts.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for sign, contributions in ((-1, before), (1, after)):
+        for key, values in contributions:
+            for column, value in values.items():
+                deltas[key][column] += sign * value
+
+    deltas = {
+        key: {column: value for column, value in values.items() if value}
+        for key, values in deltas.items()
+    }
+    deltas = {key: values for key, values in deltas.items() if values}
+    if not deltas:
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        BusinessDailyStats.objects.bulk_create(
+            [BusinessDailyStats(business_id=business_id, day=day) for business_id, day in deltas],
+            ignore_conflicts=True,
+        )
+        for (business_id, day), values in sorted(deltas.items()):
+            BusinessDailyStats.objects.filter(business_id=business_id, day=day).update(
+                updated_at=now,
+                **{column: F(column) + value for column, value in values.items()},
+            )
+
+
+def rebuild_business_stats(business_ids=None):
+    """
+    Recompute the rollup from the bookings, payments and reviews tables.
+
+    Three GROUP BY queries; the affected rows are replaced in one transaction.
+    Returns the number of daily rows written.
+    """
+    bookings = Booking.objects.all()
+    payments = Payment.objects.filter(payment_status=Payment.Status.COMPLETED)
+    reviews = Review.objects.all()
+    existing = BusinessDailyStats.objects.all()
+    if business_ids is not None:
+        bookings = bookings.filter(service__business_id__in=business_ids)
+        payments = payments.filter(booking__service__business_id__in=business_ids)
+        reviews = reviews.filter(business_id__in=business_ids)
+        existing = existing.filter(business_id__in=business_ids)
+
+    rows = {}
+
+    def row(business_id, day):
+        if (business_id, day) not in rows:
+            rows[business_id, day] = BusinessDailyStats(business_id=business_id, day=day)
+        return rows[business_id, day]
+
+    grouped = (
+        bookings.annotate(day=TruncDate("scheduled_at"))
+        .values("service__business_id", "day", "status")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for item in grouped:
+        setattr(row(item["service__business_id"], item["day"]), STATUS_COLUMNS[item["status"]], item["n"])
+
+    grouped = (
+        payments.annotate(day=TruncDate(Coalesce("payment_date", "created_at")))
+        .values("booking__service__business_id", "day")
+        .annotate(n=Count("id"), total=Sum("amount"))
+        .order_by()
+    )
+    for item in grouped:
+        stats = row(item["booking__service__business_id"], item["day"])
+        stats.payments_completed = item["n"]
+        stats.revenue = item["total"]
+
+    grouped = (
+        reviews.annotate(day=TruncDate("created_at"))
+        .values("business_id", "day")
+        .annotate(n=Count("id"), total=Sum("rating"))
+        .order_by()
+    )
+    for item in grouped:
+        stats = row(item["business_id"], item["day"])
+        stats.rating_count = item["n"]
+        stats.rating_sum = item["total"]
+
+    with transaction.atomic():
+        existing.delete()
+        BusinessDailyStats.objects.bulk_create(rows.values(), batch_size=1000)
+    return len(rows)
+
+
+def business_stats(business, start, end):
+    """Dashboard payload for `business` between `start` and `end` (inclusive), read from the rollup."""
+    rows = BusinessDailyStats.objects.filter(business=business, day__range=(start, end)).order_by("day")
+
+    by_status = dict.fromkeys(Booking.Status.values, 0)
+    revenue = Decimal("0")
+    payments = rating_sum = rating_count = 0
+    days = []
+    for stats in rows:
+        statuses = {status: getattr(stats, column) for status, column in STATUS_COLUMNS.items()}
+        for status, n in statuses.items():
+            by_status[status] += n
+        revenue += stats.revenue
+        payments += stats.payments_completed
+        rating_sum += stats.rating_sum
+        rating_count += stats.rating_count
+        days.append({
+            "day": stats.day,
+            "revenue": str(stats.revenue),
+            "bookings": statuses,
+        })
+
+    bookings = sum(by_status.values())
+    return {
+        "business": business.pk,
+        "start": start,
+        "end": end,
+        "totals": {
+            "revenue": str(revenue),
+            "payments_completed": payments,
+            "bookings": bookings,
+            "bookings_by_status": by_status,
+            "cancellation_rate": round(by_status[Booking.Status.CANCELED] / bookings, 4) if bookings else None,
+            "completion_rate": round(by_status[Booking.Status.COMPLETED] / bookings, 4) if bookings else None,
+            "rating_avg": round(rating_sum / rating_count, 2) if rating_count else None,
+            "rating_count": rating_count,
+        },
+        "days": days,
+    }
@@ -1,3 +1,513 @@
-from django.test import TestCase
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from catalog.models import Business, BusinessHours, Category, Service
+from common.bulk import BulkCreateMixin
+from common.expand import QueryBudgetExceeded
+from common.scoping import owned_by
+from outbox.models import OutboxEvent
+from .availability import free_slots
+from .models import Booking, BusinessDailyStats, Payment, StatusTransition
+from .stats import rebuild_business_stats
+from .transitions import StaleVersion, apply_changes
+from .views import BookingViewSet, PaymentViewSet
+
+
+class OwnershipScopingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user("owner", password="x")
+        cls.client_user = User.objects.create_user("client", password="x")
+        cls.stranger = User.objects.create_user("stranger", password="x")
+
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        business = Business.objects.create(owner=cls.owner, name="Kings")
+        cls.service = Service.objects.create(business=business, category=category, name="Fade", price=100)
+
+        start = timezone.now() + timedelta(days=1)
+        cls.bookings = [
+            Booking.objects.create(service=cls.service, client=cls.client_user, scheduled_at=start + timedelta(hours=i))
+            for i in range(5)
+        ]
+        # Owner booking their own service matches both arms and must still appear once.
+        cls.bookings.append(
+            Booking.objects.create(service=cls.service, client=cls.owner, scheduled_at=start - timedelta(hours=1))
+        )
+        for booking in cls.bookings:
+            Payment.objects.create(booking=booking, amount=100)
+
+    def list_ids(self, user, url):
+        api = APIClient()
+        api.force_authenticate(user)
+        response = api.get(url, {"pagination": "cursor"})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_owner_sees_every_booking_once(self):
+        ids = self.list_ids(self.owner, "/api/bookings/")
+        self.assertCountEqual(ids, [b.pk for b in self.bookings])
+
+    def test_client_and_stranger_are_scoped(self):
+        self.assertCountEqual(self.list_ids(self.client_user, "/api/bookings/"), [b.pk for b in self.bookings[:5]])
+        self.assertEqual(self.list_ids(self.stranger, "/api/bookings/"), [])
+        self.assertEqual(self.list_ids(self.stranger, "/api/payments/"), [])
+
+    def test_export_streams_scoped_rows(self):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        response = api.get("/api/bookings/export/")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertCountEqual([json.loads(line)["id"] for line in lines], [b.pk for b in self.bookings[:5]])
+
+        api.force_authenticate(self.stranger)
+        response = api.get("/api/payments/export/", {"format": "csv", "fields": "id,amount"})
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(b"".join(response.streaming_content).decode().splitlines(), ["id,amount"])
+
+    def test_export_streams_chunk_by_chunk_under_asgi(self):
+        async def export():
+            token = AccessToken.for_user(self.client_user)
+            response = await AsyncClient().get("/api/bookings/export/", headers={"Authorization": f"Bearer {token}"})
+            return response.is_async, [chunk async for chunk in response.streaming_content]
+
+        with mock.patch.object(BookingViewSet, "export_chunk_size", 2):
+            is_async, chunks = async_to_sync(export)()
+        self.assertTrue(is_async)
+        self.assertEqual([chunk.decode().count("\n") for chunk in chunks], [2, 2, 1])
+        ids = [json.loads(line)["id"] for line in b"".join(chunks).decode().splitlines()]
+        self.assertCountEqual(ids, [b.pk for b in self.bookings[:5]])
+
+    def test_scoped_sql_has_no_distinct_or_cross_table_or(self):
+        queryset = owned_by(Booking.objects.all(), self.owner, "client", "service__business__owner")
+        sql = str(queryset.query).upper()
+        self.assertNotIn("DISTINCT", sql)
+        self.assertIn("UNION ALL", sql)
+        self.assertNotIn(" OR ", sql)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        api = APIClient()
+        api.force_authenticate(self.owner)
+        # ETag aggregate, COUNT(*), page.
+        with self.assertNumQueries(3):
+            api.get("/api/bookings/")
+        with self.assertNumQueries(3):
+            api.get("/api/payments/")
+
+    def test_explain_uses_indexes_for_every_arm(self):
+        queryset = owned_by(Payment.objects.all(), self.owner, "booking__client", "booking__service__business__owner")
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+
+        if connection.vendor == "postgresql":
+            self.assertNotIn("Seq Scan", plan)
+        else:
+            self.assertNotRegex(plan, r"\bSCAN\b")
+
+
+class ExpandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user("owner", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        cls.business = Business.objects.create(owner=cls.owner, name="Kings")
+        service = Service.objects.create(business=cls.business, category=category, name="Fade", price=100)
+
+        start = timezone.now() + timedelta(days=1)
+        for i in range(5):
+            booking = Booking.objects.create(service=service, client=cls.owner, scheduled_at=start + timedelta(hours=i))
+            Payment.objects.create(booking=booking, amount=100)
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.owner)
+
+    def test_nested_expansion_stays_within_page_query_count(self):
+        with self.assertNumQueries(3):
+            response = self.api.get("/api/payments/", {"expand": "booking.service.business,booking.client"})
+        self.assertEqual(response.status_code, 200)
+        booking = response.data["results"][0]["booking"]
+        self.assertEqual(booking["service"]["business"]["name"], "Kings")
+        self.assertEqual(booking["client"]["username"], "owner")
+        self.assertIsInstance(booking["service"]["category"], int)
+
+    def test_single_level_expansion_on_detail(self):
+        # The nested serializer sits directly under a non-list root and must not reuse the root's tree.
+        payment = Payment.objects.filter(booking__client=self.owner).first()
+        response = self.api.get(f"/api/payments/{payment.pk}/", {"expand": "booking"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["booking"]["id"], payment.booking_id)
+        self.assertIsInstance(response.data["booking"]["service"], int)
+
+    def test_query_budget_overrun_fails(self):
+        with mock.patch.object(PaymentViewSet, "expand_query_budget", 0):
+            message = "PaymentViewSet ran 3 queries for ?expand=booking (budget 0)."
+            with self.assertRaisesMessage(QueryBudgetExceeded, message):
+                self.api.get("/api/payments/", {"expand": "booking"})
+            with self.assertRaises(QueryBudgetExceeded):
+                self.api.get(f"/api/payments/{Payment.objects.first().pk}/", {"expand": "booking"})
+
+    @override_settings(EXPAND_STRICT_QUERY_BUDGET=False)
+    def test_query_budget_overrun_is_only_logged_when_not_strict(self):
+        with mock.patch.object(PaymentViewSet, "expand_query_budget", 0), self.assertLogs("common.expand", "WARNING"):
+            response = self.api.get("/api/payments/", {"expand": "booking"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_expansion_is_rejected(self):
+        response = self.api.get("/api/bookings/", {"expand": "service.owner"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("expand", response.data)
+
+    def test_related_change_moves_the_etag(self):
+        first = self.api.get("/api/bookings/", {"expand": "service.business"})
+        Business.objects.filter(pk=self.business.pk).update(
+            name="Queens", updated_at=timezone.now() + timedelta(seconds=5),
+        )
+        second = self.api.get(
+            "/api/bookings/", {"expand": "service.business"}, HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data["results"][0]["service"]["business"]["name"], "Queens")
+
+
+class BusinessStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user("owner", password="x")
+        cls.client_user = User.objects.create_user("client", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        cls.business = Business.objects.create(owner=cls.owner, name="Kings")
+        cls.service = Service.objects.create(business=cls.business, category=category, name="Fade", price=100)
+
+    def stats(self, user):
+        api = APIClient()
+        api.force_authenticate(user)
+        return api.get(f"/api/businesses/{self.business.pk}/stats/", {"end": "2099-12-31", "start": "2098-01-02"})
+
+    def rollup(self):
+        return list(
+            BusinessDailyStats.objects.filter(business=self.business)
+            .order_by("day")
+            .values_list(
+                "day", "bookings_pending", "bookings_confirmed", "bookings_canceled",
+                "bookings_completed", "payments_completed", "revenue", "rating_sum", "rating_count",
+            )
+        )
+
+    def test_rollup_follows_api_writes_and_matches_rebuild(self):
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        start = (timezone.now() + timedelta(days=1)).replace(microsecond=0)
+        ids = [
+            api.post("/api/bookings/", {"service": self.service.pk, "scheduled_at": start + timedelta(hours=i)}).data["id"]
+            for i in range(3)
+        ]
+        api.patch(f"/api/bookings/{ids[0]}/", {"status": "canceled"})
+        api.post("/api/payments/", {"booking": ids[1], "amount": "150.00", "payment_status": "completed"})
+        payment = api.post("/api/payments/", {"booking": ids[2], "amount": "80.00"}).data["id"]
+        api.patch(f"/api/payments/{payment}/", {"payment_status": "completed"})
+
+        live = self.rollup()
+        rebuild_business_stats()
+        self.assertEqual(live, self.rollup())
+
+        api.force_authenticate(self.owner)
+        response = api.get(f"/api/businesses/{self.business.pk}/stats/", {"end": start.date() + timedelta(days=1)})
+        self.assertEqual(response.status_code, 200)
+        totals = response.data["totals"]
+        self.assertEqual(totals["revenue"], "230.00")
+        self.assertEqual(totals["bookings"], 3)
+        self.assertEqual(totals["bookings_by_status"]["canceled"], 1)
+        self.assertEqual(totals["cancellation_rate"], round(1 / 3, 4))
+
+    def test_deleting_a_reviewed_booking_removes_its_rating(self):
+        booking = Booking.objects.create(
+            service=self.service, client=self.client_user,
+            scheduled_at=timezone.now() - timedelta(days=1), status=Booking.Status.COMPLETED,
+        )
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        review = api.post("/api/reviews/", {"booking": booking.pk, "business": self.business.pk, "rating": 4, "comment": "Good"})
+        self.assertEqual(review.status_code, 201, review.data)
+        self.business.refresh_from_db()
+        self.assertEqual((self.business.rating_count, self.business.rating_avg), (1, Decimal("4.00")))
+
+        self.assertEqual(api.delete(f"/api/bookings/{booking.pk}/").status_code, 204)
+        self.business.refresh_from_db()
+        self.assertEqual((self.business.rating_count, self.business.rating_avg), (0, None))
+        self.assertEqual(self.business.rating_histogram["4"], 0)
+
+    def test_only_owner_or_staff_can_read_stats(self):
+        self.assertEqual(self.stats(self.client_user).status_code, 403)
+        self.assertEqual(self.stats(self.owner).status_code, 200)
+
+
+class StatusTransitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user("owner", password="x")
+        cls.client_user = User.objects.create_user("client", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        business = Business.objects.create(owner=cls.owner, name="Kings")
+        cls.service = Service.objects.create(business=business, category=category, name="Fade", price=100)
+
+    def setUp(self):
+        self.booking = Booking.objects.create(
+            service=self.service, client=self.client_user, scheduled_at=timezone.now() + timedelta(days=1),
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.owner)
+
+    def test_status_follows_the_state_machine_and_is_logged(self):
+        url = f"/api/bookings/{self.booking.pk}/"
+        confirmed = self.api.patch(url, {"status": "confirmed"}, format="json")
+        self.assertEqual((confirmed.status_code, confirmed.data["version"]), (200, 1))
+        self.assertEqual(self.api.patch(url, {"status": "completed"}, format="json").status_code, 200)
+
+        response = self.api.patch(url, {"status": "pending"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.data)
+
+        log = self.api.get(f"{url}transitions/").data
+        self.assertEqual(
+            [(entry["from_status"], entry["to_status"], entry["version"], entry["actor"]) for entry in log],
+            [("pending", "confirmed", 1, self.owner.pk), ("confirmed", "completed", 2, self.owner.pk)],
+        )
+        self.assertEqual(OutboxEvent.objects.filter(topic="booking.status").count(), 2)
+
+    def test_bookings_are_created_pending(self):
+        self.api.force_authenticate(self.client_user)
+        start = (timezone.now() + timedelta(days=2)).replace(microsecond=0)
+        for status in ["completed", "confirmed", "canceled"]:
+            response = self.api.post("/api/bookings/", {"service": self.service.pk, "scheduled_at": start, "status": status})
+            self.assertEqual(response.status_code, 400, status)
+            self.assertIn("status", response.data)
+        bulk = self.api.post(
+            "/api/bookings/", [{"service": self.service.pk, "scheduled_at": start, "status": "completed"}], format="json",
+        )
+        self.assertEqual(bulk.status_code, 400)
+
+        response = self.api.post("/api/bookings/", {"service": self.service.pk, "scheduled_at": start})
+        self.assertEqual((response.status_code, response.data["status"]), (201, "pending"))
+        self.assertEqual(Booking.objects.filter(status="completed").count(), 0)
+
+    def test_stale_version_is_a_conflict(self):
+        url = f"/api/bookings/{self.booking.pk}/"
+        self.api.patch(url, {"status": "confirmed"}, format="json")
+        response = self.api.patch(url, {"status": "canceled", "version": 0}, format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.api.patch(url, {"status": "canceled", "version": 1}, format="json").status_code, 200)
+
+        # A write that lands between our read and our UPDATE makes it match nothing.
+        payment = Payment.objects.create(booking=self.booking, amount="100.00")
+        Payment.objects.filter(pk=payment.pk).update(payment_status="failed", version=1)
+        with self.assertRaises(StaleVersion):
+            apply_changes(payment, {"payment_status": "completed"})
+        payment.refresh_from_db()
+        self.assertEqual((payment.payment_status, payment.version), ("failed", 1))
+        self.assertFalse(StatusTransition.objects.filter(subject="payment").exists())
+
+    def test_completing_a_payment_stamps_its_date(self):
+        payment = Payment.objects.create(booking=self.booking, amount="100.00")
+        response = self.api.patch(f"/api/payments/{payment.pk}/", {"payment_status": "completed"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        payment.refresh_from_db()
+        self.assertIsNotNone(payment.payment_date)
+        event = OutboxEvent.objects.get(topic="payment.status")
+        self.assertEqual((event.payload["payment_status"], event.payload["previous_status"]), ("completed", "pending"))
+
+
+class AvailabilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user("owner", password="x")
+        cls.client_user = User.objects.create_user("client", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        cls.business = Business.objects.create(owner=cls.owner, name="Kings")
+        cls.service = Service.objects.create(
+            business=cls.business, category=category, name="Fade", price=100, duration_minutes=60,
+        )
+        # A Monday at least a week out, open 09:00-13:00.
+        today = timezone.localdate()
+        cls.day = today + timedelta(days=7 + (7 - today.weekday()) % 7)
+        BusinessHours.objects.create(
+            business=cls.business, weekday=BusinessHours.Weekday.MONDAY, opens_at=time(9), closes_at=time(13),
+        )
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def at(self, hour, minute=0, day=None):
+        return timezone.make_aware(datetime.combine(day or self.day, time(hour, minute)))
+
+    def book(self, hour, minute=0):
+        return self.api.post(
+            "/api/bookings/", {"service": self.service.pk, "scheduled_at": self.at(hour, minute).isoformat()}, format="json",
+        )
+
+    def starts(self, day=None):
+        return [start.time() for start, _end in free_slots(self.service, day or self.day)]
+
+    def test_slots_stay_within_opening_hours(self):
+        self.assertEqual(self.starts(), [time(9), time(10), time(11), time(12)])
+        # Closed on Tuesdays; no hours configured would mean the Mon-Sat default instead.
+        self.assertEqual(self.starts(self.day + timedelta(days=1)), [])
+
+    def test_overlapping_bookings_are_rejected_and_adjacent_ones_allowed(self):
+        self.assertEqual(self.book(10).status_code, 201)
+        for hour, minute in [(10, 0), (10, 30), (9, 30)]:
+            response = self.book(hour, minute)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("scheduled_at", response.data)
+        self.assertEqual(self.book(9).status_code, 201)
+        self.assertEqual(self.book(11).status_code, 201)
+        self.assertEqual(self.starts(), [time(12)])
+
+    def test_canceled_bookings_free_their_slot(self):
+        booking = self.book(10).data
+        self.api.patch(f"/api/bookings/{booking['id']}/", {"status": "canceled"}, format="json")
+        self.assertEqual(self.book(10).status_code, 201)
+
+    def test_moving_a_booking_checks_the_new_slot_but_not_itself(self):
+        first, second = self.book(9).data, self.book(11).data
+
+        response = self.api.patch(f"/api/bookings/{second['id']}/", {"scheduled_at": self.at(9, 30).isoformat()}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        # Overlapping only its own old slot is fine, and the end moves with it.
+        response = self.api.patch(f"/api/bookings/{second['id']}/", {"scheduled_at": self.at(11, 30).isoformat()}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Booking.objects.get(pk=second["id"]).ends_at, self.at(12, 30))
+
+        response = self.api.patch(f"/api/bookings/{first['id']}/", {"scheduled_at": self.at(10).isoformat()}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.book(9).status_code, 201)
+
+    def test_existing_bookings_keep_the_duration_they_were_booked_with(self):
+        self.book(10)
+        Service.objects.filter(pk=self.service.pk).update(duration_minutes=30)
+        self.service.refresh_from_db()
+
+        # Still busy until 11:00, although the service now only takes 30 minutes.
+        self.assertEqual(self.book(10, 30).status_code, 400)
+        self.assertEqual(self.book(11).status_code, 201)
+        self.assertNotIn(time(10, 30), self.starts())
+
+
+class BulkCreateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user("owner", password="x")
+        cls.client_user = User.objects.create_user("client", password="x")
+        cls.stranger = User.objects.create_user("stranger", password="x")
+        category = Category.objects.create(name="Barbershop", slug="barbershop")
+        business = Business.objects.create(owner=cls.owner, name="Kings")
+        cls.service = Service.objects.create(
+            business=business, category=category, name="Fade", price=100, duration_minutes=60,
+        )
+        cls.start = timezone.now().replace(microsecond=0) + timedelta(days=30)
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def booking_item(self, minutes):
+        return {"service": self.service.pk, "scheduled_at": (self.start + timedelta(minutes=minutes)).isoformat()}
+
+    def bulk(self, path, items, **headers):
+        return self.api.post(path, items, format="json", **headers)
+
+    def statuses(self, response):
+        return [result["status"] for result in response.data["results"]]
+
+    def test_all_valid_is_201(self):
+        response = self.bulk("/api/bookings/bulk/", [self.booking_item(0), self.booking_item(60)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 0))
+        self.assertEqual(Booking.objects.filter(client=self.client_user).count(), 2)
+        self.assertEqual(response.data["results"][1]["data"]["ends_at"][:16], (self.start + timedelta(minutes=120)).isoformat()[:16])
+
+    def test_mixed_results_are_207_with_per_item_errors(self):
+        response = self.bulk("/api/bookings/bulk/", [
+            self.booking_item(0),
+            {"service": 999999, "scheduled_at": self.booking_item(0)["scheduled_at"]},
+            {"service": self.service.pk, "scheduled_at": (timezone.now() - timedelta(days=1)).isoformat()},
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(self.statuses(response), [201, 400, 400])
+        self.assertIn("service", response.data["results"][1]["errors"])
+        self.assertIn("scheduled_at", response.data["results"][2]["errors"])
+
+    def test_conflicts_inside_the_batch_and_with_existing_rows(self):
+        Booking.objects.create(service=self.service, client=self.stranger, scheduled_at=self.start + timedelta(hours=5))
+        response = self.bulk("/api/bookings/bulk/", [
+            self.booking_item(0),
+            self.booking_item(30),   # overlaps the first item
+            self.booking_item(60),   # adjacent to it
+            self.booking_item(330),  # overlaps the existing booking
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(self.statuses(response), [201, 400, 201, 400])
+
+    def test_nothing_created_is_400(self):
+        self.assertEqual(self.bulk("/api/bookings/bulk/", [{"service": "x"}]).status_code, 400)
+        self.assertEqual(self.bulk("/api/bookings/bulk/", []).status_code, 400)
+        self.assertEqual(self.bulk("/api/bookings/bulk/", [self.booking_item(i * 60) for i in range(101)]).status_code, 400)
+
+    def test_payments_only_against_bookings_the_user_may_pay_for(self):
+        own = Booking.objects.create(service=self.service, client=self.client_user, scheduled_at=self.start)
+        other = Booking.objects.create(service=self.service, client=self.stranger, scheduled_at=self.start + timedelta(hours=2))
+        response = self.bulk("/api/payments/bulk/", [
+            {"booking": own.pk, "amount": "100.00", "payment_status": "completed"},
+            {"booking": other.pk, "amount": "100.00"},
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(self.statuses(response), [201, 400])
+        self.assertIn("booking", response.data["results"][1]["errors"])
+        self.assertIsNotNone(Payment.objects.get(booking=own).payment_date)
+
+        single = self.api.post("/api/payments/", {"booking": other.pk, "amount": "100.00"}, format="json")
+        self.assertEqual(single.status_code, 400)
+        self.assertFalse(Payment.objects.filter(booking=other).exists())
+
+    def test_idempotency_key_replays_a_bulk_request(self):
+        items = [self.booking_item(0), self.booking_item(60)]
+        first = self.bulk("/api/bookings/bulk/", items, HTTP_IDEMPOTENCY_KEY="batch-1")
+        replay = self.bulk("/api/bookings/bulk/", items, HTTP_IDEMPOTENCY_KEY="batch-1")
+        self.assertEqual(replay.status_code, first.status_code)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(Booking.objects.count(), 2)
+
+        reused = self.bulk("/api/bookings/bulk/", [self.booking_item(120)], HTTP_IDEMPOTENCY_KEY="batch-1")
+        self.assertEqual(reused.status_code, 422)
+
+    def test_default_perform_bulk_create_inserts_items_as_validated(self):
+        class CategoryBulk(BulkCreateMixin):
+            def get_queryset(self):
+                return Category.objects.all()
+
+        outcomes = CategoryBulk().perform_bulk_create([(0, {"name": "Nails", "slug": "nails"}), (2, {"name": "Spa", "slug": "spa"})])
+        self.assertEqual(sorted(outcomes), [0, 2])
+        self.assertTrue(all(category.pk for category in outcomes.values()))
+        self.assertEqual(Category.objects.filter(slug__in=["nails", "spa"]).count(), 2)
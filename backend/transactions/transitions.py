@@ -0,0 +1,108 @@
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.exceptions import APIException, ValidationError
+
+from common.push import push
+from outbox.events import enqueue
+from .models import Booking, Payment, StatusTransition
+
+BOOKING_TRANSITIONS = {
+    Booking.Status.PENDING: {Booking.Status.CONFIRMED, Booking.Status.CANCELED},
+    Booking.Status.CONFIRMED: {Booking.Status.COMPLETED, Booking.Status.CANCELED},
+}
+
+PAYMENT_TRANSITIONS = {
+    Payment.Status.PENDING: {Payment.Status.COMPLETED, Payment.Status.FAILED},
+    # A failed payment can be retried.
+    Payment.Status.FAILED: {Payment.Status.PENDING},
+}
+
+# Statuses a new row may be created in; everything else is reached through the transitions.
+# A payment can be recorded as already completed (its payment_date is stamped on create).
+INITIAL_STATUSES = {
+    Booking: {Booking.Status.PENDING},
+    Payment: {Payment.Status.PENDING, Payment.Status.COMPLETED},
+}
+
+# model: (log subject, status field, allowed transitions, fields carried by the status event)
+MACHINES = {
+    Booking: (StatusTransition.Subject.BOOKING, "status", BOOKING_TRANSITIONS, ("client", "service", "scheduled_at")),
+    Payment: (StatusTransition.Subject.PAYMENT, "payment_status", PAYMENT_TRANSITIONS, ("booking", "amount")),
+}
+
+
+class StaleVersion(APIException):
+    status_code = 409
+    default_detail = "This record was changed by someone else; reload it and retry."
+    default_code = "stale_version"
+
+
+def check_transition(instance, changes):
+    """Raise unless `changes` keeps the status or moves it along an allowed transition; return `(old, new)`."""
+    _subject, field, allowed, _fields = MACHINES[type(instance)]
+    old = getattr(instance, field)
+    new = changes.get(field, old)
+    if new != old and new not in allowed.get(old, ()):
+        raise ValidationError({field: f'Can\'t change {field} from "{old}" to "{new}".'})
+    return old, new
+
+
+def check_initial_status(model, attrs):
+    """Raise unless a new `model` row would start in one of its `INITIAL_STATUSES`."""
+    _subject, field, _allowed, _fields = MACHINES[model]
+    status = attrs.get(field, model._meta.get_field(field).get_default())
+    if status not in INITIAL_STATUSES[model]:
+        allowed = ", ".join(f'"{initial}"' for initial in sorted(INITIAL_STATUSES[model]))
+        raise ValidationError({field: f"New records start as {allowed}."})
+
+
+def apply_changes(instance, changes, expected_version=None, actor=None):
+    """
+    Write `changes` to a booking or payment with one conditional UPDATE
+    (`WHERE id = … AND version = … AND status = <old>`), so no row lock is
+    held while the request runs: a concurrent writer that got there first
+    makes the UPDATE match nothing, and this one fails with 409 instead of
+    overwriting it. `expected_version` is the version the client last saw.
+
+    A status change must follow the model's transitions; it is logged in
+    StatusTransition, queued on the outbox as `<subject>.status` and pushed
+    to the people involved once the transaction commits. Call inside the
+    transaction making the change.
+    """
+    model = type(instance)
+    subject, field, _allowed, event_fields = MACHINES[model]
+    old, new = check_transition(instance, changes)
+    if expected_version is not None and expected_version != instance.version:
+        raise StaleVersion()
+
+    now = timezone.now()
+    updated = model.objects.filter(pk=instance.pk, version=instance.version, **{field: old}).update(
+        **changes,
+        version=F("version") + 1,
+        updated_at=now,
+    )
+    if not updated:
+        raise StaleVersion()
+    for name, value in changes.items():
+        setattr(instance, name, value)
+    instance.version += 1
+    instance.updated_at = now
+
+    if new != old:
+        StatusTransition.objects.create(
+            subject=subject,
+            object_id=instance.pk,
+            from_status=old,
+            to_status=new,
+            version=instance.version,
+            actor=actor if actor is not None and actor.is_authenticated else None,
+        )
+        event = enqueue(f"{subject}.status", instance, (field, *event_fields), {"previous_status": old})
+        push(participants(instance), f"{subject}.status", event.payload)
+    return instance
+
+
+def participants(instance):
+    """The client and the business owner of a booking or payment."""
+    booking = instance.booking if isinstance(instance, Payment) else instance
+    return [booking.client_id, booking.service.business.owner_id]
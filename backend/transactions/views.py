@@ -1,35 +1,221 @@
-from django.db.models import Q
+from django.db import transaction
 from rest_framework import viewsets, permissions
-from .models import Booking, Payment
-from .serializers import BookingSerializer, PaymentSerializer
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from catalog.models import Service
+from common.bulk import BulkCreateMixin, collect_pks
+from common.conditional import ConditionalGetMixin
+from common.expand import ExpandMixin
+from common.export import ExportMixin
+from common.fast import FastListMixin
+from common.scoping import owned_by
+from common.sparse import SparseFieldsMixin
+from engagement.models import Review
+from engagement.ratings import apply_rating_change
+from idempotency.mixins import IdempotencyMixin
+from outbox.events import enqueue, enqueue_many
+from .availability import has_conflict, lock_service, service_duration
+from .models import Booking, Payment, StatusTransition
+from .serializers import BookingSerializer, PaymentSerializer, StatusTransitionSerializer
+from .stats import (
+    booking_contributions,
+    completed_payments,
+    payment_contributions,
+    record_stats_change,
+    review_contributions,
+)
 
+# What the outbox events of each model carry besides the id.
+BOOKING_EVENT_FIELDS = ("client", "service", "status", "scheduled_at")
+PAYMENT_EVENT_FIELDS = ("booking", "amount", "payment_method", "payment_status", "payment_date")
 
-class BookingViewSet(viewsets.ModelViewSet):
+
+class TransitionLogMixin:
+    """`GET <detail>/transitions/`: the object's status history, oldest first."""
+
+    transition_subject = None
+
+    @action(detail=True)
+    def transitions(self, request, pk=None):
+        log = StatusTransition.objects.filter(subject=self.transition_subject, object_id=self.get_object().pk)
+        return Response(StatusTransitionSerializer(log.order_by("id"), many=True).data)
+
+
+class BookingViewSet(TransitionLogMixin, IdempotencyMixin, SparseFieldsMixin, ExpandMixin, ConditionalGetMixin, FastListMixin, BulkCreateMixin, ExportMixin, viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ["-created_at"]
+    sparse_fields_actions = ("list", "retrieve", "export")
+    transition_subject = StatusTransition.Subject.BOOKING
 
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
             return Booking.objects.select_related("service", "client", "service__business").all()
 
-        return Booking.objects.select_related("service", "client", "service__business").filter(
-            Q(client=user) | Q(service__business__owner=user)
-        ).distinct()
+        return owned_by(
+            Booking.objects.select_related("service", "client", "service__business"),
+            user,
+            "client",
+            "service__business__owner",
+        )
 
     def perform_create(self, serializer):
-        serializer.save(client=self.request.user)
+        with transaction.atomic():
+            service = lock_service(serializer.validated_data["service"])
+            start = serializer.validated_data["scheduled_at"]
+            end = start + service_duration(service)
+            self.ensure_slot_free(service, start, end)
+            booking = serializer.save(client=self.request.user, ends_at=end)
+            record_stats_change(after=booking_contributions([booking]))
+            enqueue("booking.created", booking, BOOKING_EVENT_FIELDS)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        data = serializer.validated_data
+        reschedules = {"service", "scheduled_at", "status"} & data.keys()
+
+        # Moving a booking to another service can move its revenue to another business.
+        payments = completed_payments(instance) if "service" in data else []
+        before = booking_contributions([instance]) + payment_contributions(payments)
+
+        with transaction.atomic():
+            changes = {}
+            start = data.get("scheduled_at", instance.scheduled_at)
+            if {"service", "scheduled_at"} & data.keys():
+                # A moved booking keeps its own length; one moved to another service takes that service's.
+                moved_service = "service" in data and data["service"].pk != instance.service_id
+                duration = service_duration(data["service"]) if moved_service else instance.ends_at - instance.scheduled_at
+                changes["ends_at"] = start + duration
+            if reschedules and data.get("status", instance.status) != Booking.Status.CANCELED:
+                service = lock_service(data.get("service", instance.service))
+                end = changes.get("ends_at", instance.ends_at)
+                self.ensure_slot_free(service, start, end, exclude_pk=instance.pk)
+            booking = serializer.save(**changes)
+            record_stats_change(before, booking_contributions([booking]) + payment_contributions(payments))
+            enqueue("booking.updated", booking, BOOKING_EVENT_FIELDS)
+
+    def perform_destroy(self, instance):
+        before = booking_contributions([instance]) + payment_contributions(completed_payments(instance))
+
+        with transaction.atomic():
+            # The review goes with the booking; take its rating back out under the same lock as a re-rating.
+            review = Review.objects.select_for_update().only("business_id", "rating", "created_at").filter(
+                booking=instance,
+            ).first()
+            if review is not None:
+                before += review_contributions([review])
+                apply_rating_change(review.business_id, removed=[review.rating])
+            enqueue("booking.deleted", instance, BOOKING_EVENT_FIELDS)
+            instance.delete()
+            record_stats_change(before)
+
+    def ensure_slot_free(self, service, start, end, exclude_pk=None):
+        if has_conflict(service, start, end, exclude_pk=exclude_pk):
+            raise ValidationError({"scheduled_at": "This time slot is already booked for this service."})
+
+    def get_bulk_prefetch(self, items):
+        # Locked in pk order so concurrent batches can't deadlock on each other.
+        services = Service.objects.select_for_update().filter(pk__in=collect_pks(items, "service")).order_by("pk")
+        return {"service": (Service, {service.pk: service for service in services})}
 
+    def perform_bulk_create(self, valid_items):
+        slots = {
+            index: (data["scheduled_at"], data["scheduled_at"] + service_duration(data["service"]))
+            for index, data in valid_items
+        }
 
-class PaymentViewSet(viewsets.ModelViewSet):
+        # One range query for every booking the batch could collide with.
+        taken = {}
+        existing = Booking.objects.filter(
+            service_id__in={data["service"].pk for _index, data in valid_items},
+            ends_at__gt=min(start for start, _end in slots.values()),
+            scheduled_at__lt=max(end for _start, end in slots.values()),
+        ).exclude(status=Booking.Status.CANCELED).values_list("service_id", "scheduled_at", "ends_at")
+        for service_id, *interval in existing:
+            taken.setdefault(service_id, []).append(interval)
+
+        outcomes, bookings = {}, []
+        for index, data in valid_items:
+            service = data["service"]
+            start, end = slots[index]
+            if any(other_start < end and other_end > start for other_start, other_end in taken.get(service.pk, [])):
+                outcomes[index] = {"scheduled_at": ["This time slot is already booked for this service."]}
+                continue
+            taken.setdefault(service.pk, []).append((start, end))
+            booking = Booking(client=self.request.user, ends_at=end, **data)
+            outcomes[index] = booking
+            bookings.append(booking)
+
+        Booking.objects.bulk_create(bookings)
+        record_stats_change(after=booking_contributions(bookings))
+        enqueue_many("booking.created", bookings, BOOKING_EVENT_FIELDS)
+        return outcomes
+
+
+class PaymentViewSet(TransitionLogMixin, IdempotencyMixin, SparseFieldsMixin, ExpandMixin, ConditionalGetMixin, FastListMixin, BulkCreateMixin, ExportMixin, viewsets.ModelViewSet):
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ["-created_at"]
+    sparse_fields_actions = ("list", "retrieve", "export")
+    transition_subject = StatusTransition.Subject.PAYMENT
 
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
             return Payment.objects.select_related("booking", "booking__service", "booking__service__business").all()
 
-        return Payment.objects.select_related("booking", "booking__service", "booking__service__business").filter(
-            Q(booking__client=user) | Q(booking__service__business__owner=user)
-        ).distinct()
+        return owned_by(
+            Payment.objects.select_related("booking", "booking__service", "booking__service__business"),
+            user,
+            "booking__client",
+            "booking__service__business__owner",
+        )
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            payment = serializer.save()
+            record_stats_change(after=payment_contributions([payment]))
+            enqueue("payment.created", payment, PAYMENT_EVENT_FIELDS)
+
+    def perform_update(self, serializer):
+        before = payment_contributions([serializer.instance])
+        with transaction.atomic():
+            payment = serializer.save()
+            record_stats_change(before, payment_contributions([payment]))
+            enqueue("payment.updated", payment, PAYMENT_EVENT_FIELDS)
+
+    def perform_destroy(self, instance):
+        before = payment_contributions([instance])
+        with transaction.atomic():
+            enqueue("payment.deleted", instance, PAYMENT_EVENT_FIELDS)
+            instance.delete()
+            record_stats_change(before)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.action in ("create", "update", "partial_update"):
+            serializer.fields["booking"].queryset = self.payable_bookings()
+        return serializer
+
+    def get_bulk_prefetch(self, items):
+        bookings = self.payable_bookings().in_bulk(collect_pks(items, "booking"))
+        return {"booking": (Booking, bookings)}
+
+    def payable_bookings(self):
+        """Bookings the user may record payments against: their own, or their businesses'."""
+        bookings = Booking.objects.select_related("service")
+        if self.request.user.is_staff:
+            return bookings.all()
+        return owned_by(bookings, self.request.user, "client", "service__business__owner")
+
+    def perform_bulk_create(self, valid_items):
+        payments = {
+            index: Payment(**PaymentSerializer.stamp_payment_date(data))
+            for index, data in valid_items
+        }
+        Payment.objects.bulk_create(payments.values())
+        record_stats_change(after=payment_contributions(payments.values()))
+        enqueue_many("payment.created", payments.values(), PAYMENT_EVENT_FIELDS)
+        return payments